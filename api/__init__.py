@@ -13,7 +13,14 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from .broker import *
 from .core import *
-from .models import FirstRedeemModel as FirstRedeemModel, UserModel as UserModel
+from .limiter import LimiterBackend as LimiterBackend, MemoryBackend as MemoryBackend, RedisBackend as RedisBackend
+from .models import (
+    FirstRedeemModel as FirstRedeemModel,
+    FirstStreakModel as FirstStreakModel,
+    QuoteModel as QuoteModel,
+    UserModel as UserModel,
+)
 from .server import Server as Server
 from .tokens import *
@@ -0,0 +1,270 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import enum
+import logging
+import secrets
+from typing import TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from types_.broker import BrokerMessage
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+__all__ = ("Broker", "OverflowPolicy", "Subscriber", "TopicStats")
+
+
+class OverflowPolicy(enum.Enum):
+    """What a `Subscriber` does with new messages once its queue is full.
+
+    DROP_OLDEST
+        The oldest undelivered message is dropped to make room.
+    COALESCE
+        Undelivered messages for the same topic are merged, keeping only the latest.
+        If the queue is still full, the oldest topic is dropped.
+    """
+
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+
+
+class TopicStats:
+    """Counters for a single `Broker` topic.
+
+    published
+        The amount of messages published to the topic.
+    delivered
+        The amount of messages put into subscriber queues.
+    merged
+        The amount of published messages merged into a later one by the topics coalescing window.
+    """
+
+    __slots__ = ("delivered", "merged", "published")
+
+    def __init__(self) -> None:
+        self.published: int = 0
+        self.delivered: int = 0
+        self.merged: int = 0
+
+    def __repr__(self) -> str:
+        return f"TopicStats: published={self.published}, delivered={self.delivered}, merged={self.merged}"
+
+
+class Subscriber:
+    """A bounded, non-blocking queue of messages for the topics it is subscribed to.
+
+    Subscribers should be created with `Broker.subscribe` and removed with `Broker.unsubscribe`.
+    """
+
+    __slots__ = ("_pending", "_queue", "_ready", "dropped", "id", "maxsize", "owner", "policy", "topics")
+
+    def __init__(
+        self,
+        topics: frozenset[str],
+        *,
+        maxsize: int,
+        policy: OverflowPolicy,
+        owner: str | None = None,
+    ) -> None:
+        self.id: str = secrets.token_urlsafe(16)
+        self.topics: frozenset[str] = topics
+        self.owner: str | None = owner
+        self.policy: OverflowPolicy = policy
+        self.maxsize: int = maxsize
+        self.dropped: int = 0
+
+        self._queue: collections.deque[BrokerMessage] = collections.deque(maxlen=maxsize)
+        self._pending: collections.OrderedDict[str, BrokerMessage] = collections.OrderedDict()
+        self._ready: asyncio.Event = asyncio.Event()
+
+    def __repr__(self) -> str:
+        return f"Subscriber: id={self.id}, owner={self.owner}, topics={set(self.topics)}"
+
+    def __len__(self) -> int:
+        return len(self._pending) if self.policy is OverflowPolicy.COALESCE else len(self._queue)
+
+    def put(self, message: BrokerMessage, /) -> None:
+        if self.policy is OverflowPolicy.COALESCE:
+            topic: str = message["event"]
+
+            if topic in self._pending:
+                self.dropped += 1
+            elif len(self._pending) >= self.maxsize:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+
+            # Replacing in place keeps the position of the first undelivered message for this topic...
+            self._pending[topic] = message
+        else:
+            if len(self._queue) >= self.maxsize:
+                self.dropped += 1
+
+            self._queue.append(message)
+
+        self._ready.set()
+
+    async def get(self) -> BrokerMessage:
+        while not len(self):
+            self._ready.clear()
+            await self._ready.wait()
+
+        if self.policy is OverflowPolicy.COALESCE:
+            return self._pending.popitem(last=False)[1]
+
+        return self._queue.popleft()
+
+
+class Broker:
+    """In memory publish/subscribe broker with named topics.
+
+    Each topic keeps its own set of subscribers, so publishing only touches subscribers interested in that topic.
+
+    Topics can be given a coalescing window with `Broker.set_window`. Messages published to that topic within the
+    window are merged, and only the latest is delivered once the window closes.
+    """
+
+    def __init__(self) -> None:
+        self._topics: dict[str, set[Subscriber]] = {}
+        self._owners: collections.Counter[str] = collections.Counter()
+
+        self._listeners: dict[str, list[Callable[[dict[str, Any]], None]]] = {}
+        self._windows: dict[str, float] = {}
+        self._pending: dict[str, dict[str, Any]] = {}
+        self.stats: collections.defaultdict[str, TopicStats] = collections.defaultdict(TopicStats)
+
+    def set_window(self, topic: str, window: float, /) -> None:
+        """Set the coalescing window, in seconds, for a topic. A window of 0 disables coalescing."""
+        if window > 0:
+            self._windows[topic] = window
+        else:
+            self._windows.pop(topic, None)
+
+    def add_listener(self, topic: str, callback: Callable[[dict[str, Any]], None], /) -> None:
+        """Add a callback which is called with the data of every message delivered on a topic.
+
+        Listeners are called once per delivery, after any coalescing, and must not block.
+        """
+        self._listeners.setdefault(topic, []).append(callback)
+
+    def subscribe(
+        self,
+        topics: Iterable[str],
+        *,
+        maxsize: int = 32,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        owner: str | None = None,
+    ) -> Subscriber:
+        """Create a new `Subscriber` for the given topics.
+
+        Parameters
+        ----------
+        topics: Iterable[str]
+            The topics to receive messages for.
+        maxsize: int
+            The maximum amount of undelivered messages kept for this subscriber. Defaults to 32.
+        policy: OverflowPolicy
+            What to do when the subscriber falls behind. Defaults to `OverflowPolicy.DROP_OLDEST`.
+        owner: Optional[str]
+            An optional owner, E.g. an IP, used to count subscribers with `Broker.owned`.
+        """
+        subscriber: Subscriber = Subscriber(frozenset(topics), maxsize=maxsize, policy=policy, owner=owner)
+
+        for topic in subscriber.topics:
+            self._topics.setdefault(topic, set()).add(subscriber)
+
+        if owner is not None:
+            self._owners[owner] += 1
+
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber, /) -> None:
+        for topic in subscriber.topics:
+            subscribers: set[Subscriber] | None = self._topics.get(topic)
+            if subscribers is None:
+                continue
+
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._topics[topic]
+
+        if subscriber.owner is not None:
+            self._owners[subscriber.owner] -= 1
+
+            if self._owners[subscriber.owner] <= 0:
+                del self._owners[subscriber.owner]
+
+    def publish(self, topic: str, data: dict[str, Any]) -> int:
+        """Publish a message to all subscribers of a topic.
+
+        This never blocks. Returns the amount of subscribers the message was delivered to immediately, which is
+        always 0 for topics with a coalescing window.
+        """
+        stats: TopicStats = self.stats[topic]
+        stats.published += 1
+
+        window: float | None = self._windows.get(topic)
+        if window is None:
+            return self._deliver(topic, data)
+
+        if topic in self._pending:
+            stats.merged += 1
+        else:
+            asyncio.get_running_loop().call_later(window, self._flush, topic)
+
+        self._pending[topic] = data
+        return 0
+
+    def _flush(self, topic: str, /) -> None:
+        data: dict[str, Any] | None = self._pending.pop(topic, None)
+        if data is None:
+            return
+
+        delivered: int = self._deliver(topic, data)
+        logger.debug("Broker flushed coalesced topic %s to %s subscribers: %r", topic, delivered, self.stats[topic])
+
+    def _deliver(self, topic: str, data: dict[str, Any], /) -> int:
+        for callback in self._listeners.get(topic, ()):
+            try:
+                callback(data)
+            except Exception as e:
+                logger.exception("Broker listener for topic %s raised an exception: %s", topic, e)
+
+        subscribers: set[Subscriber] | None = self._topics.get(topic)
+        if not subscribers:
+            return 0
+
+        message: BrokerMessage = {"event": topic, "data": data}
+        for subscriber in subscribers:
+            subscriber.put(message)
+
+        self.stats[topic].delivered += len(subscribers)
+        return len(subscribers)
+
+    def owned(self, owner: str, /) -> int:
+        """Returns the amount of current subscribers with the given owner."""
+        return self._owners.get(owner, 0)
+
+    def subscribers(self, topic: str, /) -> int:
+        """Returns the amount of current subscribers to a topic."""
+        return len(self._topics.get(topic, ()))
@@ -16,25 +16,40 @@ limitations under the License.
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import inspect
 from typing import TYPE_CHECKING, Any, Literal, Self
 
 from starlette.applications import Starlette
+from starlette.authentication import AuthCredentials, AuthenticationError, UnauthenticatedUser
+from starlette.exceptions import HTTPException
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
-from starlette.routing import Route, WebSocketRoute
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Match, Mount, Route, WebSocketRoute
 from starlette.types import Receive, Scope, Send
 from starlette.websockets import WebSocket
 
 from core.config import config
 
-from .limiter import RateLimit, Store
+from .limiter import LimiterBackend, MemoryBackend, RateLimit
 
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Iterator
+    from collections.abc import Awaitable, Callable, Iterator
 
-    from types_.limits import ExemptCallable, LimitDecorator, RateLimitData, ResponseType, T_LimitDecorator
+    from starlette.authentication import AuthenticationBackend
+
+    from types_.limits import (
+        CacheData,
+        ExemptCallable,
+        LimitDecorator,
+        RateLimitData,
+        ResponseType,
+        T_LimitDecorator,
+        ValidatorCallable,
+    )
+
+    from .models import UserModel
 
 __all__ = (
     "route",
@@ -46,6 +61,7 @@ __all__ = (
     "WebsocketNotificationTypes",
     "config",
     "limit",
+    "cacheable",
 )
 
 
@@ -55,28 +71,73 @@ class _Route:
         self._coro: Callable[[Any, Request | WebSocket], ResponseType] = kwargs["coro"]
         self._methods: list[str] = kwargs["methods"]
         self._prefix: bool = kwargs["prefix"]
-        self._limits: RateLimitData = kwargs.get("limits", {})
         self._is_websocket: bool = kwargs.get("websocket", False)
+        self._auth: bool = kwargs.get("auth", False)
 
         self._view: View | None = None
+        self._set_limits(kwargs.get("limits", {}))
+        self._cacheable: CacheData | None = kwargs.get("cacheable")
+
+    def _set_limits(self, limits: RateLimitData, /) -> None:
+        # Everything needed to rate limit this route is built once here, instead of on every request...
+        self._limits: RateLimitData = limits
+        self._ratelimit: RateLimit | None = RateLimit(limits["rate"], limits["per"]) if limits else None
+        self._bucket: Literal["ip", "user"] = limits.get("bucket", "ip") if limits else "ip"
+        self._exempt: ExemptCallable = limits.get("exempt", None) if limits else None
+        self._key_suffix: str = f"@{self._path}"
+
+    def _limit_key(self, request: Request | WebSocket) -> str | None:
+        if self._bucket == "user":
+            # Prefer the user resolved by the auth middleware, then the logged in dashboard session...
+            model: UserModel | None = getattr(request.scope.get("user"), "model", None)
+            if model is not None:
+                return f"user:{model.uid}{self._key_suffix}"
+
+            session: dict[str, Any] | None = request.scope.get("session")
+            if session and (sid := session.get("id")):
+                return f"session:{sid}{self._key_suffix}"
+
+        forwarded: str | None = request.headers.get("X-Forwarded-For", None)
+        ip: str = forwarded.split(",")[0] if forwarded else request.client.host  # type: ignore
+
+        if ip in ("127.0.0.1", "::1"):
+            return None
+
+        return f"{ip}{self._key_suffix}"
+
+    async def _authenticate(self, request: Request | WebSocket) -> str | None:
+        # Only routes which check scopes, or limit per user, pay for resolving the user...
+        backend: AuthenticationBackend | None = request.app.auth_backend
+        result: tuple[AuthCredentials, Any] | None = None
+
+        if backend is not None and (self._auth or self._bucket == "user"):
+            try:
+                result = await backend.authenticate(request)
+            except AuthenticationError as e:
+                return str(e)
+
+        request.scope["auth"], request.scope["user"] = result or (AuthCredentials(), UnauthenticatedUser())
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> Response | None:
         request: Request | WebSocket = (
             WebSocket(scope, receive, send) if scope["type"] == "websocket" else Request(scope, receive, send)
         )
 
-        forwarded: str | None = request.headers.get("X-Forwarded-For", None)
-        ip: str = forwarded.split(",")[0] if forwarded else request.client.host  # type: ignore
+        if (error := await self._authenticate(request)) is not None:
+            if isinstance(request, WebSocket):
+                await request.close()
+            else:
+                await PlainTextResponse(error, status_code=400)(scope, receive, send)
+            return
 
-        exempt: ExemptCallable = self._limits.get("exempt", None)
-        if exempt is not None and await exempt(request):
-            pass
+        limit: RateLimit | None = self._ratelimit
+        exempt: ExemptCallable = self._exempt
 
-        elif self._limits and ip not in ("127.0.0.1", "::1"):
-            limit: RateLimit = RateLimit(self._limits["rate"], self._limits["per"])  # TODO: Buckets...
-            key: str = f"{ip}@{self._path}"
+        if limit is not None and (exempt is None or not await exempt(request)):
+            key: str | None = self._limit_key(request)
+            backend: LimiterBackend = request.app.limiter
 
-            if retry := Store.update(key, limit):
+            if key is not None and (retry := await backend.update(key, limit)):
                 response = JSONResponse(
                     {"error": "You are requesting too fast. Slow down!"},
                     status_code=429,
@@ -88,14 +149,69 @@ class _Route:
         if isinstance(request, WebSocket):
             return await self._coro(self._view, request)
 
-        response = await self._coro(self._view, request)
-        assert response is not None
+        if self._cacheable is not None and request.method in ("GET", "HEAD"):
+            response = await self._conditional(request)
+        else:
+            response = await self._coro(self._view, request)
 
+        assert response is not None
         await response(scope, receive, send)
 
+    async def _conditional(self, request: Request) -> Response | None:
+        assert self._cacheable is not None
+        validator: ValidatorCallable = self._cacheable["validator"]
+        match: str = request.headers.get("if-none-match", "")
+
+        etag: str | None = None
+        if validator is not None:
+            result: Awaitable[str | None] | str | None = validator(self._view, request)
+            etag = await result if inspect.isawaitable(result) else result  # type: ignore
+
+            if etag is not None:
+                etag = etag if etag.startswith('"') else f'"{etag}"'
+
+            # We know the response would be unchanged without running the route at all...
+            if etag is not None and _etag_matches(match, etag):
+                return Response(status_code=304, headers=_cache_headers(etag, self._cacheable))
+
+        response: Response | None = await self._coro(self._view, request)
+        if response is None or response.status_code != 200:
+            return response
+
+        if etag is None:
+            body: bytes | None = getattr(response, "body", None)
+            if body is None:
+                return response
+
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+            if _etag_matches(match, etag):
+                return Response(status_code=304, headers=_cache_headers(etag, self._cacheable))
+
+        response.headers.update(_cache_headers(etag, self._cacheable))
+        return response
+
+
+def _etag_matches(header: str, etag: str, /) -> bool:
+    if not header:
+        return False
+
+    # If-None-Match always uses the weak comparison...
+    for candidate in header.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+
+        if candidate in ("*", etag):
+            return True
+
+    return False
+
+
+def _cache_headers(etag: str, data: CacheData, /) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": data["control"]}
+
 
 def route(
-    path: str, /, *, methods: list[str] = ["GET"], prefix: bool = True, websocket: bool = False
+    path: str, /, *, methods: list[str] = ["GET"], prefix: bool = True, websocket: bool = False, auth: bool = False
 ) -> Callable[..., _Route]:
     """Decorator which allows a coroutine to be turned into a `starlette.routing.Route` inside a `core.View`.
 
@@ -107,6 +223,10 @@ def route(
         The allowed methods for this route. Defaults to ``['GET']``.
     prefix: bool
         Whether the route path should be prefixed with the View class name. Defaults to True.
+    auth: bool
+        Whether the user should be authenticated before this route is called. Routes which use `request.user` or
+        `starlette.authentication.requires` must set this. Otherwise the request is always unauthenticated and the
+        Authorization header is never looked up. Defaults to False.
     """
 
     def decorator(coro: Callable[[Any, Request], ResponseType]) -> _Route:
@@ -118,7 +238,18 @@ def route(
             raise ValueError(f"Route callback function must not be named any: {', '.join(disallowed)}")
 
         limits: RateLimitData = getattr(coro, "__limits__", {})  # type: ignore
-        return _Route(path=path, coro=coro, methods=methods, prefix=prefix, limits=limits, websocket=websocket)
+        cache: CacheData | None = getattr(coro, "__cacheable__", None)
+
+        return _Route(
+            path=path,
+            coro=coro,
+            methods=methods,
+            prefix=prefix,
+            limits=limits,
+            cacheable=cache,
+            websocket=websocket,
+            auth=auth,
+        )
 
     return decorator
 
@@ -128,7 +259,7 @@ def limit(
 ) -> T_LimitDecorator:
     """Decorator which allows a Route to have a rate limit.
 
-    Rate limits use the GCRA algorithm and are stored in memory.
+    Rate limits use the GCRA algorithm and are stored in the `api.LimiterBackend` of the Application.
 
     Parameters
     ----------
@@ -138,6 +269,9 @@ def limit(
         The period in seconds.
     bucket: Literal["ip", "user"]
         The bucket to use for rate limiting. Defaults to "ip".
+
+        "user" keys the limit on the authenticated user, or the logged in dashboard session, and falls back to the
+        IP when neither is available.
     exempt: Optional[ExemptCallable]
         An awaitable which takes a `starlette.requests.Request` and returns a boolean. If this returns True, the rate
         limit is not applied. Defaults to None.
@@ -147,7 +281,7 @@ def limit(
         limits: RateLimitData = {"rate": rate, "per": per, "bucket": bucket, "exempt": exempt}
 
         if isinstance(coro, _Route):
-            coro._limits = limits
+            coro._set_limits(limits)
         else:
             setattr(coro, "__limits__", limits)
 
@@ -156,6 +290,38 @@ def limit(
     return decorator
 
 
+def cacheable(validator: ValidatorCallable = None, *, control: str = "no-cache") -> T_LimitDecorator:
+    """Decorator which adds conditional GET (ETag/If-None-Match) support to a Route.
+
+    If a validator is passed, it is called with the view and request before the route. When the returned ETag matches
+    the request's If-None-Match header, a 304 is returned without running the route. If no validator is passed, or it
+    returns None, the route is run and a strong ETag is computed from the response body instead.
+
+    Only GET and HEAD requests which return a 200 are considered.
+
+    Parameters
+    ----------
+    validator: Optional[ValidatorCallable]
+        A callable, or coroutine function, which takes the view and a `starlette.requests.Request` and returns an ETag
+        for the current state of the resource, or None. Defaults to None.
+    control: str
+        The Cache-Control header to send with cacheable responses. Defaults to "no-cache", which allows clients to
+        keep the response, but makes them revalidate each time.
+    """
+
+    def decorator(coro: Callable[[Any, Request], ResponseType] | _Route) -> LimitDecorator:
+        data: CacheData = {"validator": validator, "control": control}
+
+        if isinstance(coro, _Route):
+            coro._cacheable = data
+        else:
+            setattr(coro, "__cacheable__", data)
+
+        return coro
+
+    return decorator
+
+
 class View:
     """Class based view for Starlette which allows use of the `core.route` decorator.
 
@@ -244,11 +410,20 @@ class Application(Starlette):
         The base path prefix to add to all view based routes.
     views: Optional[list[View]]
         The views to add to this Application.
+    limiter: Optional[LimiterBackend]
+        The backend used to store rate limits. Defaults to `api.MemoryBackend`.
+    auth: Optional[starlette.authentication.AuthenticationBackend]
+        The backend used to authenticate routes created with ``auth=True``. Defaults to None.
+    mounts: Optional[list[starlette.routing.Mount]]
+        Mounts, E.g. static files, which are served directly, before any middleware.
     """
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self._views: list[View] = []
         self._prefix: str = kwargs.pop("prefix", "")
+        self.limiter: LimiterBackend = kwargs.pop("limiter", None) or MemoryBackend()
+        self.auth_backend: AuthenticationBackend | None = kwargs.pop("auth", None)
+        self._mounts: list[Mount] = kwargs.pop("mounts", [])
         views: list[View] = kwargs.pop("views", [])
 
         super().__init__(*args, **kwargs)  # type: ignore
@@ -256,6 +431,30 @@ class Application(Starlette):
         for view in views:
             self.add_view(view)
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            for mount in self._mounts:
+                match, child = mount.matches(scope)
+
+                if match is Match.FULL:
+                    scope["app"] = self
+                    scope.update(child)
+
+                    # Mounts run outside the ExceptionMiddleware, E.g. StaticFiles raises a 404 for missing files...
+                    try:
+                        await mount.handle(scope, receive, send)
+                    except HTTPException as e:
+                        response: Response
+                        if e.status_code in (204, 304):
+                            response = Response(status_code=e.status_code, headers=e.headers)
+                        else:
+                            response = PlainTextResponse(e.detail, status_code=e.status_code, headers=e.headers)
+
+                        await response(scope, receive, send)
+                    return
+
+        await super().__call__(scope, receive, send)
+
     @property
     def prefix(self) -> str:
         """Returns the Application path prefix if set.
@@ -298,6 +497,7 @@ class Application(Starlette):
 class WebsocketCloseCodes:
     NORMAL: int = 1000
     ABNORMAL: int = 1006
+    TRY_AGAIN_LATER: int = 1013
 
 
 class WebsocketOPCodes:
@@ -15,8 +15,9 @@ limitations under the License.
 
 from __future__ import annotations
 
-import datetime
 import logging
+import time
+from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, ClassVar
 
 
@@ -24,48 +25,199 @@ logger: logging.Logger = logging.getLogger(__name__)
 
 
 if TYPE_CHECKING:
+    import redis.asyncio as redis
+    from redis.commands.core import AsyncScript
+
     from ..types_.limits import TatStore
 
 
+__all__ = ("LimiterBackend", "MemoryBackend", "RateLimit", "RedisBackend", "Store")
+
+
+# How long (in seconds) a key is kept after its TAT has passed, before it is considered stale...
+GRACE: float = 60.0
+
+
 class RateLimit:
+    __slots__ = ("inverse", "period", "rate")
+
     def __init__(self, rate: int, per: int) -> None:
         self.rate: int = rate
-        self.period: datetime.timedelta = datetime.timedelta(seconds=per)
-
-    @property
-    def inverse(self) -> float:
-        return self.period.total_seconds() / self.rate
+        self.period: float = float(per)
+        self.inverse: float = self.period / rate
 
 
 class Store:
+    """In memory GCRA store.
+
+    Timestamps are taken from `time.monotonic` and stored as floats.
+
+    Stale keys are tracked in a timer wheel with one second slots, keyed by the second the key expires in.
+    Each request only visits the slots which have expired since the last request, so inserting, checking and expiring
+    keys are all amortised O(1) regardless of how many keys are currently stored.
+    """
+
     __keys: ClassVar[dict[str, TatStore]] = {}
+    __wheel: ClassVar[dict[int, set[str]]] = {}
+    __cursor: ClassVar[int] = int(time.monotonic())
+
+    @classmethod
+    def get_tat(cls, key: str, /) -> float:
+        now: float = time.monotonic()
+
+        entry: TatStore | None = cls.__keys.get(key)
+        return entry["tat"] if entry else now
 
     @classmethod
-    def get_tat(cls, key: str, /) -> datetime.datetime:
-        now: datetime.datetime = datetime.datetime.now(tz=datetime.UTC)
-        return cls.__keys.get(key, {"tat": now}).get("tat", now)
+    def set_tat(cls, key: str, /, *, tat: float, limit: RateLimit) -> None:
+        slot: int = int(tat + limit.period + GRACE) + 1
+        entry: TatStore | None = cls.__keys.get(key)
+
+        if entry is None:
+            cls.__keys[key] = {"tat": tat, "limit": limit, "slot": slot}
+        else:
+            if entry["slot"] != slot:
+                cls._unschedule(key, entry["slot"])
+
+            entry["tat"] = tat
+            entry["limit"] = limit
+            entry["slot"] = slot
+
+        cls.__wheel.setdefault(slot, set()).add(key)
 
     @classmethod
-    def set_tat(cls, key: str, /, *, tat: datetime.datetime, limit: RateLimit) -> None:
-        cls.__keys[key] = {"tat": tat, "limit": limit}
+    def _unschedule(cls, key: str, slot: int, /) -> None:
+        bucket: set[str] | None = cls.__wheel.get(slot)
+        if bucket is None:
+            return
+
+        bucket.discard(key)
+        if not bucket:
+            del cls.__wheel[slot]
+
+    @classmethod
+    def expire(cls, now: float | None = None) -> int:
+        """Remove all keys whose TAT is older than their period plus the grace period.
+
+        Returns the amount of keys removed.
+        """
+        current: int = int(time.monotonic() if now is None else now)
+        if current < cls.__cursor:
+            return 0
+
+        # When the store has been idle for longer than there are slots, walking the slots directly is cheaper...
+        slots: list[int] | range
+        if current - cls.__cursor > len(cls.__wheel):
+            slots = [s for s in cls.__wheel if s <= current]
+        else:
+            slots = range(cls.__cursor, current + 1)
+
+        removed: int = 0
+        for slot in slots:
+            bucket: set[str] | None = cls.__wheel.pop(slot, None)
+            if not bucket:
+                continue
+
+            for key in bucket:
+                del cls.__keys[key]
+
+            removed += len(bucket)
+
+        cls.__cursor = current + 1
+        return removed
 
     @classmethod
     def update(cls, key: str, limit: RateLimit) -> bool | float:
-        now: datetime.datetime = datetime.datetime.now(tz=datetime.UTC)
-        tat: datetime.datetime = max(cls.get_tat(key), now)
+        now: float = time.monotonic()
 
         # Clear stale keys...
-        for ek, ev in cls.__keys.copy().items():
-            if (now - ev["tat"]).total_seconds() > ev["limit"].period.total_seconds() + 60:
-                del cls.__keys[ek]
+        cls.expire(now)
+
+        entry: TatStore | None = cls.__keys.get(key)
+        tat: float = max(entry["tat"], now) if entry else now
 
-        separation: float = (tat - now).total_seconds()
-        max_interval: float = limit.period.total_seconds() - limit.inverse
+        separation: float = tat - now
+        max_interval: float = limit.period - limit.inverse
 
         if separation > max_interval:
             return separation - max_interval
 
-        new_tat: datetime.datetime = max(tat, now) + datetime.timedelta(seconds=limit.inverse)
-        cls.set_tat(key, tat=new_tat, limit=limit)
-
+        cls.set_tat(key, tat=tat + limit.inverse, limit=limit)
         return False
+
+
+class LimiterBackend(ABC):
+    """Base class for rate limit backends used by the `api.limit` decorator."""
+
+    @abstractmethod
+    async def update(self, key: str, limit: RateLimit) -> bool | float:
+        """Apply a request against the key.
+
+        Returns False if the request is allowed, otherwise the amount of seconds to wait before retrying.
+        """
+        raise NotImplementedError
+
+
+class MemoryBackend(LimiterBackend):
+    """Rate limit backend which keeps limits in process memory, via `Store`.
+
+    Limits are not shared between workers.
+    """
+
+    async def update(self, key: str, limit: RateLimit) -> bool | float:
+        return Store.update(key, limit)
+
+
+# Runs the GCRA check atomically on the server. Time is taken from the Redis server so all workers agree on it.
+# KEYS[1] = key, ARGV[1] = period, ARGV[2] = inverse
+# Returns nil when the request is allowed, otherwise the retry after in seconds, as a string...
+GCRA_SCRIPT: str = """
+local period = tonumber(ARGV[1])
+local inverse = tonumber(ARGV[2])
+
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local tat = tonumber(redis.call("GET", KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local separation = tat - now
+local max_interval = period - inverse
+
+if separation > max_interval then
+    return tostring(separation - max_interval)
+end
+
+local new_tat = tat + inverse
+redis.call("SET", KEYS[1], string.format("%.6f", new_tat), "PX", math.ceil((new_tat - now) * 1000))
+
+return false
+"""
+
+
+class RedisBackend(LimiterBackend):
+    """Rate limit backend which keeps limits in Redis, so they are shared between all API workers.
+
+    Each check is a single script round-trip.
+
+    Parameters
+    ----------
+    pool: redis.asyncio.Redis
+        The Redis client to use. This should be the client already used for sessions.
+    prefix: str
+        The prefix added to all rate limit keys. Defaults to "limits:".
+    """
+
+    def __init__(self, pool: redis.Redis, *, prefix: str = "limits:") -> None:
+        self.pool: redis.Redis = pool
+        self.prefix: str = prefix
+        self.script: AsyncScript = pool.register_script(GCRA_SCRIPT)
+
+    async def update(self, key: str, limit: RateLimit) -> bool | float:
+        retry: bytes | None = await self.script(keys=[f"{self.prefix}{key}"], args=[limit.period, limit.inverse])
+        if retry is None:
+            return False
+
+        return float(retry)
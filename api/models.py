@@ -64,3 +64,35 @@ class FirstRedeemModel(BaseModel):
             "twitch_id": self.twitch_id,
             "timestamp": self.timestamp.isoformat(),
         }
+
+
+class FirstStreakModel(BaseModel):
+    def __init__(self, record: asyncpg.Record) -> None:
+        self.twitch_id: int = record["twitch_id"]
+        self.count: int = record["count"]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "twitch_id": self.twitch_id,
+            "count": self.count,
+        }
+
+
+class QuoteModel(BaseModel):
+    def __init__(self, record: asyncpg.Record) -> None:
+        self.id: int = record["id"]
+        self.content: str = record["content"]
+        self.added_by: int = record["added_by"]
+        self.speaker: int | None = record["speaker"]
+        self.source: str = record["source"]
+        self.created: datetime.datetime = record["created"]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "content": self.content,
+            "added_by": self.added_by,
+            "speaker": self.speaker,
+            "source": self.source,
+            "created": self.created.isoformat(),
+        }
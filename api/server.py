@@ -16,11 +16,12 @@ limitations under the License.
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
+import time
 from typing import TYPE_CHECKING, Any
 
 from starlette.middleware import Middleware
-from starlette.middleware.authentication import AuthenticationMiddleware
 from starlette.middleware.cors import CORSMiddleware
 from starlette.routing import Mount
 from starlette.staticfiles import StaticFiles
@@ -29,8 +30,10 @@ import core
 from middleware import AuthBackend
 from routes import *
 
-from .core import Application, View
-from .sessions import SessionMiddleware
+from .broker import Broker
+from .core import Application, View, WebsocketOPCodes
+from .limiter import LimiterBackend, MemoryBackend, RedisBackend
+from .sessions import SessionMiddleware, Storage
 
 
 if TYPE_CHECKING:
@@ -41,19 +44,50 @@ if TYPE_CHECKING:
 logger: logging.Logger = logging.getLogger(__name__)
 
 
+COALESCED_TOPICS: tuple[str, ...] = ("player_update", "track_start")
+
+
 class Server(Application):
-    def __init__(self, *, database: Database, tbot: core.TwitchBot, dbot: core.DiscordBot) -> None:
+    def __init__(
+        self,
+        *,
+        database: Database,
+        tbot: core.TwitchBot,
+        dbot: core.DiscordBot,
+        http_client: core.HTTPClient,
+    ) -> None:
         self.database = database
         self.tbot = tbot
         self.dbot = dbot
+        self.http_client = http_client
+
+        self.broker: Broker = Broker()
+
+        # Bursts of player changes only need to reach dashboards once...
+        window: float = core.config["API"].get("sse_coalesce_ms", 250) / 1000
+        for topic in COALESCED_TOPICS:
+            self.broker.set_window(topic, window)
 
-        self.htmx_listeners: dict[str, asyncio.Queue] = {}
         self._websocket_listeners: dict[str, WebsocketListener] = {}
 
+        # Sessions and the Redis limiter backend share the same connection pool...
+        self.storage: Storage = Storage()
+
+        limiter: LimiterBackend
+        if core.config["LIMITS"].get("backend", "memory") == "redis":
+            limiter = RedisBackend(self.storage.pool)
+        else:
+            limiter = MemoryBackend()
+
+        self.eventsub: EventSubView = EventSubView(self)
+
+        # Routes created with auth=True authenticate through this, instead of every request in middleware...
+        self.auth: AuthBackend = AuthBackend(self)
+
         views: list[View] = [
             OAuthView(self),
             QuotesView(self),
-            EventSubView(self),
+            self.eventsub,
             MbtiView(self),
             PlayerView(self),
             PlayerDashboardView(self),
@@ -63,20 +97,54 @@ class Server(Application):
         ]
         middleware: list[Middleware] = [
             Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]),
-            Middleware(AuthenticationMiddleware, backend=AuthBackend(self)),
-            Middleware(SessionMiddleware, secret=core.config["API"]["secret"], max_age=core.config["API"]["max_age"]),
+            Middleware(
+                SessionMiddleware,
+                secret=core.config["API"]["secret"],
+                max_age=core.config["API"]["max_age"],
+                storage=self.storage,
+            ),
         ]
 
         super().__init__(
             prefix=core.config["API"]["prefix"],
             views=views,
-            routes=[Mount("/static", app=StaticFiles(directory="web/static"), name="static")],
+            mounts=[Mount("/static", app=StaticFiles(directory="web/static"), name="static")],
             middleware=middleware,
             on_startup=[self.on_ready],
+            limiter=limiter,
+            auth=self.auth,
         )
 
     async def on_ready(self) -> None:
+        await self.eventsub.start()
         logger.info("API Server successfully started!")
 
     async def dispatch_htmx(self, event: str, *, data: dict[str, Any]) -> None:
-        await asyncio.gather(*[queue.put({"event": event, "data": data}) for queue in self.htmx_listeners.values()])
+        self.broker.publish(event, data)
+
+    def dispatch_websockets(self, subscription: str, *, data: dict[str, Any]) -> int:
+        """Queue an event for every websocket listener subscribed to `subscription`.
+
+        The event is serialised once and each connection is sent it by its own writer, so this never waits on
+        websocket I/O. Listeners whose outbox is full are disconnected.
+
+        Returns the amount of listeners the event was queued for.
+        """
+        message: dict[str, Any] = {"op": WebsocketOPCodes.EVENT, "d": {"event": subscription, "data": data}}
+        payload: str = json.dumps(message, separators=(",", ":"))
+        queued_at: float = time.monotonic()
+        queued: int = 0
+
+        for uuid, listener in self._websocket_listeners.items():
+            if subscription not in listener["subscriptions"]:
+                continue
+
+            try:
+                listener["outbox"].put_nowait((queued_at, payload))
+            except asyncio.QueueFull:
+                logger.warning('Websocket "%s" outbox is full. Disconnecting slow listener.', uuid)
+                listener["writer"].cancel()
+            else:
+                queued += 1
+
+        return queued
@@ -74,6 +74,7 @@ class SessionMiddleware:
         max_age: int | None = None,
         same_site: str = "lax",
         secure: bool = True,
+        storage: Storage | None = None,
     ) -> None:
         self.app: ASGIApp = app
         self.name: str = name or "__session_cookie"
@@ -82,7 +83,7 @@ class SessionMiddleware:
         )  # set this if you don't want to invalidate sessions on restart
         self.max_age: int = max_age or (60 * 60 * 24 * 7)  # 7 days; 1 week
         self.signing: itsdangerous.Signer = itsdangerous.Signer(self.secret, digest_method=hashlib.sha256)
-        self.storage: Storage = Storage()
+        self.storage: Storage = storage or Storage()
 
         self.flags: str = f"HttpOnly; SameSite={same_site}; Path=/{'; secure' if secure else ''}"
 
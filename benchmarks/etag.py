@@ -0,0 +1,158 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Measure what a 304 saves over a full 200 on @cacheable routes, in time spent in the app and bytes sent. From the
+repository root run:
+
+    python -m benchmarks.etag
+
+Without a .config.toml, point TIMEBOT_CONFIG at example.config.toml.
+
+Requests are sent straight to the ASGI app, so no network or server overhead is included.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any
+
+from starlette.responses import JSONResponse
+
+from api import Application, View, cacheable, route
+
+
+if TYPE_CHECKING:
+    from starlette.requests import Request
+    from starlette.responses import Response
+    from starlette.types import Message
+
+
+# Roughly the size of a Lavalink track payload, as served by /player/current...
+TRACK: dict[str, Any] = {
+    "encoded": "Q" * 600,
+    "info": {
+        "identifier": "dQw4w9WgXcQ",
+        "isSeekable": True,
+        "author": "Artist",
+        "length": 212000,
+        "isStream": False,
+        "position": 0,
+        "title": "Title " * 10,
+        "uri": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "artworkUrl": "https://i.ytimg.com/vi/dQw4w9WgXcQ/maxresdefault.jpg",
+        "isrc": None,
+        "sourceName": "youtube",
+    },
+    "pluginInfo": {},
+    "userData": {},
+}
+
+
+def version(view: Bench, request: Request) -> str:
+    return f"{request.url.path}-1"
+
+
+class Bench(View):
+    def __init__(self, tracks: int) -> None:
+        self.payload: list[dict[str, Any]] = [TRACK] * tracks
+
+    @route("/validated", methods=["GET"], prefix=False)
+    @cacheable(version)
+    async def validated(self, request: Request) -> Response:
+        return JSONResponse(self.payload)
+
+    @route("/hashed", methods=["GET"], prefix=False)
+    @cacheable()
+    async def hashed(self, request: Request) -> Response:
+        return JSONResponse(self.payload)
+
+
+async def request(app: Application, path: str, etag: str | None = None) -> tuple[int, int, str | None]:
+    """Send a GET to the app. Returns the status, the amount of bytes sent and the ETag."""
+    headers: list[tuple[bytes, bytes]] = [(b"if-none-match", etag.encode())] if etag else []
+    scope: dict[str, Any] = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8000),
+    }
+
+    status: int = 0
+    sent: int = 0
+    tag: str | None = None
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal status, sent, tag
+
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message["headers"]:
+                sent += len(name) + len(value) + 4
+                if name == b"etag":
+                    tag = value.decode()
+        elif message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, sent, tag
+
+
+async def run(tracks: int, requests: int) -> None:
+    app: Application = Application(views=[Bench(tracks)])
+
+    print(f"{tracks} tracks")
+    print(f"{'route':>12} {'status':>6}  {'per request':>12}  {'bytes':>8}")
+
+    for path in ("/validated", "/hashed"):
+        _, _, etag = await request(app, path)
+
+        for label, match in (("200", None), ("304", etag)):
+            status: int = 0
+            sent: int = 0
+
+            started: float = time.perf_counter()
+            for _ in range(requests):
+                status, sent, _ = await request(app, path, match)
+            elapsed: float = time.perf_counter() - started
+
+            assert str(status) == label
+            print(f"{path:>12} {status:>6}  {elapsed / requests * 1_000_000:>10.2f}us  {sent:>8}")
+
+    print()
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark 304s on @cacheable routes.")
+    parser.add_argument("--requests", type=int, default=5_000, help="The amount of requests per case.")
+    args: argparse.Namespace = parser.parse_args()
+
+    for tracks in (1, 50):
+        asyncio.run(run(tracks, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Compare the throughput of the rate limit backends. From the repository root run:
+
+    python -m benchmarks.limiter --redis redis://localhost:6379/15
+
+Without --redis, the Redis backend runs against fakeredis in process. That measures the client and script overhead,
+but not the network round-trip a real server adds. Without a .config.toml, point TIMEBOT_CONFIG at
+example.config.toml.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+import redis.asyncio as redis
+
+from api.limiter import LimiterBackend, MemoryBackend, RateLimit, RedisBackend
+
+
+KEYS: int = 10_000
+LIMIT: RateLimit = RateLimit(60, 60)
+
+
+async def run(backend: LimiterBackend, *, requests: int, concurrency: int) -> float:
+    """Apply `requests` random keys against the backend from `concurrency` tasks. Returns requests per second."""
+    keys: list[str] = [f"127.0.{i // 256}.{i % 256}" for i in range(KEYS)]
+    per_task: int = requests // concurrency
+
+    async def client() -> None:
+        for _ in range(per_task):
+            await backend.update(random.choice(keys), LIMIT)
+
+    started: float = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed: float = time.perf_counter() - started
+
+    return per_task * concurrency / elapsed
+
+
+async def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark the rate limit backends.")
+    parser.add_argument("--redis", help="A Redis URL to benchmark against. The prefix 'bench:' is used for keys.")
+    parser.add_argument("--requests", type=int, default=20_000, help="The amount of requests per case.")
+    args: argparse.Namespace = parser.parse_args()
+
+    pool: redis.Redis
+    if args.redis:
+        pool = redis.Redis.from_url(args.redis)
+        label: str = "redis"
+    else:
+        from fakeredis import FakeAsyncRedis
+
+        pool = FakeAsyncRedis()
+        label = "fakeredis"
+
+    backends: dict[str, LimiterBackend] = {
+        "memory": MemoryBackend(),
+        label: RedisBackend(pool, prefix="bench:"),
+    }
+
+    print(f"{'backend':>10}  {'concurrency':>11}  {'requests/s':>12}")
+    try:
+        for name, backend in backends.items():
+            for concurrency in (1, 50):
+                rate: float = await run(backend, requests=args.requests, concurrency=concurrency)
+                print(f"{name:>10}  {concurrency:>11}  {rate:>12,.0f}")
+    finally:
+        keys: list[bytes] = [key async for key in pool.scan_iter("bench:*")]
+        if keys:
+            await pool.delete(*keys)
+
+        await pool.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Measure the per request cost of the in memory rate limit Store as the amount of stored keys grows. From the repository
+root run:
+
+    python -m benchmarks.store
+
+Without a .config.toml, point TIMEBOT_CONFIG at example.config.toml.
+
+The cost should stay roughly flat from 100 to 1M keys, apart from cache effects.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from api.limiter import RateLimit, Store
+
+
+SIZES: tuple[int, ...] = (100, 10_000, 100_000, 1_000_000)
+LIMIT: RateLimit = RateLimit(60, 60)
+
+
+def reset() -> None:
+    # The Store is process wide, so empty it between runs...
+    getattr(Store, "_Store__keys").clear()
+    getattr(Store, "_Store__wheel").clear()
+
+
+def fill(size: int) -> list[str]:
+    now: float = time.monotonic()
+    keys: list[str] = [f"127.0.{i // 256}.{i % 256}" for i in range(size)]
+
+    # Spread the TATs over the period, so the keys land in different slots of the wheel...
+    for key in keys:
+        Store.set_tat(key, tat=now + random.uniform(0, LIMIT.period), limit=LIMIT)
+
+    return keys
+
+
+def run(size: int, requests: int) -> float:
+    reset()
+    keys: list[str] = fill(size)
+
+    # A mix of known clients and new ones, as the API would see...
+    picks: list[str] = [random.choice(keys) if i % 4 else f"new-{i}" for i in range(requests)]
+
+    started: float = time.perf_counter()
+    for key in picks:
+        Store.update(key, LIMIT)
+    elapsed: float = time.perf_counter() - started
+
+    return elapsed / requests
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark the in memory rate limit Store.")
+    parser.add_argument("--requests", type=int, default=100_000, help="The amount of requests per size.")
+    args: argparse.Namespace = parser.parse_args()
+
+    print(f"{'keys':>10}  {'per request':>12}")
+    for size in SIZES:
+        print(f"{size:>10}  {run(size, args.requests) * 1_000_000:>10.2f}us")
+
+    reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,5 +18,10 @@ from .bots import *
 from .config import config as config
 from .constants import *
 from .data import status_codes as status_codes
+from .http import *
+from .mbti import *
 from .player import Player as Player
+from .speakers import *
+from .tokens import *
+from .users import *
 from .utils import *
@@ -16,14 +16,11 @@ limitations under the License.
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import pathlib
 import random
 from typing import TYPE_CHECKING
-from urllib.parse import quote
 
-import aiohttp
 import discord
 import twitchio
 import wavelink
@@ -31,29 +28,38 @@ from discord.ext import commands
 from twitchio.ext import commands as tcommands
 
 from .config import config
-from .constants import MBTI_TYPES, TIME_GUILD
+from .constants import TIME_GUILD
+from .mbti import MBTICounter
+from .speakers import SpeakerNames
+from .users import UserResolver
 
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Callable, Coroutine
     from typing import Any
 
     import api
     from database import Database
 
+    from .http import HTTPClient
+    from .tokens import TokenStore
+
 logger: logging.Logger = logging.getLogger(__name__)
 
 
 LIVE_ROLE_ID: int = 1182206699969458226
 SUBBED_ROLE_ID: int = 873044115279990836
 
+TWITCH_SHOUTOUTS: str = "https://api.twitch.tv/helix/chat/shoutouts"
+
 
 class DiscordBot(commands.Bot):
     tbot: TwitchBot
     server: api.Server
 
-    def __init__(self, *, database: Database) -> None:
+    def __init__(self, *, database: Database, http_client: HTTPClient) -> None:
         self.database = database
+        self.http_client = http_client
 
         intents: discord.Intents = discord.Intents.default()
         intents.message_content = True
@@ -61,11 +67,17 @@ class DiscordBot(commands.Bot):
         intents.presences = True
 
         self.loaded: bool = False
+        self.mbti: MBTICounter = MBTICounter()
 
         super().__init__(intents=intents, command_prefix=config["DISCORD"]["prefix"])
         self.tree.on_error = self.on_app_command_error
 
     async def on_ready(self) -> None:
+        # Role events may have been missed while disconnected, so this is the only place we count every member...
+        guild: discord.Guild | None = self.get_guild(TIME_GUILD)
+        if guild is not None:
+            self.mbti.recount(guild)
+
         if self.loaded:
             return
 
@@ -77,7 +89,7 @@ class DiscordBot(commands.Bot):
         if config["DEBUG"]["enabled"] is True:
             return
 
-        guild: discord.Guild = self.get_guild(TIME_GUILD)  # type: ignore
+        assert guild
         role: discord.Role = guild.get_role(LIVE_ROLE_ID)  # type: ignore
         subbed: discord.Role = guild.get_role(SUBBED_ROLE_ID)  # type: ignore
 
@@ -164,67 +176,44 @@ class DiscordBot(commands.Bot):
         elif not astream and bstream and role in after.roles:
             await after.remove_roles(role, reason="Stopped streaming on Twitch")
 
-    def mbti_count(self) -> dict[str, int]:
-        guild: discord.Guild | None = self.get_guild(TIME_GUILD)
-        assert guild is not None
+    async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
+        if before.guild.id == TIME_GUILD and before.roles != after.roles:
+            self.mbti.update(before.roles, after.roles)
+
+    async def on_member_join(self, member: discord.Member) -> None:
+        if member.guild.id == TIME_GUILD:
+            self.mbti.add(member)
 
-        roles: Sequence[discord.Role] = guild.roles
-        mbti_dict: dict[str, int] = dict.fromkeys(MBTI_TYPES, 0)
+    async def on_member_remove(self, member: discord.Member) -> None:
+        if member.guild.id == TIME_GUILD:
+            self.mbti.remove(member)
 
-        for role in roles:
-            if role.name in mbti_dict:
-                member_count = len(role.members)
-                mbti_dict[role.name] = member_count
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role) -> None:
+        # Renaming a role changes which members it counts for, which is rare enough to just recount...
+        if before.guild.id == TIME_GUILD and before.name != after.name:
+            self.mbti.recount(after.guild)
 
-        return mbti_dict
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        if role.guild.id == TIME_GUILD and role.name in self.mbti.counts:
+            self.mbti.recount(role.guild)
 
 
 class TwitchBot(tcommands.Bot):
     server: api.Server
 
-    def __init__(self, *, dbot: DiscordBot, database: Database) -> None:
+    def __init__(self, *, dbot: DiscordBot, database: Database, http_client: HTTPClient, tokens: TokenStore) -> None:
         self.dbot = dbot
         self.database = database
+        self.http_client = http_client
+        self.tokens = tokens
+        self.resolver: UserResolver = UserResolver(self)
+        self.speakers: SpeakerNames = SpeakerNames(self)
 
         config_ = config["TWITCH"]
         super().__init__(token=config_["token"], prefix=config_["prefix"], initial_channels=config_["channels"])
 
         self.loaded: bool = False
-
-    async def refresh_token(self, refresh: str) -> str | None:
-        client_id: str = config["TWITCH"]["client_id"]
-        client_secret: str = config["TWITCH"]["client_secret"]
-
-        url = (
-            "https://id.twitch.tv/oauth2/token?"
-            "grant_type=refresh_token&"
-            f"refresh_token={quote(refresh)}&"
-            f"client_id={client_id}&"
-            f"client_secret={client_secret}"
-        )
-
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url) as resp:
-                if resp.status != 200:
-                    logger.warning("Unable to refresh token: %s", resp.status)
-                    return None
-
-                data: dict[str, Any] = await resp.json()
-                access: str = data["access_token"]
-                new_refresh: str = data["refresh_token"]
-
-        with open(".secrets.json", "r+") as fp:
-            current: dict[str, str] = json.load(fp)
-
-            current["token"] = access
-            current["refresh"] = new_refresh
-
-            fp.seek(0)
-            json.dump(current, fp=fp)
-            fp.truncate()
-
-        logger.info("Refreshed token successfully.")
-        return new_refresh
+        self._loaded_event: asyncio.Event = asyncio.Event()
 
     async def event_ready(self) -> None:
         logger.info(f"Logged into Twitch IRC as {self.nick}")
@@ -237,8 +226,34 @@ class TwitchBot(tcommands.Bot):
                 self.load_module(extension)
 
             self.loaded = True
+            self._loaded_event.set()
             logger.info("Loaded extensions for Twitch Bot.")
 
+            await self.speakers.start()
+
+    async def wait_until_loaded(self) -> None:
+        """Wait until the Twitch extensions have been loaded, which happens the first time the bot is ready."""
+        await self._loaded_event.wait()
+
+    async def handle_event(self, event_name: str, *args: Any) -> None:
+        """Run every handler of a custom event and wait for them to finish.
+
+        Unlike `run_event`, exceptions raised by the handlers are propagated to the caller, instead of being dispatched
+        to `event_error`. Raises RuntimeError when nothing handles the event, E.g. when an extension failed to load.
+        """
+        name: str = f"event_{event_name}"
+        handlers: list[Callable[..., Coroutine[Any, Any, Any]]] = []
+
+        handler: Callable[..., Coroutine[Any, Any, Any]] | None = getattr(self, name, None)
+        if handler is not None:
+            handlers.append(handler)
+
+        handlers.extend(self._events.get(name, []))
+        if not handlers:
+            raise RuntimeError(f"No handlers are registered for the '{event_name}' event.")
+
+        await asyncio.gather(*(handler(*args) for handler in handlers))
+
     async def event_command_error(self, context: tcommands.Context, error: Exception) -> None:
         if isinstance(error, tcommands.CommandNotFound):
             return
@@ -246,37 +261,29 @@ class TwitchBot(tcommands.Bot):
         logger.exception(error)
 
     async def send_shoutout(self, payload: dict[str, str], refreshed: bool = False) -> None:
-        # This kinda sucks, but due to the fact this can change when linking accounts, we need to re open the JSON...
-        with open(".secrets.json") as fp:
-            json_: dict[str, Any] = json.load(fp)
+        token: str = self.tokens.token
 
-        headers: dict[str, str] = {
-            "Authorization": f"Bearer {json_['token']}",
-            "Client-Id": json_["client_id"],
-        }
+        async with self.http_client.post(url=TWITCH_SHOUTOUTS, json=payload, headers=self.tokens.headers) as resp:
+            status: int = resp.status
 
-        url: str = "https://api.twitch.tv/helix/chat/shoutouts"
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url=url, json=payload, headers=headers) as resp:
-                if resp.status == 401:
-                    if refreshed:
-                        logger.warning("Unable to send shoutout due to missing scopes.")
-                        return
+        if status == 401:
+            if refreshed:
+                logger.warning("Unable to send shoutout due to missing scopes.")
+                return
 
-                    new: str | None = await self.refresh_token(json_["refresh"])
-                    if new:
-                        return await self.send_shoutout(payload=payload, refreshed=True)
+            # Concurrent 401s share a single refresh, then each caller retries once...
+            if await self.tokens.refresh(stale=token):
+                return await self.send_shoutout(payload=payload, refreshed=True)
 
-                elif resp.status >= 300:
-                    logger.warning("Unable to send shoutout: %s", resp.status)
+        elif status >= 300:
+            logger.warning("Unable to send shoutout: %s", status)
 
     async def event_time_raid(self, from_id: str, viewers: int) -> None:
-        users: list[twitchio.User] = await self.fetch_users(names=["timeenjoyed"])
-        if not users:
+        time: twitchio.User | None = await self.resolver.fetch_user(name="timeenjoyed")
+        if not time:
             logger.warning("Unable to fetch TimeEnjoyed for raid notifications.")
             return
 
-        time: twitchio.User = users[0]
         if not time.channel:
             logger.warning("Unable to fetch TimeEnjoyed from channel cache for raid notifications.")
             return
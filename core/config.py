@@ -15,6 +15,7 @@ limitations under the License.
 
 from __future__ import annotations
 
+import os
 import tomllib
 from typing import TYPE_CHECKING
 
@@ -23,5 +24,6 @@ if TYPE_CHECKING:
     from types_.config import Config
 
 
-with open(".config.toml", "rb") as fp:
+# TIMEBOT_CONFIG allows running with another config, E.g. the example config when running the tests...
+with open(os.environ.get("TIMEBOT_CONFIG", ".config.toml"), "rb") as fp:
     config: Config = tomllib.load(fp)  # type: ignore
@@ -1,7 +1,9 @@
+import re
+
 from .config import config
 
 
-__all__ = ("MBTI_TYPES", "TIMEZONES", "TIME_GUILD")
+__all__ = ("MBTI_TYPES", "TIMEZONES", "TIME_GUILD", "TWITCH_LOGIN")
 
 
 MBTI_TYPES: list[str] = [
@@ -39,3 +41,6 @@ TIMEZONES: list[str] = [
 
 
 TIME_GUILD: int = config["GENERAL"]["guild_id"]
+
+# Twitch logins are 1 to 25 letters, digits or underscores...
+TWITCH_LOGIN: re.Pattern[str] = re.compile(r"[A-Za-z0-9_]{1,25}")
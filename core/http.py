@@ -0,0 +1,182 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import collections
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Self
+
+import aiohttp
+
+
+if TYPE_CHECKING:
+    from types import SimpleNamespace
+
+    from aiohttp.client import _RequestContextManager
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+__all__ = ("HTTPClient", "HostStats")
+
+
+class HostStats:
+    """Request counters for a single host.
+
+    requests
+        The amount of completed requests, including those which raised.
+    failures
+        The amount of requests which raised, E.g. on a connection error or timeout.
+    in_flight
+        The amount of requests currently waiting on a response.
+    total
+        The total time in seconds spent waiting on responses.
+    slowest
+        The slowest response time in seconds.
+    """
+
+    __slots__ = ("failures", "in_flight", "requests", "slowest", "total")
+
+    def __init__(self) -> None:
+        self.requests: int = 0
+        self.failures: int = 0
+        self.in_flight: int = 0
+        self.total: float = 0.0
+        self.slowest: float = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"HostStats: requests={self.requests}, failures={self.failures}, in_flight={self.in_flight}, "
+            f"average={self.average * 1000:.1f}ms, slowest={self.slowest * 1000:.1f}ms"
+        )
+
+    @property
+    def average(self) -> float:
+        return self.total / self.requests if self.requests else 0.0
+
+    def record(self, elapsed: float, *, failed: bool = False) -> None:
+        self.in_flight -= 1
+        self.requests += 1
+        self.failures += failed
+        self.total += elapsed
+        self.slowest = max(self.slowest, elapsed)
+
+
+class HTTPClient:
+    """Application wide pooled HTTP client for outbound requests to Twitch and Discord.
+
+    Connections are kept alive and reused, DNS lookups are cached and connections per host are limited.
+    Latency and in-flight requests are recorded per host in `HTTPClient.stats`.
+
+    This should be created once, with `async with`, and shared.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        dns_ttl: int = 300,
+        keepalive: float = 30.0,
+        timeout: float = 30.0,
+    ) -> None:
+        self.limit: int = limit
+        self.limit_per_host: int = limit_per_host
+        self.dns_ttl: int = dns_ttl
+        self.keepalive: float = keepalive
+        self.timeout: float = timeout
+
+        self.stats: collections.defaultdict[str, HostStats] = collections.defaultdict(HostStats)
+        self._session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> Self:
+        self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The underlying session, for libraries which need one, E.g. `discord.Webhook.from_url`."""
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HTTPClient has not been started.")
+
+        return self._session
+
+    def start(self) -> None:
+        if self._session and not self._session.closed:
+            return
+
+        connector: aiohttp.TCPConnector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_ttl,
+            keepalive_timeout=self.keepalive,
+        )
+
+        trace: aiohttp.TraceConfig = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_request_end.append(self._on_request_end)
+        trace.on_request_exception.append(self._on_request_exception)
+
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[trace],
+        )
+
+    async def close(self) -> None:
+        if self._session is None:
+            return
+
+        await self._session.close()
+        self._session = None
+
+        for host, stats in self.stats.items():
+            logger.info("HTTP %s: %r", host, stats)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> _RequestContextManager:
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> _RequestContextManager:
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> _RequestContextManager:
+        return self.session.post(url, **kwargs)
+
+    def patch(self, url: str, **kwargs: Any) -> _RequestContextManager:
+        return self.session.patch(url, **kwargs)
+
+    async def _on_request_start(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: aiohttp.TraceRequestStartParams
+    ) -> None:
+        context.host = params.url.host or ""
+        context.started = time.perf_counter()
+
+        self.stats[context.host].in_flight += 1
+
+    async def _on_request_end(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: aiohttp.TraceRequestEndParams
+    ) -> None:
+        self.stats[context.host].record(time.perf_counter() - context.started)
+
+    async def _on_request_exception(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: aiohttp.TraceRequestExceptionParams
+    ) -> None:
+        self.stats[context.host].record(time.perf_counter() - context.started, failed=True)
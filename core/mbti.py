@@ -0,0 +1,102 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import json
+import secrets
+from typing import TYPE_CHECKING
+
+from .constants import MBTI_TYPES
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    import discord
+
+
+__all__ = ("MBTICounter",)
+
+
+class MBTICounter:
+    """Member counts of each MBTI role, kept up to date from member and role events.
+
+    Only a full recount walks the member cache. Every other change adjusts the counts by the roles which were added or
+    removed, and bumps `version`, which together with a per process `epoch` identifies the current counts.
+    """
+
+    __slots__ = ("_body", "counts", "epoch", "version")
+
+    def __init__(self) -> None:
+        self.counts: dict[str, int] = dict.fromkeys(MBTI_TYPES, 0)
+
+        # Versions restart with the process, so the epoch keeps ETags from an earlier run from matching...
+        self.epoch: str = secrets.token_hex(4)
+        self.version: int = 0
+
+        self._body: bytes | None = None
+
+    def __repr__(self) -> str:
+        return f"MBTICounter: version={self.version}, total={sum(self.counts.values())}"
+
+    @property
+    def etag(self) -> str:
+        return f"mbti-{self.epoch}-{self.version}"
+
+    @property
+    def body(self) -> bytes:
+        """The counts serialised as JSON, reused until the counts change."""
+        if self._body is None:
+            self._body = json.dumps(self.counts, separators=(",", ":")).encode("utf-8")
+
+        return self._body
+
+    def _changed(self) -> None:
+        self.version += 1
+        self._body = None
+
+    def recount(self, guild: discord.Guild, /) -> None:
+        counts: dict[str, int] = dict.fromkeys(MBTI_TYPES, 0)
+
+        for member in guild.members:
+            for name in {role.name for role in member.roles if role.name in counts}:
+                counts[name] += 1
+
+        if counts != self.counts:
+            self.counts = counts
+            self._changed()
+
+    def update(self, before: Iterable[discord.Role], after: Iterable[discord.Role], /) -> None:
+        """Adjust the counts for a member whose roles changed from `before` to `after`."""
+        removed: set[str] = {role.name for role in before if role.name in self.counts}
+        added: set[str] = {role.name for role in after if role.name in self.counts}
+
+        if removed == added:
+            return
+
+        for name in removed - added:
+            self.counts[name] -= 1
+
+        for name in added - removed:
+            self.counts[name] += 1
+
+        self._changed()
+
+    def add(self, member: discord.Member, /) -> None:
+        self.update((), member.roles)
+
+    def remove(self, member: discord.Member, /) -> None:
+        self.update(member.roles, ())
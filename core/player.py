@@ -13,6 +13,9 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import itertools
+import secrets
+from collections.abc import Iterator
 from typing import Any
 
 import discord
@@ -22,6 +25,12 @@ import wavelink
 __all__ = ("Player",)
 
 
+# Shared between all players, so a version is never reused when a player is replaced...
+_versions: Iterator[int] = itertools.count(1)
+# Versions restart with the process, so the epoch keeps ETags from an earlier run from matching...
+_epoch: str = secrets.token_hex(4)
+
+
 class Player(wavelink.Player):
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
@@ -29,12 +38,37 @@ class Player(wavelink.Player):
         self.approvals: dict[str, dict[str, Any]] = {}
         self.thread: discord.Thread | None = None
 
+        self.version: int = next(_versions)
+
+    def bump(self) -> int:
+        """Mark the player state (current track, queues, history or approvals) as changed.
+
+        Anything rendered from the player state can be cached against `Player.version`.
+        """
+        self.version = next(_versions)
+        return self.version
+
+    @property
+    def version_tag(self) -> str:
+        """The version, unique across restarts, for use in ETags."""
+        return f"{_epoch}-{self.version}"
+
     async def remove_approval(self, id_: str) -> None:
         self.approvals.pop(id_, None)
+        self.bump()
+
         await self.client.server.dispatch_htmx("player_update", data={"player": self})  # type: ignore
 
     async def add_approval(self, id_: str, data: dict[str, Any]) -> None:
         self.approvals[id_] = data
+        self.bump()
+
+        await self.client.server.dispatch_htmx("player_update", data={"player": self})  # type: ignore
+
+    async def enqueue(self, track: wavelink.Playable) -> None:
+        self.queue.put(track)
+        self.bump()
+
         await self.client.server.dispatch_htmx("player_update", data={"player": self})  # type: ignore
 
     def ms_to_hr(self, milli: int) -> str:
@@ -0,0 +1,184 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import time
+from typing import TYPE_CHECKING
+
+import discord
+
+from .constants import TIME_GUILD
+
+
+if TYPE_CHECKING:
+    import twitchio
+
+    from .bots import TwitchBot
+
+    SpeakerKey = tuple[str, int]
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+__all__ = ("SpeakerNames",)
+
+
+class SpeakerNames:
+    """Display names of quote speakers, on Twitch and Discord, persisted in the database.
+
+    Names are loaded once on start and served from memory. A background job refreshes every name older than
+    `stale_after` in one batch every `interval` seconds, so replying with a quote never needs an API request.
+
+    Speakers which can't be resolved, E.g. deleted accounts, are not looked up again on demand for `miss_ttl`
+    seconds. The background job keeps retrying them.
+    """
+
+    def __init__(
+        self,
+        bot: TwitchBot,
+        *,
+        interval: float = 3600.0,
+        stale_after: datetime.timedelta = datetime.timedelta(days=1),
+        miss_ttl: float = 3600.0,
+    ) -> None:
+        self.bot = bot
+        self.interval: float = interval
+        self.stale_after: datetime.timedelta = stale_after
+        self.miss_ttl: float = miss_ttl
+
+        self._names: dict[SpeakerKey, str] = {}
+        # Monotonic time until which an unresolvable speaker is not looked up on demand...
+        self._unresolved: dict[SpeakerKey, float] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def __repr__(self) -> str:
+        return f"SpeakerNames: names={len(self._names)}, unresolved={len(self._unresolved)}"
+
+    @staticmethod
+    def platform(source: str) -> str:
+        """The platform a quote's speaker ID belongs to. Quotes from anywhere other than Discord were on Twitch."""
+        return "discord" if source == "discord" else "twitch"
+
+    def get(self, source: str, speaker: int) -> str | None:
+        return self._names.get((self.platform(source), speaker))
+
+    async def add(self, source: str, speaker: int, name: str) -> None:
+        """Store a speaker's name, E.g. when a quote is added and the name is already known."""
+        key: SpeakerKey = (self.platform(source), speaker)
+        if self._names.get(key) == name:
+            return
+
+        self._names[key] = name
+        self._unresolved.pop(key, None)
+        await self.bot.database.set_speaker_names({key: name})
+
+    async def fetch_name(self, source: str, speaker: int) -> str | None:
+        """Returns the speaker's name, only resolving it if it has never been stored, E.g. before the first refresh."""
+        name: str | None = self.get(source, speaker)
+        if name is not None:
+            return name
+
+        key: SpeakerKey = (self.platform(source), speaker)
+        if self._unresolved.get(key, 0.0) > time.monotonic():
+            return None
+
+        names: dict[SpeakerKey, str] = await self._resolve([key])
+
+        if names:
+            self._names.update(names)
+            await self.bot.database.set_speaker_names(names)
+
+        return names.get(key)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresher())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def refresh(self) -> int:
+        """Resolve and store the name of every speaker with a missing or stale name. Returns the amount refreshed."""
+        stale: list[SpeakerKey] = await self.bot.database.fetch_stale_speakers(self.stale_after)
+        if not stale:
+            return 0
+
+        names: dict[SpeakerKey, str] = await self._resolve(stale)
+
+        self._names.update(names)
+        await self.bot.database.set_speaker_names(names)
+
+        logger.info("Refreshed %s of %s stale quote speaker names.", len(names), len(stale))
+        return len(names)
+
+    async def _resolve(self, keys: list[SpeakerKey]) -> dict[SpeakerKey, str]:
+        names: dict[SpeakerKey, str] = {}
+
+        twitch: list[int] = [speaker for platform, speaker in keys if platform == "twitch"]
+        discord_: list[int] = [speaker for platform, speaker in keys if platform == "discord"]
+
+        # The resolver merges these lookups into as few Helix requests as possible...
+        users: list[twitchio.User | BaseException | None] = await asyncio.gather(
+            *(self.bot.resolver.fetch_user(user_id=speaker) for speaker in twitch), return_exceptions=True
+        )
+
+        for speaker, user in zip(twitch, users, strict=True):
+            if user is not None and not isinstance(user, BaseException):
+                names["twitch", speaker] = user.display_name
+
+        guild: discord.Guild | None = self.bot.dbot.get_guild(TIME_GUILD)
+
+        for speaker in discord_:
+            member: discord.User | discord.Member | None = guild.get_member(speaker) if guild else None
+
+            # Members who have left the guild are fetched one at a time, which is fine in the background...
+            if member is None:
+                try:
+                    member = await self.bot.dbot.fetch_user(speaker)
+                except discord.HTTPException as e:
+                    logger.debug("Unable to fetch Discord quote speaker %s: %s", speaker, e)
+                    continue
+
+            names["discord", speaker] = member.display_name
+
+        expires: float = time.monotonic() + self.miss_ttl
+        for key in keys:
+            if key in names:
+                self._unresolved.pop(key, None)
+            else:
+                self._unresolved[key] = expires
+
+        return names
+
+    async def _refresher(self) -> None:
+        try:
+            self._names.update(await self.bot.database.fetch_speaker_names())
+        except Exception as e:
+            logger.warning("Unable to load quote speaker names: %s", e)
+
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("Unable to refresh quote speaker names: %s", e)
+
+            await asyncio.sleep(self.interval)
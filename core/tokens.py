@@ -0,0 +1,244 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, Self
+from urllib.parse import quote
+
+from .config import config
+
+
+if TYPE_CHECKING:
+    from .http import HTTPClient
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+__all__ = ("TokenStore",)
+
+
+TWITCH_TOKEN: str = "https://id.twitch.tv/oauth2/token"
+TWITCH_VALIDATE: str = "https://id.twitch.tv/oauth2/validate"
+
+# Tokens are refreshed this many seconds before they expire...
+REFRESH_MARGIN: float = 300.0
+# Twitch requires tokens to be validated at least once an hour...
+VALIDATE_INTERVAL: float = 3600.0
+# The shortest time between attempts, so a failing refresh isn't retried in a tight loop...
+MIN_DELAY: float = 30.0
+
+
+class TokenStore:
+    """In memory store for the broadcaster's Twitch credentials.
+
+    Credentials are read from disk once on start. Changes are written back atomically, off the event loop, by
+    writing a temporary file and renaming it over the original.
+
+    While started, the token is validated hourly and refreshed shortly before it expires.
+    """
+
+    def __init__(self, path: str | os.PathLike[str] = ".secrets.json", *, http_client: HTTPClient) -> None:
+        self.path: pathlib.Path = pathlib.Path(path)
+        self.http_client = http_client
+
+        self.token: str = ""
+        self.refresh_token: str = ""
+        self.client_id: str = ""
+        self.expires_at: float | None = None
+
+        self._task: asyncio.Task[None] | None = None
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._refreshing: asyncio.Task[bool] | None = None
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}", "Client-Id": self.client_id}
+
+    async def start(self) -> None:
+        self.load()
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresher())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def load(self) -> None:
+        try:
+            with self.path.open() as fp:
+                data: dict[str, str] = json.load(fp)
+        except FileNotFoundError:
+            logger.warning(
+                "No broadcaster credentials found at %s. Link the broadcaster account to add them.", self.path
+            )
+            return
+
+        self.token = data.get("token", "")
+        self.refresh_token = data.get("refresh", "")
+        self.client_id = data.get("client_id", "")
+
+    def _write(self, data: dict[str, str]) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "w") as fp:
+                json.dump(data, fp=fp)
+                fp.flush()
+                os.fsync(fp.fileno())
+
+            pathlib.Path(tmp).replace(self.path)
+        except BaseException:
+            pathlib.Path(tmp).unlink(missing_ok=True)
+            raise
+
+    async def update(
+        self,
+        *,
+        token: str,
+        refresh: str,
+        client_id: str | None = None,
+        expires_in: float | None = None,
+    ) -> None:
+        """Replace the stored credentials and persist them."""
+        self.token = token
+        self.refresh_token = refresh
+        self.client_id = client_id or self.client_id
+        self.expires_at = time.monotonic() + expires_in if expires_in else None
+
+        data: dict[str, str] = {"token": self.token, "refresh": self.refresh_token, "client_id": self.client_id}
+        await asyncio.to_thread(self._write, data)
+
+        # Reschedule the next refresh for the new expiry...
+        self._wakeup.set()
+
+    async def validate(self) -> bool:
+        """Validate the current token with Twitch, updating when it expires. Returns whether the token is valid."""
+        if not self.token:
+            return False
+
+        async with self.http_client.get(TWITCH_VALIDATE, headers={"Authorization": f"OAuth {self.token}"}) as resp:
+            if resp.status != 200:
+                logger.info("Broadcaster token is no longer valid: %s", resp.status)
+                return False
+
+            data: dict[str, Any] = await resp.json()
+
+        self.client_id = data.get("client_id", self.client_id)
+        self.expires_at = time.monotonic() + data["expires_in"] if data.get("expires_in") else None
+        return True
+
+    async def refresh(self, *, stale: str | None = None) -> bool:
+        """Refresh the broadcaster token. Returns whether the refresh succeeded.
+
+        Only one refresh runs at a time; concurrent callers wait on the refresh already in flight. Twitch invalidates
+        the old refresh token when refreshing, so refreshing twice at once would leave us with an unusable token.
+
+        Parameters
+        ----------
+        stale: Optional[str]
+            The token the caller was rejected with. If the token has been replaced since, no refresh is made and
+            the caller can retry straight away.
+        """
+        if stale is not None and stale != self.token:
+            return True
+
+        if self._refreshing is None:
+            self._refreshing = asyncio.create_task(self._refresh())
+            self._refreshing.add_done_callback(self._refreshed)
+
+        # Shielded, so a cancelled caller doesn't cancel the refresh for everyone else...
+        try:
+            return await asyncio.shield(self._refreshing)
+        except Exception:
+            # Logged once in TokenStore._refreshed...
+            return False
+
+    def _refreshed(self, task: asyncio.Task[bool], /) -> None:
+        self._refreshing = None
+
+        if not task.cancelled() and task.exception():
+            logger.warning("Unable to refresh token: %s", task.exception())
+
+    async def _refresh(self) -> bool:
+        if not self.refresh_token:
+            return False
+
+        client_id: str = config["TWITCH"]["client_id"]
+        client_secret: str = config["TWITCH"]["client_secret"]
+
+        url = (
+            f"{TWITCH_TOKEN}?"
+            "grant_type=refresh_token&"
+            f"refresh_token={quote(self.refresh_token)}&"
+            f"client_id={client_id}&"
+            f"client_secret={client_secret}"
+        )
+
+        async with self.http_client.post(url) as resp:
+            if resp.status != 200:
+                logger.warning("Unable to refresh token: %s", resp.status)
+                return False
+
+            data: dict[str, Any] = await resp.json()
+
+        await self.update(token=data["access_token"], refresh=data["refresh_token"], expires_in=data.get("expires_in"))
+
+        logger.info("Refreshed token successfully.")
+        return True
+
+    async def _refresher(self) -> None:
+        next_validate: float = 0.0
+
+        while True:
+            now: float = time.monotonic()
+
+            try:
+                if self.expires_at is not None and self.expires_at - now <= REFRESH_MARGIN:
+                    await self.refresh()
+                elif self.token and now >= next_validate:
+                    next_validate = now + VALIDATE_INTERVAL
+
+                    if not await self.validate():
+                        await self.refresh()
+            except Exception as e:
+                logger.warning("Unable to validate or refresh broadcaster token: %s", e)
+
+            delay: float = next_validate - time.monotonic() if self.token else VALIDATE_INTERVAL
+            if self.expires_at is not None:
+                delay = min(delay, self.expires_at - time.monotonic() - REFRESH_MARGIN)
+
+            # Storing new credentials wakes us early, so the next refresh is scheduled from the new expiry...
+            self._wakeup.clear()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, MIN_DELAY))
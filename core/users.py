@@ -0,0 +1,173 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    import twitchio
+
+    from .bots import TwitchBot
+
+    UserKey = tuple[str, str]
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+__all__ = ("UserResolver",)
+
+
+# Helix accepts at most 100 IDs and logins, combined, per request...
+MAX_BATCH: int = 100
+# Expired users are only removed once this many are cached...
+MAX_CACHED: int = 10_000
+
+
+class UserResolver:
+    """Cached, batched lookups of Twitch users by ID or login.
+
+    Users are cached by both ID and login for `ttl` seconds. Lookups which miss the cache are collected for `window`
+    seconds and then fetched together, in as few Helix requests as possible. Concurrent lookups of the same user
+    share a single request.
+    """
+
+    def __init__(self, bot: TwitchBot, *, ttl: float = 3600.0, window: float = 0.05) -> None:
+        self.bot = bot
+        self.ttl: float = ttl
+        self.window: float = window
+
+        self._cache: dict[UserKey, tuple[float, twitchio.User]] = {}
+        self._pending: dict[UserKey, asyncio.Future[twitchio.User | None]] = {}
+        self._flushing: bool = False
+        self._tasks: set[asyncio.Task[None]] = set()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.requests: int = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"UserResolver: cached={len(self._cache)}, hits={self.hits}, misses={self.misses}, requests={self.requests}"
+        )
+
+    @staticmethod
+    def _key(*, user_id: int | str | None = None, name: str | None = None) -> UserKey:
+        if user_id is not None:
+            return ("id", str(user_id))
+
+        if name is not None:
+            return ("login", name.removeprefix("@").lower())
+
+        raise TypeError("Either an id or a name is required.")
+
+    def get(self, *, user_id: int | str | None = None, name: str | None = None) -> twitchio.User | None:
+        """Returns a cached user, if it has not expired, without making any requests."""
+        key: UserKey = self._key(user_id=user_id, name=name)
+        cached: tuple[float, twitchio.User] | None = self._cache.get(key)
+
+        if cached is None:
+            return None
+
+        if cached[0] < time.monotonic():
+            del self._cache[key]
+            return None
+
+        return cached[1]
+
+    def add(self, user: twitchio.User, /) -> None:
+        now: float = time.monotonic()
+        expires: float = now + self.ttl
+
+        if len(self._cache) >= MAX_CACHED:
+            self._cache = {key: value for key, value in self._cache.items() if value[0] >= now}
+
+            # Entries are inserted in expiry order, so if that wasn't enough the oldest go first...
+            while len(self._cache) >= MAX_CACHED:
+                del self._cache[next(iter(self._cache))]
+
+        for key in (("id", str(user.id)), ("login", user.name.lower())):
+            self._cache.pop(key, None)
+            self._cache[key] = (expires, user)
+
+    async def fetch_user(self, *, user_id: int | str | None = None, name: str | None = None) -> twitchio.User | None:
+        """Fetch a user by ID or login, from the cache if possible. Returns None if the user does not exist."""
+        user: twitchio.User | None = self.get(user_id=user_id, name=name)
+        if user is not None:
+            self.hits += 1
+            return user
+
+        self.misses += 1
+        key: UserKey = self._key(user_id=user_id, name=name)
+
+        future: asyncio.Future[twitchio.User | None] | None = self._pending.get(key)
+        if future is None:
+            future = self._pending[key] = asyncio.get_running_loop().create_future()
+
+            if not self._flushing:
+                self._flushing = True
+                asyncio.get_running_loop().call_later(self.window, self._flush)
+
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        self._flushing = False
+
+        pending: dict[UserKey, asyncio.Future[twitchio.User | None]] = self._pending
+        self._pending = {}
+
+        keys: list[UserKey] = list(pending)
+        for index in range(0, len(keys), MAX_BATCH):
+            batch: dict[UserKey, asyncio.Future[twitchio.User | None]] = {
+                key: pending[key] for key in keys[index : index + MAX_BATCH]
+            }
+            task: asyncio.Task[None] = asyncio.create_task(self._fetch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: dict[UserKey, asyncio.Future[twitchio.User | None]], /) -> None:
+        ids: list[int] = [int(value) for kind, value in batch if kind == "id"]
+        names: list[str] = [value for kind, value in batch if kind == "login"]
+
+        self.requests += 1
+
+        try:
+            users: list[twitchio.User] = await self.bot.fetch_users(ids=ids, names=names, force=True)
+        except Exception as e:
+            logger.warning("Unable to fetch %s Twitch users: %s", len(batch), e)
+
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for user in users:
+            self.add(user)
+
+            for key in (("id", str(user.id)), ("login", user.name.lower())):
+                future: asyncio.Future[twitchio.User | None] | None = batch.get(key)
+
+                if future is not None and not future.done():
+                    future.set_result(user)
+
+        # Anything left over doesn't exist on Twitch...
+        for future in batch.values():
+            if not future.done():
+                future.set_result(None)
@@ -13,21 +13,51 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import datetime
+import json
+import logging
 import secrets
+from collections.abc import Callable
 from typing import Any, Self
 
 import asyncpg
 
 import core
-from api import FirstRedeemModel, UserModel, generate_id, generate_token
+from api import FirstRedeemModel, FirstStreakModel, UserModel, generate_id, generate_token
+
+from . import queries as q
+from .cache import CachedQuote, QuoteCache
+from .migrate import migrate
+from .queries import QUERIES, Query, QueryRegistry
 
 
 __all__ = ("Database",)
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
+
 class Database:
     pool: asyncpg.Pool | None = None
 
+    def __init__(self) -> None:
+        self.queries: QueryRegistry = QUERIES
+        self.quotes: QuoteCache = QuoteCache()
+        self._user_listeners: list[Callable[[UserModel], None]] = []
+
+    def add_user_listener(self, callback: Callable[[UserModel], None], /) -> None:
+        """Add a callback which is called with the user whenever a user is created or updated, E.g. to invalidate
+        caches.
+        """
+        self._user_listeners.append(callback)
+
+    def _dispatch_user(self, user: UserModel, /) -> None:
+        for callback in self._user_listeners:
+            try:
+                callback(user)
+            except Exception as e:
+                logger.exception("User listener raised an exception: %s", e)
+
     async def __aenter__(self) -> Self:
         await self.setup()
         return self
@@ -36,38 +66,56 @@ class Database:
         if self.pool:
             await self.pool.close()
 
+        self.queries.report()
+        logger.info("%r", self.quotes)
+
     async def setup(self) -> Self:
-        self.pool = await asyncpg.create_pool(dsn=core.config["DATABASE"]["dsn"])
+        dsn: str = core.config["DATABASE"]["dsn"]
+
+        # Migrated before the pool is created, as pooled connections prepare every query against the schema...
+        connection: asyncpg.Connection = await asyncpg.connect(dsn=dsn)
+        try:
+            await migrate(connection)
+        finally:
+            await connection.close()
+
+        self.pool = await asyncpg.create_pool(dsn=dsn, init=self.queries.prepare)
         assert self.pool
 
-        async with self.pool.acquire() as connection:
-            with open("SCHEMA.sql") as schema:
-                await connection.execute(schema.read())
+        if not await self.fetch_streak():
+            await self.rebuild_streak()
 
         return self
 
-    async def create_state(self, *, discord_id: int, moderator: bool = False) -> str:
+    async def fetchrow(self, query: Query, *args: Any) -> asyncpg.Record | None:
+        """Run a single registered statement on any pooled connection and return the first row."""
         assert self.pool
 
-        query: str = """
-        INSERT INTO state(code, discord_id, moderator)
-        VALUES ($1, $2, $3)
-        ON CONFLICT (discord_id) DO UPDATE
-        SET code = $1
-        """
+        with query.timed():
+            return await self.pool.fetchrow(query.sql, *args)
+
+    async def fetch(self, query: Query, *args: Any) -> list[asyncpg.Record]:
+        """Run a single registered statement on any pooled connection and return every row."""
+        assert self.pool
+
+        with query.timed():
+            return await self.pool.fetch(query.sql, *args)
+
+    async def execute(self, query: Query, *args: Any) -> str:
+        """Run a single registered statement on any pooled connection and return the status."""
+        assert self.pool
 
+        with query.timed():
+            return await self.pool.execute(query.sql, *args)
+
+    async def create_state(self, *, discord_id: int, moderator: bool = False) -> str:
         code: str = secrets.token_urlsafe(16)
-        async with self.pool.acquire() as connection:
-            await connection.execute(query, code, discord_id, moderator)
+        await self.execute(q.CREATE_STATE, code, discord_id, moderator)
 
         return code
 
     async def fetch_user(self, token: str) -> UserModel | None:
-        assert self.pool
-
-        query: str = """SELECT * FROM users WHERE token = $1"""
-        async with self.pool.acquire() as connection:
-            row = await connection.fetchrow(query, token)
+        row = await self.fetchrow(q.FETCH_USER, token)
 
         if not row:
             return None
@@ -80,9 +128,7 @@ class Database:
         uid: int = generate_id()
         token: str = generate_token(uid)
 
-        state_query: str = """DELETE FROM state WHERE code = $1 RETURNING *"""
-        async with self.pool.acquire() as connection:
-            state_row = await connection.fetchrow(state_query, state)
+        state_row = await self.fetchrow(q.CONSUME_STATE, state)
 
         if not state_row:
             raise ValueError("Improper state was passed. None")
@@ -93,37 +139,25 @@ class Database:
         except KeyError:
             raise ValueError("Improper state was passed. Improper data.")
 
-        upsert: str = """
-        WITH upsert AS (
-            UPDATE users
-            SET discord_id = $2, twitch_id = $3, moderator = $4, token = $5
-            WHERE discord_id = $2 OR twitch_id = $3
-            RETURNING *
-        )
-        INSERT INTO users(uid, discord_id, twitch_id, moderator, token)
-        SELECT $1, $2, $3, $4, $5
-        WHERE NOT EXISTS (SELECT * FROM upsert)
-        """
-
-        select: str = """
-        SELECT * FROM users WHERE token = $1
-        """
-
         async with self.pool.acquire() as connection:
-            await connection.execute(upsert, uid, discord_id, twitch_id, moderator, token)
-            row = await connection.fetchrow(select, token)
+            with q.UPSERT_USER.timed():
+                await connection.execute(q.UPSERT_USER.sql, uid, discord_id, twitch_id, moderator, token)
+
+            with q.FETCH_USER.timed():
+                row = await connection.fetchrow(q.FETCH_USER.sql, token)
 
         assert row
-        return UserModel(record=row)
+        user: UserModel = UserModel(record=row)
+
+        self._dispatch_user(user)
+        return user
 
     async def create_user(self, *, discord_id: int = 0, twitch_id: int = 0, moderator: bool = False) -> UserModel:
         assert self.pool
 
-        query: str = """
-        SELECT * FROM users WHERE discord_id = $1 OR twitch_id = $2
-        """
         async with self.pool.acquire() as connection:
-            row = await connection.fetchrow(query, discord_id, twitch_id)
+            with q.FETCH_LINKED_USER.timed():
+                row = await connection.fetchrow(q.FETCH_LINKED_USER.sql, discord_id, twitch_id)
 
             if row:
                 return UserModel(record=row)
@@ -131,77 +165,177 @@ class Database:
             uid: int = generate_id()
             token: str = generate_token(uid)
 
-            create_query: str = """
-            INSERT INTO users (uid, discord_id, twitch_id, moderator, token) VALUES ($1, $2, $3, $4, $5) RETURNING *
-            """
-            row = await connection.fetchrow(create_query, uid, discord_id or None, twitch_id or None, moderator, token)
+            with q.CREATE_USER.timed():
+                row = await connection.fetchrow(
+                    q.CREATE_USER.sql, uid, discord_id or None, twitch_id or None, moderator, token
+                )
 
-            assert row
-            return UserModel(record=row)
+        assert row
+        user: UserModel = UserModel(record=row)
+
+        self._dispatch_user(user)
+        return user
 
     async def add_quote(
         self, content: str, *, added_by: str | int, source: str, user: str | int | None = None
     ) -> asyncpg.Record:
-        assert self.pool
-
-        query: str = """
-        INSERT INTO quotes (content, added_by, source, speaker)
-        VALUES ($1, $2, $3, $4)
-        RETURNING *
-        """
+        if user:
+            user = int(user)
 
-        async with self.pool.acquire() as connection:
-            if user:
-                user = int(user)
-
-            try:
-                row: asyncpg.Record = await connection.fetchrow(query, content, int(added_by), source, user)  # type: ignore
-            except asyncpg.UniqueViolationError:
-                raise ValueError("Quote already exists.")
+        try:
+            row = await self.fetchrow(q.ADD_QUOTE, content, int(added_by), source, user)
+        except asyncpg.UniqueViolationError:
+            raise ValueError("Quote already exists.")
 
         assert row
+
+        # Also replaces any cached miss for this ID...
+        self.quotes.set(row["id"], row)
         return row
 
     async def fetch_quote(self, id_: int, /) -> asyncpg.Record | None:  # / means positional only for teh arg before it
-        assert self.pool
-
-        query: str = """
-        SELECT * FROM quotes WHERE id = $1
+        return (await self._fetch_cached_quote(id_)).record
+
+    async def fetch_quote_json(self, id_: int, /) -> bytes | None:
+        """Fetch a quote as the JSON body served by the API, or None if the quote does not exist."""
+        entry: CachedQuote = await self._fetch_cached_quote(id_)
+        return entry.body if entry.record is not None else None
+
+    async def _fetch_cached_quote(self, id_: int, /) -> CachedQuote:
+        entry: CachedQuote | None = self.quotes.get(id_)
+        if entry is not None:
+            return entry
+
+        row = await self.fetchrow(q.FETCH_QUOTE, id_)
+        return self.quotes.set(id_, row)
+
+    async def search_quotes(
+        self,
+        text: str | None = None,
+        *,
+        speakers: list[int] | None = None,
+        before: int | None = None,
+        limit: int = 20,
+    ) -> list[asyncpg.Record]:
+        """Search quotes by content and/or speaker, newest first.
+
+        Parameters
+        ----------
+        text: Optional[str]
+            Matched against the quote content, both as a full-text search and as a case insensitive substring.
+        speakers: Optional[list[int]]
+            Only return quotes spoken by one of these Twitch or Discord IDs.
+        before: Optional[int]
+            Only return quotes with an ID lower than this. Pass the last ID of the previous page to paginate.
+        limit: int
+            The maximum amount of quotes to return. Defaults to 20.
         """
+        if not text and not speakers:
+            raise ValueError("Either text or speakers is required to search quotes.")
 
-        async with self.pool.acquire() as connection:
-            row: asyncpg.Record | None = await connection.fetchrow(query, id_)
+        # Keyset pagination, so later pages cost the same as the first...
+        before = before if before is not None else 2**31 - 1
 
-        return row
+        if not text:
+            return await self.fetch(q.SEARCH_QUOTES_BY_SPEAKER, speakers, before, limit)
+
+        escaped: str = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return await self.fetch(q.SEARCH_QUOTES, text, f"%{escaped}%", speakers, before, limit)
+
+    async def fetch_speaker_names(self) -> dict[tuple[str, int], str]:
+        """Fetch every stored speaker display name, keyed by platform and speaker ID."""
+        rows = await self.fetch(q.FETCH_SPEAKER_NAMES)
+
+        return {(row["platform"], row["speaker"]): row["name"] for row in rows}
+
+    async def fetch_stale_speakers(self, older_than: datetime.timedelta) -> list[tuple[str, int]]:
+        """Fetch the platform and ID of quote speakers with no stored name, or a name older than `older_than`."""
+        rows = await self.fetch(q.FETCH_STALE_SPEAKERS, older_than)
+
+        return [(row["platform"], row["speaker"]) for row in rows]
+
+    async def set_speaker_names(self, names: dict[tuple[str, int], str]) -> None:
+        if not names:
+            return
+
+        platforms, speakers = zip(*names, strict=True)
+        await self.execute(q.SET_SPEAKER_NAMES, list(platforms), list(speakers), list(names.values()))
 
     async def add_redeem(self, twitch_id: int) -> FirstRedeemModel:
         # step 5 of first_redeem
         assert self.pool
 
-        query: str = """
-        INSERT INTO first_redeem (twitch_id)
-        VALUES ($1)
-        RETURNING *
-        """
+        async with self.pool.acquire() as connection, connection.transaction():
+            with q.ADD_REDEEM.timed():
+                row = await connection.fetchrow(q.ADD_REDEEM.sql, twitch_id)
 
-        async with self.pool.acquire() as connection:
-            row = await connection.fetchrow(query, twitch_id)
+            with q.EXTEND_STREAK.timed():
+                await connection.execute(q.EXTEND_STREAK.sql, twitch_id)
 
         assert row
         return FirstRedeemModel(record=row)
 
-    # get the current streak of first_redeem
-    async def fetch_redeems(self) -> list[FirstRedeemModel]:
-        assert self.pool
+    async def fetch_streak(self) -> FirstStreakModel | None:
+        """Fetch the current first redeem streak holder and count."""
+        row = await self.fetchrow(q.FETCH_STREAK)
+
+        return FirstStreakModel(record=row) if row else None
+
+    async def fetch_longest_streaks(self, *, limit: int = 10, twitch_id: int | None = None) -> list[FirstStreakModel]:
+        """Fetch each user's longest first redeem streak, longest first.
 
-        query: str = """
-        SELECT * FROM first_redeem
-        ORDER BY timestamp DESC
+        Parameters
+        ----------
+        limit: int
+            The maximum amount of users to return. Defaults to 10.
+        twitch_id: Optional[int]
+            Only return the longest streak for this user.
         """
+        rows = await self.fetch(q.FETCH_LONGEST_STREAKS, limit, twitch_id)
 
-        async with self.pool.acquire() as connection:
-            rows = await connection.fetch(query)
+        return [FirstStreakModel(record=row) for row in rows]
+
+    async def rebuild_streak(self) -> FirstStreakModel | None:
+        """Rebuild the current first redeem streak from the full redeem history."""
+        assert self.pool
+
+        async with self.pool.acquire() as connection, connection.transaction():
+            with q.COUNT_STREAK.timed():
+                row = await connection.fetchrow(q.COUNT_STREAK.sql)
+
+            if not row or row["twitch_id"] is None:
+                with q.CLEAR_STREAK.timed():
+                    await connection.execute(q.CLEAR_STREAK.sql)
+                return None
+
+            with q.SET_STREAK.timed():
+                await connection.execute(q.SET_STREAK.sql, row["twitch_id"], row["count"])
+
+        return FirstStreakModel(record=row)
+
+    # get the current streak of first_redeem
+    async def fetch_redeems(self) -> list[FirstRedeemModel]:
+        rows = await self.fetch(q.FETCH_REDEEMS)
 
         assert rows
 
         return [FirstRedeemModel(row) for row in rows]
+
+    async def add_eventsub(self, msg_id: str, data: dict[str, Any]) -> bool:
+        """Store an EventSub notification. Returns False if the notification was already stored."""
+        row = await self.fetchrow(q.ADD_EVENTSUB, msg_id, data["subscription"]["type"], json.dumps(data))
+
+        return row is not None
+
+    async def complete_eventsub(self, msg_id: str) -> None:
+        await self.execute(q.COMPLETE_EVENTSUB, msg_id)
+
+    async def fetch_pending_eventsub(self) -> list[tuple[str, dict[str, Any]]]:
+        """Fetch unprocessed EventSub notifications in the order they were received.
+
+        Processed notifications older than 7 days are removed.
+        """
+        await self.execute(q.PRUNE_EVENTSUB)
+        rows = await self.fetch(q.FETCH_PENDING_EVENTSUB)
+
+        return [(row["id"], json.loads(row["payload"])) for row in rows]
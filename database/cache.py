@@ -0,0 +1,107 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import collections
+import json
+import math
+import time
+from typing import TYPE_CHECKING
+
+from api import QuoteModel
+
+
+if TYPE_CHECKING:
+    import asyncpg
+
+
+__all__ = ("CachedQuote", "QuoteCache")
+
+
+class CachedQuote:
+    """A cached quote row, or a cached miss when `record` is None.
+
+    The JSON body served by the API is serialised once, on first use, and reused afterwards.
+    """
+
+    __slots__ = ("_body", "expires", "record")
+
+    def __init__(self, record: asyncpg.Record | None, *, expires: float) -> None:
+        self.record: asyncpg.Record | None = record
+        self.expires: float = expires
+        self._body: bytes | None = None
+
+    @property
+    def body(self) -> bytes:
+        assert self.record is not None
+
+        if self._body is None:
+            # Matches the output of starlette's JSONResponse...
+            self._body = json.dumps(
+                QuoteModel(self.record).as_dict(), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode("utf-8")
+
+        return self._body
+
+
+class QuoteCache:
+    """Bounded LRU cache of quotes by ID.
+
+    Quotes are never changed once added, so found quotes are kept until evicted. IDs which don't exist are cached
+    for `miss_ttl` seconds, so repeated lookups of a missing quote don't all reach the database.
+    """
+
+    __slots__ = ("_entries", "hits", "maxsize", "miss_ttl", "misses")
+
+    def __init__(self, *, maxsize: int = 2048, miss_ttl: float = 30.0) -> None:
+        self.maxsize: int = maxsize
+        self.miss_ttl: float = miss_ttl
+
+        self._entries: collections.OrderedDict[int, CachedQuote] = collections.OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __repr__(self) -> str:
+        return f"QuoteCache: size={len(self._entries)}, hits={self.hits}, misses={self.misses}"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, id_: int, /) -> CachedQuote | None:
+        """Returns the cached entry, which may be a cached miss, or None if the ID is not cached."""
+        entry: CachedQuote | None = self._entries.get(id_)
+
+        if entry is None or entry.expires < time.monotonic():
+            self._entries.pop(id_, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(id_)
+        self.hits += 1
+        return entry
+
+    def set(self, id_: int, record: asyncpg.Record | None, /) -> CachedQuote:
+        expires: float = math.inf if record is not None else time.monotonic() + self.miss_ttl
+
+        entry: CachedQuote = CachedQuote(record, expires=expires)
+        self._entries[id_] = entry
+        self._entries.move_to_end(id_)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        return entry
@@ -0,0 +1,157 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Run pending migrations ahead of a deploy with:
+
+    python -m database.migrate
+
+Or list them, without applying anything, with:
+
+    python -m database.migrate --list
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import pathlib
+import re
+
+import asyncpg
+
+import core
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+__all__ = ("MIGRATIONS", "Migration", "applied_migrations", "load_migrations", "migrate")
+
+
+MIGRATIONS: pathlib.Path = pathlib.Path(__file__).parent.parent / "migrations"
+MIGRATION_NAME: re.Pattern[str] = re.compile(r"^(?P<version>\d+)_(?P<name>\w+)\.sql$")
+
+# Held for the migration transaction, so the bots and the CLI never migrate at the same time...
+LOCK_ID: int = 0x54494D45
+
+
+class Migration:
+    """A numbered SQL file in the migrations directory, E.g. ``0002_eventsub_intake.sql``."""
+
+    __slots__ = ("name", "path", "version")
+
+    def __init__(self, path: pathlib.Path) -> None:
+        match: re.Match[str] | None = MIGRATION_NAME.match(path.name)
+        if not match:
+            raise ValueError(f"Migration '{path.name}' is not named like '0001_name.sql'.")
+
+        self.path: pathlib.Path = path
+        self.version: int = int(match["version"])
+        self.name: str = match["name"]
+
+    def __repr__(self) -> str:
+        return f"Migration: version={self.version}, name={self.name}"
+
+    def read(self) -> str:
+        return self.path.read_text()
+
+
+def load_migrations(directory: pathlib.Path = MIGRATIONS) -> list[Migration]:
+    migrations: list[Migration] = sorted((Migration(path) for path in directory.glob("*.sql")), key=lambda m: m.version)
+
+    seen: set[int] = set()
+    for migration in migrations:
+        if migration.version in seen:
+            raise ValueError(f"Multiple migrations have the version {migration.version}.")
+
+        seen.add(migration.version)
+
+    return migrations
+
+
+async def applied_migrations(connection: asyncpg.Connection) -> set[int]:
+    if await connection.fetchval("""SELECT to_regclass('schema_version') IS NULL"""):
+        return set()
+
+    rows: list[asyncpg.Record] = await connection.fetch("""SELECT version FROM schema_version""")
+    return {row["version"] for row in rows}
+
+
+async def migrate(connection: asyncpg.Connection, *, directory: pathlib.Path = MIGRATIONS) -> list[Migration]:
+    """Apply every pending migration, in order, in a single transaction. Returns the applied migrations.
+
+    When the schema is already up to date this is a couple of reads, and no DDL or locks are taken.
+    """
+    migrations: list[Migration] = load_migrations(directory)
+
+    applied: set[int] = await applied_migrations(connection)
+    if all(migration.version in applied for migration in migrations):
+        return []
+
+    async with connection.transaction():
+        await connection.execute("""SELECT pg_advisory_xact_lock($1)""", LOCK_ID)
+        await connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied TIMESTAMP DEFAULT (now() at time zone 'utc')
+            )
+            """
+        )
+
+        # Another process may have migrated while we waited on the lock...
+        applied = await applied_migrations(connection)
+        pending: list[Migration] = [migration for migration in migrations if migration.version not in applied]
+
+        for migration in pending:
+            logger.info("Applying %r", migration)
+
+            await connection.execute(migration.read())
+            await connection.execute(
+                """INSERT INTO schema_version (version, name) VALUES ($1, $2)""", migration.version, migration.name
+            )
+
+    return pending
+
+
+async def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Apply pending database migrations.")
+    parser.add_argument("--list", action="store_true", help="List migrations and whether they are applied.")
+    args: argparse.Namespace = parser.parse_args()
+
+    connection: asyncpg.Connection = await asyncpg.connect(dsn=core.config["DATABASE"]["dsn"])
+
+    try:
+        if args.list:
+            applied: set[int] = await applied_migrations(connection)
+
+            for migration in load_migrations():
+                print(f"[{'x' if migration.version in applied else ' '}] {migration.path.name}")
+            return
+
+        pending: list[Migration] = await migrate(connection)
+    finally:
+        await connection.close()
+
+    if pending:
+        logger.info("Applied %s migrations.", len(pending))
+    else:
+        logger.info("Database is up to date.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,344 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import time
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import asyncpg
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+__all__ = ("QUERIES", "Query", "QueryRegistry")
+
+
+class Query:
+    """A named SQL statement with timing counters.
+
+    calls
+        The amount of times the statement was run, including those which raised.
+    failures
+        The amount of times the statement raised.
+    total
+        The total time in seconds spent running the statement.
+    slowest
+        The slowest run in seconds.
+    """
+
+    __slots__ = ("calls", "failures", "name", "slowest", "sql", "total")
+
+    def __init__(self, name: str, sql: str) -> None:
+        self.name: str = name
+        self.sql: str = sql
+
+        self.calls: int = 0
+        self.failures: int = 0
+        self.total: float = 0.0
+        self.slowest: float = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"Query: name={self.name}, calls={self.calls}, failures={self.failures}, "
+            f"average={self.average * 1000:.2f}ms, slowest={self.slowest * 1000:.2f}ms"
+        )
+
+    @property
+    def average(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+    @contextlib.contextmanager
+    def timed(self) -> Iterator[None]:
+        started: float = time.perf_counter()
+
+        try:
+            yield
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            elapsed: float = time.perf_counter() - started
+
+            self.calls += 1
+            self.total += elapsed
+            self.slowest = max(self.slowest, elapsed)
+
+
+class QueryRegistry:
+    """Registry of every named statement `database.Database` runs.
+
+    `QueryRegistry.prepare` is used as the pool's ``init`` hook, so every statement is parsed and checked against the
+    schema once per connection when the connection is opened, instead of failing on first use.
+    """
+
+    def __init__(self) -> None:
+        self._queries: dict[str, Query] = {}
+
+    def __getitem__(self, name: str) -> Query:
+        return self._queries[name]
+
+    def __iter__(self) -> Iterator[Query]:
+        return iter(self._queries.values())
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def add(self, name: str, sql: str) -> Query:
+        if name in self._queries:
+            raise ValueError(f"A query named '{name}' has already been registered.")
+
+        query: Query = Query(name, sql)
+        self._queries[name] = query
+
+        return query
+
+    async def prepare(self, connection: asyncpg.Connection) -> None:
+        for query in self:
+            await connection.prepare(query.sql)
+
+    def report(self) -> None:
+        for query in sorted(self, key=lambda q: q.total, reverse=True):
+            if query.calls:
+                logger.info("%r", query)
+
+
+QUERIES: QueryRegistry = QueryRegistry()
+
+
+# Users...
+CREATE_STATE: Query = QUERIES.add(
+    "create_state",
+    """
+    INSERT INTO state(code, discord_id, moderator)
+    VALUES ($1, $2, $3)
+    ON CONFLICT (discord_id) DO UPDATE
+    SET code = $1
+    """,
+)
+
+FETCH_USER: Query = QUERIES.add("fetch_user", """SELECT * FROM users WHERE token = $1""")
+
+CONSUME_STATE: Query = QUERIES.add("consume_state", """DELETE FROM state WHERE code = $1 RETURNING *""")
+
+UPSERT_USER: Query = QUERIES.add(
+    "upsert_user",
+    """
+    WITH upsert AS (
+        UPDATE users
+        SET discord_id = $2, twitch_id = $3, moderator = $4, token = $5
+        WHERE discord_id = $2 OR twitch_id = $3
+        RETURNING *
+    )
+    INSERT INTO users(uid, discord_id, twitch_id, moderator, token)
+    SELECT $1, $2, $3, $4, $5
+    WHERE NOT EXISTS (SELECT * FROM upsert)
+    """,
+)
+
+FETCH_LINKED_USER: Query = QUERIES.add(
+    "fetch_linked_user",
+    """SELECT * FROM users WHERE discord_id = $1 OR twitch_id = $2""",
+)
+
+CREATE_USER: Query = QUERIES.add(
+    "create_user",
+    """
+    INSERT INTO users (uid, discord_id, twitch_id, moderator, token) VALUES ($1, $2, $3, $4, $5) RETURNING *
+    """,
+)
+
+
+# Quotes...
+ADD_QUOTE: Query = QUERIES.add(
+    "add_quote",
+    """
+    INSERT INTO quotes (content, added_by, source, speaker)
+    VALUES ($1, $2, $3, $4)
+    RETURNING *
+    """,
+)
+
+FETCH_QUOTE: Query = QUERIES.add("fetch_quote", """SELECT * FROM quotes WHERE id = $1""")
+
+# Newest first, paginated by keyset on id. The ILIKE pattern catches partial words the full-text match misses...
+SEARCH_QUOTES: Query = QUERIES.add(
+    "search_quotes",
+    """
+    SELECT * FROM quotes
+    WHERE (to_tsvector('english', content) @@ websearch_to_tsquery('english', $1) OR content ILIKE $2)
+    AND ($3::BIGINT[] IS NULL OR speaker = ANY($3))
+    AND id < $4
+    ORDER BY id DESC
+    LIMIT $5
+    """,
+)
+
+SEARCH_QUOTES_BY_SPEAKER: Query = QUERIES.add(
+    "search_quotes_by_speaker",
+    """
+    SELECT * FROM quotes
+    WHERE speaker = ANY($1::BIGINT[])
+    AND id < $2
+    ORDER BY id DESC
+    LIMIT $3
+    """,
+)
+
+
+# Speaker names...
+FETCH_SPEAKER_NAMES: Query = QUERIES.add("fetch_speaker_names", """SELECT platform, speaker, name FROM speaker_names""")
+
+# Quotes from any source other than Discord were spoken on Twitch...
+FETCH_STALE_SPEAKERS: Query = QUERIES.add(
+    "fetch_stale_speakers",
+    """
+    SELECT DISTINCT quoted.platform, quoted.speaker
+    FROM (
+        SELECT CASE WHEN source = 'discord' THEN 'discord' ELSE 'twitch' END AS platform, speaker
+        FROM quotes
+        WHERE speaker IS NOT NULL
+    ) AS quoted
+    LEFT JOIN speaker_names names ON names.platform = quoted.platform AND names.speaker = quoted.speaker
+    WHERE names.updated IS NULL OR names.updated < (now() at time zone 'utc') - $1::INTERVAL
+    """,
+)
+
+SET_SPEAKER_NAMES: Query = QUERIES.add(
+    "set_speaker_names",
+    """
+    INSERT INTO speaker_names (platform, speaker, name)
+    SELECT * FROM unnest($1::TEXT[], $2::BIGINT[], $3::TEXT[])
+    ON CONFLICT (platform, speaker) DO UPDATE
+    SET name = EXCLUDED.name, updated = (now() at time zone 'utc')
+    """,
+)
+
+# First redeems...
+ADD_REDEEM: Query = QUERIES.add(
+    "add_redeem",
+    """
+    INSERT INTO first_redeem (twitch_id)
+    VALUES ($1)
+    RETURNING *
+    """,
+)
+
+# The streak is extended when the same user redeems again, otherwise it is reset...
+EXTEND_STREAK: Query = QUERIES.add(
+    "extend_streak",
+    """
+    INSERT INTO first_streak (id, twitch_id, count)
+    VALUES (true, $1, 1)
+    ON CONFLICT (id) DO UPDATE
+    SET count = CASE WHEN first_streak.twitch_id = EXCLUDED.twitch_id THEN first_streak.count + 1 ELSE 1 END,
+        twitch_id = EXCLUDED.twitch_id
+    """,
+)
+
+FETCH_STREAK: Query = QUERIES.add("fetch_streak", """SELECT twitch_id, count FROM first_streak WHERE id""")
+
+# Gaps and islands: a new island starts whenever the redeemer differs from the previous redeem...
+FETCH_LONGEST_STREAKS: Query = QUERIES.add(
+    "fetch_longest_streaks",
+    """
+    WITH marked AS (
+        SELECT
+            twitch_id,
+            timestamp,
+            CASE WHEN twitch_id = lag(twitch_id) OVER (ORDER BY timestamp) THEN 0 ELSE 1 END AS start
+        FROM first_redeem
+    ), islands AS (
+        SELECT twitch_id, sum(start) OVER (ORDER BY timestamp ROWS UNBOUNDED PRECEDING) AS island
+        FROM marked
+    ), streaks AS (
+        SELECT twitch_id, count(*) AS count
+        FROM islands
+        WHERE $2::BIGINT IS NULL OR twitch_id = $2
+        GROUP BY twitch_id, island
+    )
+    SELECT twitch_id, max(count) AS count
+    FROM streaks
+    GROUP BY twitch_id
+    ORDER BY count DESC, twitch_id
+    LIMIT $1
+    """,
+)
+
+# The streak is every redeem after the latest one made by someone other than the current holder...
+COUNT_STREAK: Query = QUERIES.add(
+    "count_streak",
+    """
+    WITH latest AS (
+        SELECT twitch_id FROM first_redeem ORDER BY timestamp DESC LIMIT 1
+    ), broken AS (
+        SELECT max(timestamp) AS timestamp FROM first_redeem WHERE twitch_id <> (SELECT twitch_id FROM latest)
+    )
+    SELECT (SELECT twitch_id FROM latest) AS twitch_id, count(*) AS count
+    FROM first_redeem
+    WHERE timestamp > COALESCE((SELECT timestamp FROM broken), '-infinity')
+    """,
+)
+
+SET_STREAK: Query = QUERIES.add(
+    "set_streak",
+    """
+    INSERT INTO first_streak (id, twitch_id, count)
+    VALUES (true, $1, $2)
+    ON CONFLICT (id) DO UPDATE SET twitch_id = EXCLUDED.twitch_id, count = EXCLUDED.count
+    """,
+)
+
+CLEAR_STREAK: Query = QUERIES.add("clear_streak", """DELETE FROM first_streak""")
+
+FETCH_REDEEMS: Query = QUERIES.add("fetch_redeems", """SELECT * FROM first_redeem ORDER BY timestamp DESC""")
+
+
+# EventSub intake...
+ADD_EVENTSUB: Query = QUERIES.add(
+    "add_eventsub",
+    """
+    INSERT INTO eventsub_intake (id, type, payload)
+    VALUES ($1, $2, $3::jsonb)
+    ON CONFLICT (id) DO NOTHING
+    RETURNING id
+    """,
+)
+
+COMPLETE_EVENTSUB: Query = QUERIES.add(
+    "complete_eventsub",
+    """UPDATE eventsub_intake SET processed = (now() at time zone 'utc') WHERE id = $1""",
+)
+
+PRUNE_EVENTSUB: Query = QUERIES.add(
+    "prune_eventsub",
+    """DELETE FROM eventsub_intake WHERE processed < (now() at time zone 'utc') - INTERVAL '7 days'""",
+)
+
+FETCH_PENDING_EVENTSUB: Query = QUERIES.add(
+    "fetch_pending_eventsub",
+    """
+    SELECT id, payload::text AS payload FROM eventsub_intake
+    WHERE processed IS NULL
+    ORDER BY received
+    """,
+)
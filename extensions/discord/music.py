@@ -16,12 +16,10 @@ limitations under the License.
 from __future__ import annotations
 
 import datetime
-import json
 import logging
 import secrets
 from typing import Any, Literal, cast
 
-import aiohttp
 import discord
 import twitchio
 import wavelink
@@ -35,6 +33,8 @@ logger: logging.Logger = logging.getLogger(__name__)
 
 MAX_SONG_LEN: int = 360000  # 6 mins in Milliseconds...
 
+TWITCH_REDEMPTIONS: str = "https://api.twitch.tv/helix/channel_points/custom_rewards/redemptions"
+
 
 class RequestView(discord.ui.View):
     message: discord.Message | discord.WebhookMessage
@@ -93,7 +93,7 @@ class RequestView(discord.ui.View):
         if self.player.current == self.player.loaded:  # type: ignore
             await self.player.play(self.track, replace=True)
         else:
-            self.player.queue.put(self.track)
+            await self.player.enqueue(self.track)
 
         await self.cog.update_redemption(data=self.data, status="FULFILLED")
 
@@ -113,7 +113,7 @@ class RequestView(discord.ui.View):
         if self.player.current == self.player.loaded:  # type: ignore
             await self.player.play(self.track, replace=True)
         else:
-            self.player.queue.put(self.track)
+            await self.player.enqueue(self.track)
 
         await self.cog.update_redemption(data=self.data, status="FULFILLED")
 
@@ -138,7 +138,7 @@ class RequestView(discord.ui.View):
         if self.player.current == self.player.loaded:  # type: ignore
             await self.player.play(self.track, replace=True)
         else:
-            self.player.queue.put(self.track)
+            await self.player.enqueue(self.track)
 
         await self.cog.update_redemption(data=self.data, status="CANCELED")
 
@@ -174,23 +174,20 @@ class RequestView(discord.ui.View):
 
 
 class Music(commands.Cog):
-    session: aiohttp.ClientSession
-
     def __init__(self, bot: core.DiscordBot) -> None:
         self.bot = bot
 
         # This event will technically come from our API server...
         self.bot.tbot.event_api_request_song = self.twitch_redemption  # type: ignore
 
-    async def cog_load(self) -> None:
-        self.session = aiohttp.ClientSession()
-
     @commands.Cog.listener()
     async def on_wavelink_track_end(self, payload: wavelink.TrackEndEventPayload) -> None:
         player: core.Player | None = cast(core.Player, payload.player)
         if not player:
             return
 
+        player.bump()
+
         if player.autoplay is not wavelink.AutoPlayMode.disabled:
             return
 
@@ -212,6 +209,7 @@ class Music(commands.Cog):
         if not player:
             return
 
+        player.bump()
         await self.bot.server.dispatch_htmx("track_start", data={"player": player})
 
         loaded: wavelink.Playable | None = getattr(player, "loaded", None)
@@ -239,7 +237,9 @@ class Music(commands.Cog):
     async def on_wavelink_inactive_player(self, player: wavelink.Player) -> None:
         await player.disconnect()
 
-    async def update_redemption(self, data: dict[str, Any], *, status: Literal["CANCELED", "FULFILLED"]) -> None:
+    async def update_redemption(
+        self, data: dict[str, Any], *, status: Literal["CANCELED", "FULFILLED"], refreshed: bool = False
+    ) -> None:
         # Temp setting for testing purposes...
         # status = "CANCELED"
 
@@ -247,36 +247,27 @@ class Music(commands.Cog):
         reward_id: str = data["reward"]["id"]
         broadcaster_id: str = core.config["TIME_SUBS"]["twitch_id"]
 
-        url = (
-            f"https://api.twitch.tv/helix/channel_points/custom_rewards/redemptions?"
-            f"id={redeem_id}&"
-            f"broadcaster_id={broadcaster_id}&"
-            f"reward_id={reward_id}"
-        )
+        url = f"{TWITCH_REDEMPTIONS}?id={redeem_id}&broadcaster_id={broadcaster_id}&reward_id={reward_id}"
 
-        # This kinda sucks, but due to the fact this can change when linking accounts, we need to re open the JSON...
-        with open(".secrets.json") as fp:
-            json_: dict[str, Any] = json.load(fp)
+        tokens: core.TokenStore = self.bot.tbot.tokens
+        token: str = tokens.token
 
-        headers: dict[str, str] = {
-            "Authorization": f"Bearer {json_['token']}",
-            "Client-Id": json_["client_id"],
-        }
+        async with self.bot.http_client.patch(url, json={"status": status}, headers=tokens.headers) as resp:
+            code: int = resp.status
+            body: str = await resp.text()
 
-        async with self.session.patch(url, json={"status": status}, headers=headers) as resp:
-            if resp.status == 401:
-                new: str | None = await self.bot.tbot.refresh_token(json_["refresh"])
-                if not new:
-                    return
+        if code == 401 and not refreshed:
+            # Concurrent 401s share a single refresh, then each caller retries once...
+            if not await tokens.refresh(stale=token):
+                return
 
-                return await self.update_redemption(data=data, status=status)
+            return await self.update_redemption(data=data, status=status, refreshed=True)
 
-            if resp.status != 200:
-                body: str = await resp.text()
-                logger.error("Failed to change redemption status: %s (Code: %s)", body, resp.status)
-                return
+        if code != 200:
+            logger.error("Failed to change redemption status: %s (Code: %s)", body, code)
+            return
 
-            logger.info("Changed redemption status for <%s> to %s", redeem_id, status)
+        logger.info("Changed redemption status for <%s> to %s", redeem_id, status)
 
     async def twitch_redemption(self, data: dict[str, Any]) -> None:
         try:
@@ -296,8 +287,11 @@ class Music(commands.Cog):
         user_input: str = data["user_input"]
 
         try:
-            user: twitchio.User = (await self.bot.tbot.fetch_users(names=[user_login]))[0]
+            user: twitchio.User | None = await self.bot.tbot.resolver.fetch_user(name=user_login)
         except Exception:
+            user = None
+
+        if not user:
             logger.warning("An error occurred fetching the user with name: %s. Unable to add song.", user_login)
             return await self.update_redemption(data=data, status="CANCELED")
 
@@ -341,9 +335,8 @@ class Music(commands.Cog):
             if player.current == player.loaded:  # type: ignore
                 await player.play(track, replace=True)
             else:
-                player.queue.put(track)
+                await player.enqueue(track)
                 await channel.send(f"@{user_login} - Added the song {track} by {track.author} to the queue.")
-                await self.bot.server.dispatch_htmx("player_update", data={"player": player})
 
             return await self.update_redemption(data=data, status="FULFILLED")
 
@@ -422,6 +415,8 @@ class Music(commands.Cog):
                 logger.info("Starting Stream player with AutoPlay Enabled.")
 
                 await player.queue.put_wait(track)
+                player.bump()
+
                 await player.play(player.queue.get(), volume=20)
             else:
                 await player.play(track, replace=True, volume=20)
@@ -481,6 +476,8 @@ class Music(commands.Cog):
         track.extras = {"requester_id": ctx.author.id}
 
         await player.queue.put_wait(track)
+        player.bump()
+
         await ctx.reply(f"Added **`{track}`** to the queue.")
 
         if not player.playing:
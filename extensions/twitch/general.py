@@ -14,6 +14,7 @@ limitations under the License.
 """
 
 import logging
+import random
 import zoneinfo
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
@@ -24,11 +25,11 @@ import twitchio
 from twitchio.ext import commands, routines
 
 import core
-from core.constants import TIMEZONES
+from core.constants import TIMEZONES, TWITCH_LOGIN
 
 
 if TYPE_CHECKING:
-    from api import FirstRedeemModel, Server
+    from api import FirstStreakModel, Server
 
 STREAM_REFS_CHANNEL: int = core.config["GENERAL"]["stream_refs_id"]
 
@@ -77,25 +78,25 @@ class General(commands.Cog):
         message: twitchio.Message = ctx.message
         content: str | None = content_or
         user_id: int | str | None = None
+        name: str | None = None
 
         reply: str | None = message.tags.get("reply-parent-msg-body", None)
         if reply:
             content = reply.replace("\\s", " ")
             user_id = message.tags["reply-parent-user-id"]
+            name = message.tags.get("reply-parent-display-name")
 
         elif not reply and (user_or and content):
             user_or = user_or.replace("@", "")
             user = ctx.channel.get_chatter(user_or)
 
             if not user:
-                try:
-                    user = (await self.bot.fetch_users(names=[str(user_or)]))[0]
-                except IndexError:
-                    pass
+                user = await self.bot.resolver.fetch_user(name=str(user_or))
             else:
                 user = await user.user()
 
             user_id = user.id if user else None  # type: ignore
+            name = user.display_name if user else None  # type: ignore
         else:
             await ctx.reply(
                 "Please enter a user to quote and their quote. Or reply to a users message with this command."
@@ -115,6 +116,13 @@ class General(commands.Cog):
 
         await ctx.reply(f"Added the quote: {row['id']}")
 
+        # We already know the speaker's name, so store it now instead of waiting on the next refresh...
+        if row["speaker"] and name:
+            try:
+                await self.bot.speakers.add("twitch", row["speaker"], name)
+            except Exception as e:
+                logger.warning("Unable to store quote speaker name for %s: %s", row["speaker"], e)
+
     @commands.command()
     @commands.cooldown(1, 5, bucket=commands.Bucket.user)
     async def quote(self, ctx: commands.Context, *, name_or_id: int | str) -> None:
@@ -123,10 +131,14 @@ class General(commands.Cog):
         if isinstance(name_or_id, int):
             quote = await self.bot.database.fetch_quote(name_or_id)
         else:
-            ...
+            quotes: list[asyncpg.Record] = await self.search_quotes(name_or_id)
+            quote = random.choice(quotes) if quotes else None
 
         if not quote:
-            await ctx.send(f"Could not find the quote with ID: {name_or_id}")
+            if isinstance(name_or_id, int):
+                await ctx.send(f"Could not find the quote with ID: {name_or_id}")
+            else:
+                await ctx.send(f"Could not find a quote by or matching: {name_or_id}")
             return
 
         content: str = quote["content"].removeprefix('"').removesuffix('"')
@@ -135,17 +147,36 @@ class General(commands.Cog):
             await ctx.send(f'"{content}" - Unknown')
             return
 
-        user: twitchio.User | discord.User | discord.Member | None = None
-        if quote["source"] == "discord":
-            guild: discord.Guild = self.bot.dbot.get_guild(core.TIME_GUILD)  # type: ignore
-            user = guild.get_member(quote["speaker"]) or await self.bot.dbot.fetch_user(quote["speaker"])
-        else:
+        name: str | None = await self.bot.speakers.fetch_name(quote["source"], quote["speaker"])
+        await ctx.send(f'"{content}" - {name or "Unknown"}')
+
+    async def search_quotes(self, name_or_text: str, /) -> list[asyncpg.Record]:
+        """Search quotes spoken by a Twitch or Discord user, falling back to searching the quote content."""
+        name: str = name_or_text.strip().removeprefix("@")
+        speakers: list[int] = []
+
+        if TWITCH_LOGIN.fullmatch(name):
             try:
-                user = (await self.bot.fetch_users(ids=[quote["speaker"]], force=False))[0]
-            except IndexError:
-                pass
+                user: twitchio.User | None = await self.bot.resolver.fetch_user(name=name)
+            except Exception as e:
+                logger.warning("Unable to resolve quote speaker %s: %s", name, e)
+                user = None
+
+            if user:
+                speakers.append(user.id)
+
+            guild: discord.Guild | None = self.bot.dbot.get_guild(core.TIME_GUILD)
+            member: discord.Member | None = guild.get_member_named(name) if guild else None
+
+            if member:
+                speakers.append(member.id)
 
-        await ctx.send(f'"{content}" - {user.name if user else "Unknown"}')
+        if speakers:
+            quotes: list[asyncpg.Record] = await self.bot.database.search_quotes(speakers=speakers, limit=50)
+            if quotes:
+                return quotes
+
+        return await self.bot.database.search_quotes(name_or_text, limit=50)
 
     @commands.command()
     async def http(self, ctx: commands.Context, *, code: str) -> None:
@@ -166,8 +197,7 @@ class General(commands.Cog):
 
     @commands.command()
     async def count(self, ctx: commands.Context, mbti_type: str) -> None:
-        data: dict[str, int] = self.bot.dbot.mbti_count()
-        total: int | None = data.get(mbti_type.upper())
+        total: int | None = self.bot.dbot.mbti.counts.get(mbti_type.upper())
 
         if total is None:
             await ctx.reply(f"There are no {mbti_type} types in the server!")
@@ -186,38 +216,20 @@ class General(commands.Cog):
         name = name.removeprefix("@").lower()
 
         try:
-            users: list[twitchio.User] = await self.bot.fetch_users(names=[name])
+            user: twitchio.User | None = await self.bot.resolver.fetch_user(name=name)
         except twitchio.HTTPException:
-            await ctx.reply(f"Could not find the user {name}")
-
-        user_id: int = users[0].id
-        first_data: list[FirstRedeemModel] = await self.bot.database.fetch_redeems()
-
-        all_streaks: list[list[int]] = []
-        curr_list: list[int] = []
-
-        for row in first_data:
-            if curr_list == []:
-                curr_list.append(row.twitch_id)
+            user = None
 
-            elif row.twitch_id in curr_list:
-                curr_list.append(row.twitch_id)
-                if row == first_data[-1]:
-                    all_streaks.append(curr_list)
-
-            elif row.twitch_id not in curr_list:
-                all_streaks.append(curr_list)
-                curr_list = []
-                curr_list.append(row.twitch_id)
-                if row == first_data[-1]:
-                    all_streaks.append(curr_list)
+        if not user:
+            await ctx.reply(f"Could not find the user {name}")
+            return
 
-        users_streaks: list[int] = [len(streak) for streak in all_streaks if user_id in streak]
+        streaks: list[FirstStreakModel] = await self.bot.database.fetch_longest_streaks(limit=1, twitch_id=user.id)
 
-        if len(users_streaks) < 1:
+        if not streaks:
             await channel.send(f"{name} hasn't gotten first before :,(")
             return
-        streak = max(users_streaks)
+        streak = streaks[0].count
 
         await channel.send(f"{name} got first {streak} times in a row! PogChamp")
 
@@ -228,15 +240,10 @@ class General(commands.Cog):
         if not channel:
             return
 
-        # creates the newest streak count
-        all_redeems = await self.bot.database.fetch_redeems()
+        # the streak is updated along with the redeem, so this is a single row lookup
+        streak: FirstStreakModel | None = await self.bot.database.fetch_streak()
         redeemer_twitch_id = int(event["user_id"])
-        count = 0
-
-        for redeem in all_redeems:
-            if redeemer_twitch_id != redeem.twitch_id:
-                break
-            count += 1
+        count = streak.count if streak and streak.twitch_id == redeemer_twitch_id else 0
 
         # step 6: first redeem event
         await self.bot.dbot.server.dispatch_htmx("first_redeem", data={})
@@ -13,7 +13,6 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-import aiohttp
 import discord
 import twitchio
 import wavelink
@@ -106,16 +105,15 @@ class Music(commands.Cog):
         self.liked.append(current.identifier)
         msg: str = f"**{ctx.author.name}** liked a song from stream:\n{current.uri}"
 
-        async with aiohttp.ClientSession() as session:
-            url: str = core.config["GENERAL"]["music_webhook"]
-            webhook: discord.Webhook = discord.Webhook.from_url(url=url, session=session)
+        url: str = core.config["GENERAL"]["music_webhook"]
+        webhook: discord.Webhook = discord.Webhook.from_url(url=url, session=self.bot.http_client.session)
 
-            requester: twitchio.User | None = getattr(current, "twitch_user", None)
+        requester: twitchio.User | None = getattr(current, "twitch_user", None)
 
-            if requester:
-                await webhook.send(content=msg, avatar_url=requester.profile_image, username=requester.display_name)
-            else:
-                await webhook.send(content=msg, username="Bot AutoPlay")
+        if requester:
+            await webhook.send(content=msg, avatar_url=requester.profile_image, username=requester.display_name)
+        else:
+            await webhook.send(content=msg, username="Bot AutoPlay")
 
         await ctx.reply("Sent this song to discord!")
 
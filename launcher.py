@@ -18,7 +18,6 @@ import copy
 import logging
 from typing import Any
 
-import aiohttp
 import discord
 import uvicorn
 
@@ -45,7 +44,7 @@ PAYLOAD: dict[str, Any] = {
 }
 
 
-async def eventsub_subscribe() -> None:
+async def eventsub_subscribe(http_client: core.HTTPClient) -> None:
     url = "https://api.twitch.tv/helix/eventsub/subscriptions"
     headers: dict[str, str] = {
         "Authorization": f"Bearer {core.config['TWITCH']['app_token']}",
@@ -69,22 +68,27 @@ async def eventsub_subscribe() -> None:
             payload["type"] = sub
             payloads.append(payload)
 
-    async with aiohttp.ClientSession() as session:
-        for payload in payloads:
-            async with session.post(url, json=payload, headers=headers) as resp:
-                if resp.status >= 300:
-                    logger.warning("EventSub subscription was not successful, status: %s", resp.status)
-                    continue
+    for payload in payloads:
+        async with http_client.post(url, json=payload, headers=headers) as resp:
+            if resp.status >= 300:
+                logger.warning("EventSub subscription was not successful, status: %s", resp.status)
+                continue
 
-                logger.info("Subscribed to EventSub: %s for %s", payload["type"], payload["condition"])
+            logger.info("Subscribed to EventSub: %s for %s", payload["type"], payload["condition"])
 
 
 async def main() -> None:
     discord.utils.setup_logging(level=logging.INFO)
 
-    async with Database() as database, core.DiscordBot(database=database) as dbot:
+    # One pooled HTTP client is shared by the bots and API for all outbound requests, and closed on shutdown...
+    async with (
+        core.HTTPClient() as http_client,
+        core.TokenStore(http_client=http_client) as tokens,
+        Database() as database,
+        core.DiscordBot(database=database, http_client=http_client) as dbot,
+    ):
         # Init and run the Twitch Bot in the background...
-        tbot: core.TwitchBot = core.TwitchBot(dbot=dbot, database=database)
+        tbot: core.TwitchBot = core.TwitchBot(dbot=dbot, database=database, http_client=http_client, tokens=tokens)
         dbot.tbot = tbot
         _: asyncio.Task = asyncio.create_task(tbot.start())
 
@@ -92,7 +96,7 @@ async def main() -> None:
         _: asyncio.Task = asyncio.create_task(dbot.start(core.config["DISCORD"]["token"]))
 
         # Init the API Server...
-        app: api.Server = api.Server(database=database, tbot=tbot, dbot=dbot)
+        app: api.Server = api.Server(database=database, tbot=tbot, dbot=dbot, http_client=http_client)
         dbot.server = app
 
         # Configure Uvicorn to run our API and keep the asyncio event loop running...
@@ -100,7 +104,7 @@ async def main() -> None:
         server = uvicorn.Server(config)
 
         # Subscribe to our EventSub subscriptions...
-        await eventsub_subscribe()
+        await eventsub_subscribe(http_client)
 
         # Start the API server and keep asyncio event loop running...
         await server.serve()
@@ -15,6 +15,8 @@ limitations under the License.
 
 from __future__ import annotations
 
+import collections
+import time
 from typing import TYPE_CHECKING
 
 from starlette.authentication import AuthCredentials, AuthenticationBackend, BaseUser
@@ -31,17 +33,89 @@ class User(BaseUser):
         self.model = model
 
 
+class TokenCache:
+    """Bounded LRU cache of users by token, with a TTL. Unknown tokens are cached as None for a shorter TTL."""
+
+    __slots__ = ("_entries", "hits", "maxsize", "misses", "negative_ttl", "ttl")
+
+    def __init__(self, *, maxsize: int = 1024, ttl: float = 300.0, negative_ttl: float = 30.0) -> None:
+        self.maxsize: int = maxsize
+        self.ttl: float = ttl
+        self.negative_ttl: float = negative_ttl
+
+        self._entries: collections.OrderedDict[str, tuple[float, UserModel | None]] = collections.OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __repr__(self) -> str:
+        return f"TokenCache: size={len(self._entries)}, hits={self.hits}, misses={self.misses}, hit_rate={self.hit_rate:.1%}"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total: int = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def saved(self) -> int:
+        """The amount of database lookups saved by the cache."""
+        return self.hits
+
+    def get(self, token: str, /) -> tuple[bool, UserModel | None]:
+        """Returns whether the token was cached, and the cached user, which is None for unknown tokens."""
+        entry: tuple[float, UserModel | None] | None = self._entries.get(token)
+
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(token, None)
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return True, entry[1]
+
+    def set(self, token: str, user: UserModel | None, /) -> None:
+        ttl: float = self.ttl if user else self.negative_ttl
+
+        self._entries[token] = (time.monotonic() + ttl, user)
+        self._entries.move_to_end(token)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user: UserModel, /) -> None:
+        """Remove any entries for this user, and their current token, E.g. after their token or scopes changed."""
+        stale: list[str] = [
+            token for token, (_, cached) in self._entries.items() if cached is not None and cached.uid == user.uid
+        ]
+
+        for token in stale:
+            del self._entries[token]
+
+        self._entries.pop(user.token, None)
+
+
 class AuthBackend(AuthenticationBackend):
     def __init__(self, app: Server) -> None:
         self.app = app
 
+        self.cache: TokenCache = TokenCache()
+        self.app.database.add_user_listener(self.cache.invalidate)
+
     async def authenticate(self, conn: HTTPConnection) -> tuple[AuthCredentials, User] | None:
         auth: str | None = conn.headers.get("authorization")
         if not auth:
             return
 
         scopes: list[str] = []
-        user: UserModel | None = await self.app.database.fetch_user(token=auth)
+
+        cached, user = self.cache.get(auth)
+        if not cached:
+            user = await self.app.database.fetch_user(token=auth)
+            self.cache.set(auth, user)
 
         if not user:
             return
@@ -1,4 +1,3 @@
--- Active: 1703653682760@@127.0.0.1@5432@timebot_test
 CREATE TABLE IF NOT EXISTS users (
     uid BIGINT PRIMARY KEY,
     discord_id BIGINT UNIQUE,
@@ -26,4 +25,4 @@ CREATE TABLE IF NOT EXISTS quotes (
 CREATE TABLE IF NOT EXISTS first_redeem (
     twitch_id BIGINT NOT NULL,
     timestamp TIMESTAMP DEFAULT (now() at time zone 'utc')
-)
\ No newline at end of file
+);
@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS eventsub_intake (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    received TIMESTAMP DEFAULT (now() at time zone 'utc'),
+    processed TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS eventsub_intake_pending_idx ON eventsub_intake (received) WHERE processed IS NULL;
@@ -0,0 +1,8 @@
+-- The current first redeem streak, a single row kept up to date by Database.add_redeem...
+CREATE TABLE IF NOT EXISTS first_streak (
+    id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+    twitch_id BIGINT NOT NULL,
+    count INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS first_redeem_timestamp_idx ON first_redeem (timestamp);
@@ -0,0 +1 @@
+CREATE INDEX IF NOT EXISTS quotes_speaker_idx ON quotes (speaker);
@@ -0,0 +1,5 @@
+-- Full-text search on quote content, with trigrams for partial word matches...
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS quotes_content_fts_idx ON quotes USING GIN (to_tsvector('english', content));
+CREATE INDEX IF NOT EXISTS quotes_content_trgm_idx ON quotes USING GIN (content gin_trgm_ops);
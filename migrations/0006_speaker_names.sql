@@ -0,0 +1,8 @@
+-- Display names of quote speakers, kept fresh by core.SpeakerNames so quote replies need no API requests...
+CREATE TABLE IF NOT EXISTS speaker_names (
+    platform TEXT NOT NULL,
+    speaker BIGINT NOT NULL,
+    name TEXT NOT NULL,
+    updated TIMESTAMP DEFAULT (now() at time zone 'utc'),
+    PRIMARY KEY (platform, speaker)
+);
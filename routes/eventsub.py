@@ -16,13 +16,15 @@ limitations under the License.
 from __future__ import annotations
 
 import asyncio
+import collections
+import datetime
 import hashlib
 import hmac
 import json
 import logging
+import time
 from typing import TYPE_CHECKING, Any
 
-import aiohttp
 import discord
 from starlette.responses import Response
 
@@ -47,12 +49,122 @@ USER_ROLES: dict[str, int] = {
     core.config["TIME_SUBS"]["twitch_id"]: core.config["TIME_SUBS"]["online_role_id"],
 }
 
+# How many notifications are processed at once, in total and per subscription type...
+WORKERS: int = 4
+DEFAULT_TYPE_LIMIT: int = 2
+TYPE_LIMITS: dict[str, int] = {
+    # Redemptions are processed in the order they were received, so first redeems and song requests stay in order...
+    "channel.channel_points_custom_reward_redemption.add": 1,
+    "stream.online": 1,
+}
+
+# Twitch recommends rejecting any message older than 10 minutes, so we only need to remember IDs for that long...
+REPLAY_WINDOW: float = 600.0
+MAX_REMEMBERED: int = 10_000
+
+
+class MessageIDs:
+    """Bounded set of recently seen EventSub message IDs, which forgets IDs older than the replay window.
+
+    IDs are kept in insertion order, so expired IDs are always at the front and removing them is amortised O(1).
+    """
+
+    __slots__ = ("_ids", "maxsize", "window")
+
+    def __init__(self, *, window: float = REPLAY_WINDOW, maxsize: int = MAX_REMEMBERED) -> None:
+        self.window: float = window
+        self.maxsize: int = maxsize
+        self._ids: collections.OrderedDict[str, float] = collections.OrderedDict()
+
+    def __contains__(self, msg_id: object) -> bool:
+        self.expire()
+        return msg_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, msg_id: str, /) -> None:
+        self.expire()
+
+        self._ids[msg_id] = time.monotonic()
+        self._ids.move_to_end(msg_id)
+
+        while len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+
+    def expire(self) -> None:
+        cutoff: float = time.monotonic() - self.window
+
+        while self._ids:
+            oldest: float = next(iter(self._ids.values()))
+            if oldest >= cutoff:
+                break
+
+            self._ids.popitem(last=False)
+
 
 class EventSub(View):
     def __init__(self, app: Server) -> None:
         self.app = app
 
-        self.responded: list[str] = []
+        self.responded: MessageIDs = MessageIDs()
+
+        # Each subscription type has its own queue and workers, so a burst of one type can't hold up the others...
+        self._queues: dict[str, asyncio.Queue[tuple[str, dict[str, Any]]]] = {}
+        self._workers: list[asyncio.Task[None]] = []
+        self._running: asyncio.Semaphore = asyncio.Semaphore(WORKERS)
+
+    async def start(self) -> None:
+        """Queue any notifications left unprocessed by the last run.
+
+        They are handled, ahead of any new notifications, once both bots are ready.
+        """
+        pending: list[tuple[str, dict[str, Any]]] = await self.app.database.fetch_pending_eventsub()
+
+        for msg_id, data in pending:
+            self.responded.add(msg_id)
+            self.enqueue(msg_id, data)
+
+        if pending:
+            logger.info("Replaying %s unprocessed EventSub notifications.", len(pending))
+
+    def enqueue(self, msg_id: str, data: dict[str, Any], /) -> None:
+        type_: str = data["subscription"]["type"]
+
+        queue: asyncio.Queue[tuple[str, dict[str, Any]]] | None = self._queues.get(type_)
+        if queue is None:
+            queue = self._queues[type_] = asyncio.Queue()
+
+            for _ in range(TYPE_LIMITS.get(type_, DEFAULT_TYPE_LIMIT)):
+                self._workers.append(asyncio.create_task(self._worker(queue)))
+
+        queue.put_nowait((msg_id, data))
+
+    async def wait_until_ready(self) -> None:
+        """Wait until both bots have loaded the extensions which handle notifications."""
+        await self.app.dbot.wait_until_ready()
+        await self.app.tbot.wait_until_loaded()
+
+    async def _worker(self, queue: asyncio.Queue[tuple[str, dict[str, Any]]], /) -> None:
+        # Notifications received, or replayed, during startup would otherwise be completed without being handled...
+        await self.wait_until_ready()
+
+        while True:
+            msg_id, data = await queue.get()
+
+            try:
+                async with self._running:
+                    await self.notifcation_event(data)
+            except Exception as e:
+                logger.exception("EventSub notification %s raised an exception: %s", msg_id, e)
+
+            # Failed notifications are still completed, so a bad notification isn't replayed on every startup...
+            try:
+                await self.app.database.complete_eventsub(msg_id)
+            except Exception as e:
+                logger.warning("Unable to mark EventSub notification %s as processed: %s", msg_id, e)
+            finally:
+                queue.task_done()
 
     def verify_message(self, *, headers: EventSubHeaders, body: bytes) -> None:
         msg_id: str = headers["Twitch-Eventsub-Message-Id"]
@@ -62,6 +174,16 @@ class EventSub(View):
         timestamp: str = headers["Twitch-Eventsub-Message-Timestamp"]
         signature: str = headers["Twitch-Eventsub-Message-Signature"]
 
+        try:
+            sent: datetime.datetime = datetime.datetime.fromisoformat(timestamp)
+        except ValueError:
+            raise ValueError("Invalid EventSub message timestamp.") from None
+
+        age: float = (datetime.datetime.now(tz=datetime.UTC) - sent).total_seconds()
+        if age > REPLAY_WINDOW:
+            logger.warning("Rejected EventSub message %s as it is %.0f seconds old.", msg_id, age)
+            raise ValueError("EventSub message is older than the replay window.")
+
         hmac_payload: bytes = f"{msg_id}{timestamp}{body.decode('utf-8')}".encode()
         secret: bytes = SECRET.encode("utf-8")
 
@@ -86,13 +208,15 @@ class EventSub(View):
         except ValueError:
             return Response("Unable to verify EventSub integrity.", status_code=400)
 
-        self.responded.append(headers["Twitch-Eventsub-Message-Id"])
+        msg_id: str = headers["Twitch-Eventsub-Message-Id"]
         data: dict[str, Any] = json.loads(body)
 
         if message_type == "webhook_callback_verification":
+            self.responded.add(msg_id)
             return Response(data["challenge"], status_code=200, headers={"Content-Type": "text/plain"})
 
         if message_type == "revocation":
+            self.responded.add(msg_id)
             logger.warning(
                 "EventSub subscription revoked %s. Reason: %s",
                 data["subscription"]["type"],
@@ -100,9 +224,19 @@ class EventSub(View):
             )
             return Response(status_code=204)
 
-        if message_type == "notification":
-            logger.info("EventSub dispatching notification event.")
-            _: asyncio.Task = asyncio.create_task(self.notifcation_event(data))
+        # Notifications are stored before we acknowledge them, so they survive a restart...
+        # If this fails Twitch will retry the notification, so the message ID must not be marked as responded.
+        try:
+            created: bool = await self.app.database.add_eventsub(msg_id, data)
+        except Exception as e:
+            logger.error("Unable to store EventSub notification %s: %s", msg_id, e)
+            return Response("Unable to store EventSub notification.", status_code=503)
+
+        self.responded.add(msg_id)
+
+        if created:
+            logger.info("EventSub queueing notification event.")
+            self.enqueue(msg_id, data)
 
         return Response(status_code=204)
 
@@ -111,21 +245,8 @@ class EventSub(View):
         type_: str = subscription["type"]
         event: dict[str, Any] = data["event"]
 
-        for wsuuid, websocket in self.app._websocket_listeners.items():
-            if "eventsub" not in websocket["subscriptions"]:
-                continue
-
-            try:
-                await websocket["websocket"].send_json(
-                    {
-                        "op": api.WebsocketOPCodes.EVENT,
-                        "d": {"event": "eventsub", "data": data},
-                    },
-                )
-            except Exception as e:
-                logger.warning("Unable to send EventSub notification to websocket %s: %s", wsuuid, e)
-            else:
-                logger.info("EventSub notification dispatched to websocket %s.", wsuuid)
+        queued: int = self.app.dispatch_websockets(api.WebsocketSubscriptions.EVENTSUB, data=data)
+        logger.info("EventSub notification queued for %s websocket listeners.", queued)
 
         if type_ == "stream.online":
             logger.info("EventSub Stream Online received.")
@@ -144,13 +265,12 @@ class EventSub(View):
             logger.warning("EventSub received an unknown notification type: %s", type_)
 
     async def online_event(self, stream: str, stream_id: str) -> None:
-        async with aiohttp.ClientSession() as session:
-            webhook: discord.Webhook = discord.Webhook.from_url(
-                url=core.config["GENERAL"]["announcements_webhook"], session=session
-            )
+        webhook: discord.Webhook = discord.Webhook.from_url(
+            url=core.config["GENERAL"]["announcements_webhook"], session=self.app.http_client.session
+        )
 
-            mention: int = USER_ROLES[stream_id]
-            await webhook.send(f"<@&{mention}> - **{stream}** is live: [Watch](https://twitch.tv/{stream})")
+        mention: int = USER_ROLES[stream_id]
+        await webhook.send(f"<@&{mention}> - **{stream}** is live: [Watch](https://twitch.tv/{stream})")
 
     async def redeem_event(self, data: dict[str, Any]) -> None:
         # step 2 of first_redeem
@@ -171,8 +291,9 @@ class EventSub(View):
         if event["status"].lower() != "unfulfilled":
             return
 
-        self.app.tbot.run_event("api_request_song", event)
-        logger.info("EventSub dispatched event for <Play this song> to <api_request_song>.")
+        # Handlers are awaited, so the notification is only completed once they have finished...
+        await self.app.tbot.handle_event("api_request_song", event)
+        logger.info("EventSub handled <Play this song> with <api_request_song>.")
 
     async def redeem_first(self, event: dict[str, Any]) -> None:
         # step 4 of first_redeem
@@ -180,12 +301,11 @@ class EventSub(View):
 
         await self.app.database.add_redeem(twitch_id)
 
-        # built into twitchio; dispatches event via tbot so it can be listened to
-        self.app.tbot.run_event("api_first_redeem", event)
-        logger.info("first-redeem event recevied by twitch bot")
+        await self.app.tbot.handle_event("api_first_redeem", event)
+        logger.info("first-redeem event handled by twitch bot")
 
     async def raid_event(self, from_id: str, viewers: int) -> None:
-        self.app.tbot.run_event("time_raid", from_id, viewers)
+        await self.app.tbot.handle_event("time_raid", from_id, viewers)
 
     async def redeem_hey_listen(self, event: dict[str, Any]) -> None:
-        self.app.tbot.run_event("api_hey_listen", event)
+        await self.app.tbot.handle_event("api_hey_listen", event)
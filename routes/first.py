@@ -15,21 +15,22 @@ limitations under the License.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import TYPE_CHECKING, Any
 
 import twitchio
-from starlette.responses import FileResponse, HTMLResponse
+from starlette.responses import FileResponse, HTMLResponse, JSONResponse
 
 import core
-from api import View, route
+from api import View, cacheable, route
 
 
 if TYPE_CHECKING:
     from starlette.requests import Request
     from starlette.responses import Response
 
-    from api import Server
+    from api import FirstStreakModel, Server
 
 # this api endpoint just returns the longest streak (json) of a particular twitch user
 
@@ -42,18 +43,16 @@ class Redeems(View):
 
     #  (3/3 component- send new data)
     @route("/first/data", methods=["GET"])
+    @cacheable()
     async def get_first_streak_data(self, request: Request) -> Response:
-        all_redeems = await self.app.database.fetch_redeems()
-        redeemer_twitch_id = all_redeems[0].twitch_id
-        count = 0
+        streak: FirstStreakModel | None = await self.app.database.fetch_streak()
+        if not streak:
+            return HTMLResponse("")
 
-        user_list: list[twitchio.User] = await self.app.tbot.fetch_users(ids=[redeemer_twitch_id])
-        username: str = user_list[0].display_name
+        count = streak.count
 
-        for redeem in all_redeems:
-            if redeemer_twitch_id != redeem.twitch_id:
-                break
-            count += 1
+        user: twitchio.User | None = await self.app.tbot.resolver.fetch_user(user_id=streak.twitch_id)
+        username: str = user.display_name if user else "Unknown"
 
         html_data: str = f"""
             <span style="color: white; background-color: rgba(0, 0, 0, 0.3); font-size: 20px; font-decoration: bold; font-family: Montserrat, sans-serif; padding: 2px 5px 2px 5px; border-radius: 8px;">
@@ -62,6 +61,29 @@ class Redeems(View):
         """
         return HTMLResponse(html_data)
 
+    @route("/first/leaderboard", methods=["GET"])
+    @cacheable()
+    async def get_first_leaderboard(self, request: Request) -> Response:
+        """Returns the longest first redeem streak of each user, longest first. Accepts a `limit` of up to 100."""
+        try:
+            limit: int = min(max(int(request.query_params.get("limit", 10)), 1), 100)
+        except ValueError:
+            return JSONResponse({"error": "limit must be an integer."}, status_code=400)
+
+        streaks: list[FirstStreakModel] = await self.app.database.fetch_longest_streaks(limit=limit)
+
+        # The resolver merges these lookups into a single Helix request...
+        users: list[twitchio.User | BaseException | None] = await asyncio.gather(
+            *(self.app.tbot.resolver.fetch_user(user_id=streak.twitch_id) for streak in streaks),
+            return_exceptions=True,
+        )
+
+        data: list[dict[str, Any]] = [
+            {**streak.as_dict(), "name": user.display_name if isinstance(user, twitchio.User) else None}
+            for streak, user in zip(streaks, users, strict=True)
+        ]
+        return JSONResponse(data)
+
     # this path is redeems/first
     @route("/first", methods=["GET"])  # (2/3 component - displays the html page)
     async def get_first_streak(self, request: Request) -> Response:
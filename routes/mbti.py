@@ -20,9 +20,9 @@ import logging
 # from starlette.authentication import requires // for locking endpoints etc
 from typing import TYPE_CHECKING
 
-from starlette.responses import JSONResponse, Response
+from starlette.responses import Response
 
-from api import View, route
+from api import View, cacheable, route
 
 
 if TYPE_CHECKING:
@@ -33,11 +33,15 @@ if TYPE_CHECKING:
 logger: logging.Logger = logging.getLogger(__name__)
 
 
+def mbti_version(view: Mbti, request: Request) -> str:
+    return view.app.dbot.mbti.etag
+
+
 class Mbti(View):
     def __init__(self, app: Server) -> None:
         self.app = app
 
     @route("/roles", methods=["GET"])
+    @cacheable(mbti_version)
     async def get_role(self, request: Request) -> Response:
-        counts: dict[str, int] = self.app.dbot.mbti_count()
-        return JSONResponse(counts, status_code=200)
+        return Response(self.app.dbot.mbti.body, status_code=200, media_type="application/json")
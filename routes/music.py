@@ -23,7 +23,7 @@ from starlette.authentication import requires
 from starlette.responses import JSONResponse, Response
 
 import core
-from api import View, limit, route
+from api import View, cacheable, limit, route
 
 
 if TYPE_CHECKING:
@@ -34,12 +34,24 @@ if TYPE_CHECKING:
 logger: logging.Logger = logging.getLogger(__name__)
 
 
+def player_version(view: Player, request: Request) -> str | None:
+    player: core.Player | None
+    player = wavelink.Pool.get_node().get_player(core.TIME_GUILD)  # type: ignore
+
+    version: str | None = getattr(player, "version_tag", None)
+    if version is None:
+        return None
+
+    return f"{request.url.path}-{version}"
+
+
 class Player(View):
     def __init__(self, app: Server) -> None:
         self.app = app
 
     @route("/info", methods=["GET"])
     @limit(core.config["LIMITS"]["player_json"]["rate"], core.config["LIMITS"]["player_json"]["per"])
+    @cacheable()
     async def get_player(self, request: Request) -> Response:
         player: wavelink.Player | None
         player = wavelink.Pool.get_node().get_player(core.TIME_GUILD)
@@ -66,6 +78,7 @@ class Player(View):
 
     @route("/current", methods=["GET"])
     @limit(core.config["LIMITS"]["player_json"]["rate"], core.config["LIMITS"]["player_json"]["per"])
+    @cacheable(player_version)
     async def get_current_track(self, request: Request) -> Response:
         player: wavelink.Player | None
         player = wavelink.Pool.get_node().get_player(core.TIME_GUILD)
@@ -80,6 +93,7 @@ class Player(View):
 
     @route("/queue", methods=["GET"])
     @limit(core.config["LIMITS"]["player_json"]["rate"], core.config["LIMITS"]["player_json"]["per"])
+    @cacheable(player_version)
     async def player_queue(self, request: Request) -> Response:
         player: wavelink.Player | None
         player = wavelink.Pool.get_node().get_player(core.TIME_GUILD)
@@ -96,7 +110,7 @@ class Player(View):
         }
         return JSONResponse(data, status_code=200)
 
-    @route("/controls/volume", methods=["PATCH"])
+    @route("/controls/volume", methods=["PATCH"], auth=True)
     @requires("moderator")
     async def set_player_volume(self, request: Request) -> Response:
         player: wavelink.Player | None
@@ -138,7 +152,7 @@ class Player(View):
         self.app.tbot.run_event("api_player_volume", to_return)
         return JSONResponse(to_return, status_code=200)
 
-    @route("/controls/pause", methods=["PATCH"])
+    @route("/controls/pause", methods=["PATCH"], auth=True)
     @requires("moderator")
     async def pause_player(self, request: Request) -> Response:
         player: wavelink.Player | None
@@ -161,7 +175,7 @@ class Player(View):
         self.app.tbot.run_event("api_player_pause", to_return)
         return JSONResponse(to_return, status_code=200)
 
-    @route("/controls/skip", methods=["PATCH"])
+    @route("/controls/skip", methods=["PATCH"], auth=True)
     @requires("moderator")
     async def skip_track(self, request: Request) -> Response:
         player: wavelink.Player | None
@@ -183,11 +197,11 @@ class Player(View):
         self.app.tbot.run_event("api_player_skip", to_return)
         return JSONResponse(to_return, status_code=200)
 
-    @route("/controls/play", methods=["POST"])
+    @route("/controls/play", methods=["POST"], auth=True)
     @requires("moderator")
     async def play_track(self, request: Request) -> Response:
-        player: wavelink.Player | None
-        player = wavelink.Pool.get_node().get_player(core.TIME_GUILD)
+        player: core.Player | None
+        player = wavelink.Pool.get_node().get_player(core.TIME_GUILD)  # type: ignore
 
         if not player:
             return JSONResponse({"error": "No player is currently active."}, status_code=404)
@@ -211,7 +225,7 @@ class Player(View):
             return JSONResponse({"error": f"No tracks were found with query: {search}."}, status_code=422)
 
         track: wavelink.Playable = tracks[0]
-        player.queue.put(track)
+        await player.enqueue(track)
         started: bool = False
 
         if not player.playing:
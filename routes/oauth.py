@@ -15,11 +15,9 @@ limitations under the License.
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import TYPE_CHECKING
 
-import aiohttp
 from starlette.responses import Response
 
 from api import View, limit, route
@@ -72,22 +70,21 @@ class OAuth(View):
             f"redirect_uri={REDIRECT}"
         )
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url) as resp:
-                if resp.status != 200:
-                    return Response(f"Twitch returned status (Auth): {resp.status}", status_code=500)
+        async with self.app.http_client.post(url) as resp:
+            if resp.status != 200:
+                return Response(f"Twitch returned status (Auth): {resp.status}", status_code=500)
 
-                data = await resp.json()
-                access: str = data["access_token"]
-                refresh: str = data["refresh_token"]
+            data = await resp.json()
+            access: str = data["access_token"]
+            refresh: str = data["refresh_token"]
 
-            async with session.get(TWITCH_VALIDATE, headers={"Authorization": f"OAuth {access}"}) as resp:
-                if resp.status != 200:
-                    return Response(f"Twitch returned status (Validate): {resp.status}", status_code=500)
+        async with self.app.http_client.get(TWITCH_VALIDATE, headers={"Authorization": f"OAuth {access}"}) as resp:
+            if resp.status != 200:
+                return Response(f"Twitch returned status (Validate): {resp.status}", status_code=500)
 
-                data = await resp.json()
-                twitch_id: int = int(data["user_id"])
-                client_id: str = data["client_id"]
+            data = await resp.json()
+            twitch_id: int = int(data["user_id"])
+            client_id: str = data["client_id"]
 
         try:
             await self.app.database.refresh_or_create_user(twitch_id=twitch_id, state=state)
@@ -95,15 +92,8 @@ class OAuth(View):
             return Response(f"Bad request: {e}", status_code=400)
 
         if twitch_id == int(config["TIME_SUBS"]["twitch_id"]):
-            with open(".secrets.json", "r+") as fp:
-                current: dict[str, str] = json.load(fp)
-
-                current["token"] = access
-                current["refresh"] = refresh
-                current["client_id"] = client_id
-
-                fp.seek(0)
-                json.dump(current, fp=fp)
-                fp.truncate()
+            await self.app.tbot.tokens.update(
+                token=access, refresh=refresh, client_id=client_id, expires_in=data.get("expires_in")
+            )
 
         return Response("Success, you may close this window!", status_code=200)
@@ -31,9 +31,16 @@ from api import View, limit, route
 
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from starlette.requests import Request
 
-    from api import Server, UserModel
+    from api import Broker, Server, UserModel
+
+    # (version, body, etag)
+    Fragment = tuple[int, bytes, str]
+    # (html before the like button, track identifier, not liked button html, html after the like button)
+    HistoryPart = tuple[str, str, str, str]
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -42,6 +49,13 @@ DISCORD_API_ENDPOINT = "https://discord.com/api/v10"
 DISCORD_REDIRECT_URL: str = core.config["API"]["public_host"] + "playerdashboard/oauth/discord"
 DISCORD_CDN_ENDPOINT: str = "https://cdn.discordapp.com/"
 
+# SSE topics which carry pre-rendered dashboard HTML, and the player events which cause them to be rendered...
+QUEUE_FRAGMENT: str = "player_queue_html"
+REQUESTS_FRAGMENT: str = "player_requests_html"
+FRAGMENT_TRIGGERS: tuple[str, ...] = ("track_start", "player_update")
+
+LIKED_HTML: str = """<span class="material-symbols-rounded liked">favorite</span>"""
+
 
 class PlayerDashboard(View):
     def __init__(self, app: Server) -> None:
@@ -50,6 +64,13 @@ class PlayerDashboard(View):
         self.liked: dict[int, list[str]] = {}
         self.sent: list[str] = []
 
+        # Rendered HTML, cached against the `core.Player.version` it was rendered from...
+        self._fragments: dict[str, Fragment] = {}
+        self._history: tuple[int, list[HistoryPart]] | None = None
+
+        for topic in FRAGMENT_TRIGGERS:
+            self.app.broker.add_listener(topic, self.push_fragments)
+
     def get_badge_html(self, chatter: twitchio.Chatter) -> str:
         badges: list[str] = []
 
@@ -67,14 +88,198 @@ class PlayerDashboard(View):
 
         return "\n".join([f'<img src="{badge}" />' for badge in badges])
 
+    def render_queue(self, player: core.Player | None) -> str:
+        if not player or not hasattr(player, "loaded"):
+            return """<b>No player is currently active.</b>"""
+
+        track_html: list[str] = []
+
+        queues = list(player.queue.copy()) + player.auto_queue[0:10]
+        for track in queues:
+            artwork = track.artwork or "/static/img/album_placeholder.png"
+            title = f"{escape(track.title)[:40]}{'...' if len(track.title) > 40 else ''}"
+            author = f"{escape(track.author)[:40]}{'...' if len(track.author) > 40 else ''}"
+            duration = track.length
+
+            requester: twitchio.User | None = getattr(track, "twitch_user", None)
+            requested: str = f"{requester.display_name}" if requester else "Bot AutoPlay"
+            requester_url: str = f"https://twitch.tv/{requester.name}" if requester else "https://twitch.tv/thetimebot"
+            requester_img: str = requester.profile_image if requester else "/static/img/time_bot.png"
+
+            badge_html: str = ""
+            channel: twitchio.Channel | None = self.app.tbot.get_channel("timeenjoyed")
+            if requester and channel:
+                chatter: twitchio.Chatter | twitchio.PartialChatter | None = channel.get_chatter(requester.name)
+
+                if chatter and isinstance(chatter, twitchio.Chatter):
+                    badge_html = self.get_badge_html(chatter)
+
+            elif not requester:
+                badge_html = (
+                    """<img src="https://static-cdn.jtvnw.net/badges/v1/3267646d-33f0-4b17-b3df-f923a41db1d0/2" />"""
+                )
+
+            html = f"""
+            <div class="queueTrack">
+                <div class="queueTrackMeta">
+                    <img src="{artwork}" alt="Album Artwork">
+                    <a class="queueTrackMetaTitle" href="{track.uri}" target="_blank">
+                        <span style="filter: brightness(90%);">{title}</span>
+                        <small style="filter: brightness(60%);">{author}</small>
+                        <small style="filter: brightness(40%);">{player.ms_to_hr(duration)}</small>
+                    </a>
+                </div>
+
+                <div class="queueTrackRequester hover">
+                    <div class="tooltip requesterTooltip">
+                        <img src="{requester_img}" alt="Requester Image">
+                        <a href="{requester_url}">{requested}</a>
+                        <div class="requesterBadges">
+                            {badge_html}
+                        </div>
+                    </div>
+                    <img src="{requester_img}" alt="Requester Image">
+                </div>
+            </div>
+            """
+            track_html.append(html)
+
+        return "\n".join(track_html)
+
+    def render_requests(self, player: core.Player | None) -> str:
+        if not player or not hasattr(player, "loaded"):
+            return """<b>No player is currently active.</b>"""
+
+        return """
+        <span>Requests</span>
+        """
+
+    def render_history(self, player: core.Player) -> list[HistoryPart]:
+        parts: list[HistoryPart] = []
+
+        queues = list(player.queue.history) + list(player.auto_queue.history)  # type: ignore
+        for track in reversed(queues):  # type: ignore
+            artwork = track.artwork or "/static/img/album_placeholder.png"
+            title = f"{escape(track.title)[:40]}{'...' if len(track.title) > 40 else ''}"
+            author = f"{escape(track.author)[:40]}{'...' if len(track.author) > 40 else ''}"
+            duration = track.length
+
+            requester: twitchio.User | None = getattr(track, "twitch_user", None)
+            requested: str = f"{requester.display_name}" if requester else "Bot AutoPlay"
+            requester_url: str = f"https://twitch.tv/{requester.name}" if requester else "https://twitch.tv/thetimebot"
+            requester_img: str = requester.profile_image if requester else "/static/img/time_bot.png"
+
+            badge_html: str = ""
+            channel: twitchio.Channel | None = self.app.tbot.get_channel("timeenjoyed")
+            if requester and channel:
+                chatter: twitchio.Chatter | twitchio.PartialChatter | None = channel.get_chatter(requester.name)
+
+                if chatter and isinstance(chatter, twitchio.Chatter):
+                    badge_html = self.get_badge_html(chatter)
+
+            elif not requester:
+                badge_html = (
+                    """<img src="https://static-cdn.jtvnw.net/badges/v1/3267646d-33f0-4b17-b3df-f923a41db1d0/2" />"""
+                )
+
+            not_liked: str = f"""<span class="material-symbols-rounded notLiked" hx-post="/playerdashboard/like?identifier={urllib.parse.quote(track.identifier)}&uri={urllib.parse.quote(str(track.uri))}" hx-swap="outerHTML">favorite</span>"""
+
+            before: str = f"""
+            <div class="queueTrack">
+                <div class="queueTrackMeta">
+                    <img src="{artwork}" alt="Album Artwork">
+                    <a class="queueTrackMetaTitle" href="{track.uri}" target="_blank">
+                        <span style="filter: brightness(90%);">{title}</span>
+                        <small style="filter: brightness(60%);">{author}</small>
+                        <small style="filter: brightness(40%);">{player.ms_to_hr(duration)}</small>
+                    </a>
+                </div>
+
+                <div class="historyEnd">
+                    """
+
+            after: str = f"""
+
+                    <div class="queueTrackRequester hover">
+                        <div class="tooltip requesterTooltip">
+                            <img src="{requester_img}" alt="Requester Image">
+                            <a href="{requester_url}">{requested}</a>
+                            <div class="requesterBadges">
+                                {badge_html}
+                            </div>
+                        </div>
+                        <img src="{requester_img}" alt="Requester Image">
+                    </div>
+                </div>
+            </div>
+            """
+            parts.append((before, track.identifier, not_liked, after))
+
+        return parts
+
+    def cached_fragment(self, name: str, player: core.Player, render: Callable[[core.Player], str]) -> Fragment:
+        cached: Fragment | None = self._fragments.get(name)
+        if cached and cached[0] == player.version:
+            return cached
+
+        fragment: Fragment = (player.version, render(player).encode("utf-8"), f'"{name}-{player.version_tag}"')
+        self._fragments[name] = fragment
+
+        return fragment
+
+    def cached_history(self, player: core.Player) -> list[HistoryPart]:
+        if self._history and self._history[0] == player.version:
+            return self._history[1]
+
+        parts: list[HistoryPart] = self.render_history(player)
+        self._history = (player.version, parts)
+
+        return parts
+
+    def etag_matches(self, request: Request, etag: str) -> bool:
+        return etag in request.headers.get("if-none-match", "")
+
+    def cache_headers(self, etag: str) -> dict[str, str]:
+        # Fragments depend on the session, so browsers may keep them, but must revalidate each time...
+        return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    def not_modified(self, etag: str) -> Response:
+        return Response(status_code=304, headers=self.cache_headers(etag))
+
+    def fragment_response(self, request: Request, fragment: Fragment) -> Response:
+        _, body, etag = fragment
+
+        if self.etag_matches(request, etag):
+            return self.not_modified(etag)
+
+        return HTMLResponse(body, headers=self.cache_headers(etag))
+
+    def push_fragments(self, data: dict[str, Any]) -> None:
+        # Rendered once per (coalesced) player change and pushed to every dashboard, instead of each refetching...
+        broker: Broker = self.app.broker
+        if not broker.subscribers(QUEUE_FRAGMENT) and not broker.subscribers(REQUESTS_FRAGMENT):
+            return
+
+        player: core.Player | None = data.get("player")
+        if not player or not hasattr(player, "loaded"):
+            broker.publish(QUEUE_FRAGMENT, {"html": self.render_queue(player)})
+            broker.publish(REQUESTS_FRAGMENT, {"html": self.render_requests(player)})
+            return
+
+        # Rendering through the cache means the following GETs from dashboards are served without re-rendering...
+        queue: Fragment = self.cached_fragment("queue", player, self.render_queue)
+        requests: Fragment = self.cached_fragment("requests", player, self.render_requests)
+
+        broker.publish(QUEUE_FRAGMENT, {"html": queue[1].decode("utf-8")})
+        broker.publish(REQUESTS_FRAGMENT, {"html": requests[1].decode("utf-8")})
+
     async def validate_discord_user(self, token: str) -> dict[str, Any] | None:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{DISCORD_API_ENDPOINT}/users/@me", headers={"Authorization": f"Bearer {token}"}
-            ) as resp:
-                data = await resp.json()
-                if resp.status != 200:
-                    return None
+        async with self.app.http_client.get(
+            f"{DISCORD_API_ENDPOINT}/users/@me", headers={"Authorization": f"Bearer {token}"}
+        ) as resp:
+            data = await resp.json()
+            if resp.status != 200:
+                return None
 
         user_id: int = int(data.get("id", 0))
         if not user_id:
@@ -176,20 +381,19 @@ class PlayerDashboard(View):
 
         url: str = f"{DISCORD_API_ENDPOINT}/oauth2/token"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, data=exchange, headers=headers, auth=credentials) as resp:
-                data = await resp.json()
+        async with self.app.http_client.post(url, data=exchange, headers=headers, auth=credentials) as resp:
+            data = await resp.json()
 
-                if resp.status != 200:
-                    return JSONResponse({"error": f"Invalid response from Discord: {data}"}, status_code=resp.status)
+            if resp.status != 200:
+                return JSONResponse({"error": f"Invalid response from Discord: {data}"}, status_code=resp.status)
 
-                token: str = data.get("access_token", None)
-                if not token:
-                    return JSONResponse({"error": "Invalid token provided."}, status_code=400)
+        token: str = data.get("access_token", None)
+        if not token:
+            return JSONResponse({"error": "Invalid token provided."}, status_code=400)
 
-                user: dict[str, Any] | None = await self.validate_discord_user(token)
-                if not user:
-                    return JSONResponse({"error": "Unable to verify discord user."}, status_code=400)
+        user: dict[str, Any] | None = await self.validate_discord_user(token)
+        if not user:
+            return JSONResponse({"error": "Unable to verify discord user."}, status_code=400)
 
         api_user: UserModel = await self.app.database.create_user(discord_id=user["id"], moderator=user["moderator"])
         request.session.update(
@@ -206,7 +410,11 @@ class PlayerDashboard(View):
         return RedirectResponse(url="/music", status_code=307)
 
     @route("/music", methods=["GET"], prefix=False)
-    @limit(core.config["LIMITS"]["player_dashboard"]["rate"], core.config["LIMITS"]["player_dashboard"]["per"])
+    @limit(
+        core.config["LIMITS"]["player_dashboard"]["rate"],
+        core.config["LIMITS"]["player_dashboard"]["per"],
+        bucket="user",
+    )
     async def player_dashboard(self, request: Request) -> Response:
         token: str = request.session.get("token_", "")
 
@@ -236,7 +444,7 @@ class PlayerDashboard(View):
         return HTMLResponse(html)
 
     @route("/queue", methods=["GET"])
-    @limit(core.config["LIMITS"]["player_queues"]["rate"], core.config["LIMITS"]["player_queues"]["per"])
+    @limit(core.config["LIMITS"]["player_queues"]["rate"], core.config["LIMITS"]["player_queues"]["per"], bucket="user")
     async def get_player_queue(self, request: Request) -> Response:
         session: dict[str, Any] = request.session
         if not session:
@@ -246,65 +454,12 @@ class PlayerDashboard(View):
         player = wavelink.Pool.get_node().get_player(core.TIME_GUILD)  # type: ignore
 
         if not player or not hasattr(player, "loaded"):
-            html = """<b>No player is currently active.</b>"""
-            return HTMLResponse(html)
-
-        track_html: list[str] = []
-
-        queues = list(player.queue.copy()) + player.auto_queue[0:10]
-        for track in queues:
-            artwork = track.artwork or "/static/img/album_placeholder.png"
-            title = f"{escape(track.title)[:40]}{'...' if len(track.title) > 40 else ''}"
-            author = f"{escape(track.author)[:40]}{'...' if len(track.author) > 40 else ''}"
-            duration = track.length
-
-            requester: twitchio.User | None = getattr(track, "twitch_user", None)
-            requested: str = f"{requester.display_name}" if requester else "Bot AutoPlay"
-            requester_url: str = f"https://twitch.tv/{requester.name}" if requester else "https://twitch.tv/thetimebot"
-            requester_img: str = requester.profile_image if requester else "/static/img/time_bot.png"
-
-            badge_html: str = ""
-            channel: twitchio.Channel | None = self.app.tbot.get_channel("timeenjoyed")
-            if requester and channel:
-                chatter: twitchio.Chatter | twitchio.PartialChatter | None = channel.get_chatter(requester.name)
-
-                if chatter and isinstance(chatter, twitchio.Chatter):
-                    badge_html = self.get_badge_html(chatter)
-
-            elif not requester:
-                badge_html = (
-                    """<img src="https://static-cdn.jtvnw.net/badges/v1/3267646d-33f0-4b17-b3df-f923a41db1d0/2" />"""
-                )
-
-            html = f"""
-            <div class="queueTrack">
-                <div class="queueTrackMeta">
-                    <img src="{artwork}" alt="Album Artwork">
-                    <a class="queueTrackMetaTitle" href="{track.uri}" target="_blank">
-                        <span style="filter: brightness(90%);">{title}</span>
-                        <small style="filter: brightness(60%);">{author}</small>
-                        <small style="filter: brightness(40%);">{player.ms_to_hr(duration)}</small>
-                    </a>
-                </div>
-
-                <div class="queueTrackRequester hover">
-                    <div class="tooltip requesterTooltip">
-                        <img src="{requester_img}" alt="Requester Image">
-                        <a href="{requester_url}">{requested}</a>
-                        <div class="requesterBadges">
-                            {badge_html}
-                        </div>
-                    </div>
-                    <img src="{requester_img}" alt="Requester Image">
-                </div>
-            </div>
-            """
-            track_html.append(html)
+            return HTMLResponse(self.render_queue(player))
 
-        return HTMLResponse("\n".join(track_html))
+        return self.fragment_response(request, self.cached_fragment("queue", player, self.render_queue))
 
     @route("/history", methods=["GET"])
-    @limit(core.config["LIMITS"]["player_queues"]["rate"], core.config["LIMITS"]["player_queues"]["per"])
+    @limit(core.config["LIMITS"]["player_queues"]["rate"], core.config["LIMITS"]["player_queues"]["per"], bucket="user")
     async def get_player_history(self, request: Request) -> Response:
         session: dict[str, Any] = request.session
         if not session:
@@ -317,76 +472,29 @@ class PlayerDashboard(View):
             html = """<b>No history available.</b>"""
             return HTMLResponse(html)
 
-        track_html: list[str] = []
-
-        queues = list(player.queue.history) + list(player.auto_queue.history)  # type: ignore
-        for track in reversed(queues):  # type: ignore
-            artwork = track.artwork or "/static/img/album_placeholder.png"
-            title = f"{escape(track.title)[:40]}{'...' if len(track.title) > 40 else ''}"
-            author = f"{escape(track.author)[:40]}{'...' if len(track.author) > 40 else ''}"
-            duration = track.length
-
-            requester: twitchio.User | None = getattr(track, "twitch_user", None)
-            requested: str = f"{requester.display_name}" if requester else "Bot AutoPlay"
-            requester_url: str = f"https://twitch.tv/{requester.name}" if requester else "https://twitch.tv/thetimebot"
-            requester_img: str = requester.profile_image if requester else "/static/img/time_bot.png"
+        # The shared history is cached against the player version, the users liked hearts are overlayed on top...
+        uid: int | None = session.get("id")
+        liked: list[str] = self.liked.get(uid, []) if uid else []
+        etag: str = f'"history-{player.version_tag}-{uid}-{len(liked)}"'
 
-            badge_html: str = ""
-            channel: twitchio.Channel | None = self.app.tbot.get_channel("timeenjoyed")
-            if requester and channel:
-                chatter: twitchio.Chatter | twitchio.PartialChatter | None = channel.get_chatter(requester.name)
+        if self.etag_matches(request, etag):
+            return self.not_modified(etag)
 
-                if chatter and isinstance(chatter, twitchio.Chatter):
-                    badge_html = self.get_badge_html(chatter)
+        parts: list[HistoryPart] = self.cached_history(player)
+        track_html: list[str] = []
 
-            elif not requester:
-                badge_html = (
-                    """<img src="https://static-cdn.jtvnw.net/badges/v1/3267646d-33f0-4b17-b3df-f923a41db1d0/2" />"""
-                )
+        for before, identifier, not_liked, after in parts:
+            fave: str = ""
 
-            uid: int | None = session.get("id")
             if uid:
-                if uid not in self.liked:
-                    self.liked[uid] = []
+                fave = LIKED_HTML if identifier in liked else not_liked
 
-                if track.identifier in self.liked[uid]:
-                    fave: str = """<span class="material-symbols-rounded liked">favorite</span>"""
-                else:
-                    fave = f"""<span class="material-symbols-rounded notLiked" hx-post="/playerdashboard/like?identifier={urllib.parse.quote(track.identifier)}&uri={urllib.parse.quote(str(track.uri))}" hx-swap="outerHTML">favorite</span>"""
+            track_html.append(f"{before}{fave}{after}")
 
-            html = f"""
-            <div class="queueTrack">
-                <div class="queueTrackMeta">
-                    <img src="{artwork}" alt="Album Artwork">
-                    <a class="queueTrackMetaTitle" href="{track.uri}" target="_blank">
-                        <span style="filter: brightness(90%);">{title}</span>
-                        <small style="filter: brightness(60%);">{author}</small>
-                        <small style="filter: brightness(40%);">{player.ms_to_hr(duration)}</small>
-                    </a>
-                </div>
-
-                <div class="historyEnd">
-                    {fave}
-
-                    <div class="queueTrackRequester hover">
-                        <div class="tooltip requesterTooltip">
-                            <img src="{requester_img}" alt="Requester Image">
-                            <a href="{requester_url}">{requested}</a>
-                            <div class="requesterBadges">
-                                {badge_html}
-                            </div>
-                        </div>
-                        <img src="{requester_img}" alt="Requester Image">
-                    </div>
-                </div>
-            </div>
-            """
-            track_html.append(html)
-
-        return HTMLResponse("\n".join(track_html))
+        return HTMLResponse("\n".join(track_html), headers=self.cache_headers(etag))
 
     @route("/requests", methods=["GET"])
-    @limit(core.config["LIMITS"]["player_queues"]["rate"], core.config["LIMITS"]["player_queues"]["per"])
+    @limit(core.config["LIMITS"]["player_queues"]["rate"], core.config["LIMITS"]["player_queues"]["per"], bucket="user")
     async def get_player_requests(self, request: Request) -> Response:
         session: dict[str, Any] = request.session
         if not session:
@@ -396,13 +504,9 @@ class PlayerDashboard(View):
         player = wavelink.Pool.get_node().get_player(core.TIME_GUILD)  # type: ignore
 
         if not player or not hasattr(player, "loaded"):
-            html = """<b>No player is currently active.</b>"""
-            return HTMLResponse(html)
+            return HTMLResponse(self.render_requests(player))
 
-        html = """
-        <span>Requests</span>
-        """
-        return HTMLResponse(html)
+        return self.fragment_response(request, self.cached_fragment("requests", player, self.render_requests))
 
     @route("/user", methods=["GET"])
     async def get_user(self, request: Request) -> Response:
@@ -436,7 +540,7 @@ class PlayerDashboard(View):
         return HTMLResponse(html)
 
     @route("/footer/playing", methods=["GET"])
-    @limit(core.config["LIMITS"]["player_meta"]["rate"], core.config["LIMITS"]["player_meta"]["per"])
+    @limit(core.config["LIMITS"]["player_meta"]["rate"], core.config["LIMITS"]["player_meta"]["per"], bucket="user")
     async def get_playing_footer(self, request: Request) -> Response:
         session: dict[str, Any] = request.session
         if not session:
@@ -492,7 +596,7 @@ class PlayerDashboard(View):
         return HTMLResponse(html)
 
     @route("/like", methods=["POST"])
-    @limit(core.config["LIMITS"]["player_likes"]["rate"], core.config["LIMITS"]["player_likes"]["per"])
+    @limit(core.config["LIMITS"]["player_likes"]["rate"], core.config["LIMITS"]["player_likes"]["per"], bucket="user")
     async def like_track(self, request: Request) -> Response:
         player: core.Player | None
         player = wavelink.Pool.get_node().get_player(core.TIME_GUILD)  # type: ignore
@@ -540,7 +644,7 @@ class PlayerDashboard(View):
         return HTMLResponse("<span class='material-symbols-rounded liked'>favorite</span>", headers=headers)
 
     @route("/send", methods=["POST"])
-    @limit(core.config["LIMITS"]["player_likes"]["rate"], core.config["LIMITS"]["player_likes"]["per"])
+    @limit(core.config["LIMITS"]["player_likes"]["rate"], core.config["LIMITS"]["player_likes"]["per"], bucket="user")
     async def send_track(self, request: Request) -> Response:
         identifier: str = urllib.parse.unquote(request.query_params.get("identifier", ""))
         uri: str = urllib.parse.unquote(request.query_params.get("uri", ""))
@@ -571,11 +675,10 @@ class PlayerDashboard(View):
             return Response("Unauthorized", status_code=401)
 
         message: str = f"**Sent via Dashboard:**\n{uri}"
-        async with aiohttp.ClientSession() as session_:
-            url: str = core.config["GENERAL"]["music_webhook"]
-            webhook: discord.Webhook = discord.Webhook.from_url(url=url, session=session_)
+        url: str = core.config["GENERAL"]["music_webhook"]
+        webhook: discord.Webhook = discord.Webhook.from_url(url=url, session=self.app.http_client.session)
 
-            await webhook.send(content=message, avatar_url=member.display_avatar.url, username=member.display_name)
+        await webhook.send(content=message, avatar_url=member.display_avatar.url, username=member.display_name)
 
         self.sent.append(identifier)
         await self.app.dispatch_htmx("sent_song", data={"data": ""})
@@ -23,10 +23,11 @@ from typing import TYPE_CHECKING, Any
 from starlette.responses import JSONResponse, Response
 
 import core
-from api import View, limit, route
+from api import QuoteModel, View, limit, route
 
 
 if TYPE_CHECKING:
+    import twitchio
     from starlette.requests import Request
 
     from api import Server
@@ -34,6 +35,10 @@ if TYPE_CHECKING:
 
 logger: logging.Logger = logging.getLogger(__name__)
 
+# Quote IDs are INTEGER and speaker IDs BIGINT, anything larger would fail in the database...
+MAX_QUOTE_ID: int = 2**31 - 1
+MAX_SPEAKER_ID: int = 2**63 - 1
+
 
 class Quotes(View):
     def __init__(self, app: Server) -> None:
@@ -49,17 +54,53 @@ class Quotes(View):
         except ValueError:
             return Response("Bad quote ID.", status_code=400)
 
-        row = await self.app.database.fetch_quote(identifier)
-        if not row:
+        body: bytes | None = await self.app.database.fetch_quote_json(identifier)
+        if body is None:
             return Response(f'Quote with id "{identifier}" was not found or may have been removed.', status_code=404)
 
-        data: dict[str, Any] = {
-            "id": identifier,
-            "content": row["content"],
-            "added_by": row["added_by"],
-            "speaker": row["speaker"],
-            "source": row["source"],
-            "created": row["created"].isoformat(),
-        }
+        return Response(body, media_type="application/json")
+
+    @route("/", methods=["GET"])
+    @limit(core.config["LIMITS"]["quotes"]["rate"], core.config["LIMITS"]["quotes"]["per"])
+    async def search_quotes(self, request: Request) -> Response:
+        """Search quotes, newest first.
+
+        Accepts `q` to search the content, `speaker` as a Twitch/Discord ID or Twitch login, `limit` of up to 100 and
+        `before`, the `next` value from the previous page.
+        """
+        params = request.query_params
+        text: str = params.get("q", "").strip()
+        speaker: str = params.get("speaker", "").strip().removeprefix("@")
+
+        try:
+            limit_: int = min(max(int(params.get("limit", 20)), 1), 100)
+            before: int | None = int(params["before"]) if params.get("before") else None
+        except ValueError:
+            return JSONResponse({"error": "limit and before must be integers."}, status_code=400)
+
+        if not text and not speaker:
+            return JSONResponse({"error": "Either q or speaker is required."}, status_code=400)
+
+        if before is not None and not 0 < before <= MAX_QUOTE_ID:
+            return JSONResponse({"error": "before is out of range."}, status_code=400)
+
+        speakers: list[int] | None = None
+        if speaker.isascii() and speaker.isdigit():
+            if len(speaker) > 19 or int(speaker) > MAX_SPEAKER_ID:
+                return JSONResponse({"error": "speaker is out of range."}, status_code=400)
+
+            speakers = [int(speaker)]
+        elif speaker:
+            if not core.TWITCH_LOGIN.fullmatch(speaker):
+                return JSONResponse({"error": "speaker must be an ID or a Twitch login."}, status_code=400)
+
+            user: twitchio.User | None = await self.app.tbot.resolver.fetch_user(name=speaker)
+            if not user:
+                return JSONResponse({"quotes": [], "next": None})
+
+            speakers = [user.id]
+
+        rows = await self.app.database.search_quotes(text or None, speakers=speakers, before=before, limit=limit_)
+        next_: int | None = rows[-1]["id"] if len(rows) == limit_ else None
 
-        return JSONResponse(data)
+        return JSONResponse({"quotes": [QuoteModel(row).as_dict() for row in rows], "next": next_})
@@ -17,7 +17,6 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import secrets
 from typing import TYPE_CHECKING, Any, ClassVar
 
 from sse_starlette.sse import EventSourceResponse
@@ -26,13 +25,16 @@ from starlette.requests import Request
 from starlette.responses import Response
 
 import core
-from api import View, limit, route
+from api import OverflowPolicy, View, limit, route
+
+from .player_dashboard import QUEUE_FRAGMENT, REQUESTS_FRAGMENT
 
 
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator
 
-    from api import Server
+    from api import Server, Subscriber
+    from types_.broker import BrokerMessage
 
 
 logger: logging.Logger = logging.getLogger(__name__)
@@ -40,109 +42,61 @@ logger: logging.Logger = logging.getLogger(__name__)
 
 class SSE(View):
     VALID: ClassVar[set[str]] = {"track_start", "sent_song", "player_update"}
+    FRAGMENTS: ClassVar[set[str]] = {QUEUE_FRAGMENT, REQUESTS_FRAGMENT}
 
     def __init__(self, app: Server) -> None:
         self.app = app
 
-    @route("/player", methods=["GET"])
-    @limit(core.config["LIMITS"]["sse_player"]["rate"], core.config["LIMITS"]["sse_player"]["per"])
-    async def music_player_sse(self, request: Request) -> EventSourceResponse | Response:
-        # listens for the event source
-        forwarded: str | None = request.headers.get("X-Forwarded-For", None)
-        ip: str = forwarded.split(",")[0] if forwarded else request.client.host  # type: ignore
-
-        current: int = len([l for l in self.app.htmx_listeners if l.startswith(f"{ip}@")])
-        if current >= 30:
-            return Response("Too many SSE connections. Please close some existing connections.", status_code=429)
-
-        id_: str = f"{ip}@{secrets.token_urlsafe(16)}"
-        queue: asyncio.Queue = asyncio.Queue()
-        self.app.htmx_listeners[id_] = queue
-
-        logger.info('EventSource "%s" connection opened', id_)
-
+    def stream(self, subscriber: Subscriber, /) -> AsyncGenerator[dict[str, Any], Any]:
         async def publisher() -> AsyncGenerator[dict[str, Any], Any]:
             try:
                 while True:
-                    data: dict[str, Any] = await queue.get()
-                    event: str | None = data.get("event")
-
-                    if not event:
-                        logger.warning('EventSource "%s" received invalid event: %s', id_, event)
-                        continue
-
-                    event_data: dict[str, Any] = data.get("data", {})
-                    if not event_data:
-                        logger.warning('EventSource "%s" received invalid data: %s', id_, event_data)
-                        continue
+                    data: BrokerMessage = await subscriber.get()
 
-                    if event in self.VALID:
-                        yield {"event": event, "data": ""}
-                    else:
-                        logger.warning('EventSource "%s" received invalid event: %s', id_, event)
+                    # Fragment topics carry pre-rendered HTML for htmx to swap in, all others are just triggers...
+                    yield {"event": data["event"], "data": data["data"].get("html", "")}
 
             except asyncio.CancelledError as e:
-                logger.info('EventSource "%s" connection closed: %s', id_, e)
-
-                del self.app.htmx_listeners[id_]
+                logger.info('EventSource "%s" connection closed: %s', subscriber.id, e)
                 raise e
 
-        return EventSourceResponse(publisher())
+            finally:
+                self.app.broker.unsubscribe(subscriber)
 
-    @route("/redeems/first", methods=["GET"])
-    async def first_event_sse(self, request: Request) -> EventSourceResponse:
-        id_: str = secrets.token_urlsafe(18)
-        queue: asyncio.Queue = asyncio.Queue()
-        self.app.htmx_listeners[id_] = queue
+        return publisher()
 
-        logger.info('EventSource "%s" connection opened for first_event.')
+    @route("/player", methods=["GET"])
+    @limit(core.config["LIMITS"]["sse_player"]["rate"], core.config["LIMITS"]["sse_player"]["per"])
+    async def music_player_sse(self, request: Request) -> EventSourceResponse | Response:
+        # listens for the event source
+        forwarded: str | None = request.headers.get("X-Forwarded-For", None)
+        ip: str = forwarded.split(",")[0] if forwarded else request.client.host  # type: ignore
 
-        async def publisher() -> AsyncGenerator[dict[str, Any], Any]:
-            try:
-                while True:
-                    data: dict[str, Any] = await queue.get()
-                    event: str | None = data.get("event")
+        if self.app.broker.owned(ip) >= 30:
+            return Response("Too many SSE connections. Please close some existing connections.", status_code=429)
 
-                    if not event:
-                        logger.warning('EventSource "%s" received invalid event: %s', id_, event)
-                        continue
+        # Logged in dashboards can receive pre-rendered fragments instead of refetching them on every event...
+        topics: set[str] = self.VALID
+        if request.session and request.query_params.get("fragments") == "1":
+            topics = self.VALID | self.FRAGMENTS
 
-                    if event == "first_redeem":
-                        yield {"event": event, "data": ""}
+        # Player events and fragments only ever need their latest value, so undelivered ones can be merged...
+        subscriber: Subscriber = self.app.broker.subscribe(topics, policy=OverflowPolicy.COALESCE, owner=ip)
+        logger.info('EventSource "%s@%s" connection opened', ip, subscriber.id)
 
-            except asyncio.CancelledError as e:
-                logger.info('EventSource "%s" connection closed: %s', id_, e)
+        return EventSourceResponse(self.stream(subscriber))
 
-                del self.app.htmx_listeners[id_]
-                raise e
+    @route("/redeems/first", methods=["GET"])
+    async def first_event_sse(self, request: Request) -> EventSourceResponse:
+        subscriber: Subscriber = self.app.broker.subscribe(["first_redeem"], policy=OverflowPolicy.COALESCE)
+        logger.info('EventSource "%s" connection opened for first_event.', subscriber.id)
 
-        return EventSourceResponse(publisher())
+        return EventSourceResponse(self.stream(subscriber))
 
     @route("/redeems/heylisten", methods=["GET"])
     async def hey_listen_sse(self, request: Request) -> EventSourceResponse:
-        id_: str = secrets.token_urlsafe(18)
-        queue: asyncio.Queue = asyncio.Queue()
-        self.app.htmx_listeners[id_] = queue
-
-        logger.info('EventSource "%s" connection opened for hey_listen_event.')
-
-        async def publisher() -> AsyncGenerator[dict[str, Any], Any]:
-            try:
-                while True:
-                    data: dict[str, Any] = await queue.get()
-                    event: str | None = data.get("event")
-
-                    if not event:
-                        logger.warning('EventSource "%s" received invalid event: %s', id_, event)
-                        continue
-
-                    if event == "hey_listen_redeem":
-                        yield {"event": event, "data": ""}
-
-            except asyncio.CancelledError as e:
-                logger.info('EventSource "%s" connection closed: %s', id_, e)
-
-                del self.app.htmx_listeners[id_]
-                raise e
+        # Every hey listen redeem plays a sound, so these are never merged...
+        subscriber: Subscriber = self.app.broker.subscribe(["hey_listen_redeem"], policy=OverflowPolicy.DROP_OLDEST)
+        logger.info('EventSource "%s" connection opened for hey_listen_event.', subscriber.id)
 
-        return EventSourceResponse(publisher())
+        return EventSourceResponse(self.stream(subscriber))
@@ -15,8 +15,11 @@ limitations under the License.
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 import secrets
+import time
 from typing import TYPE_CHECKING, Any
 
 from starlette.authentication import requires
@@ -28,21 +31,50 @@ from api import View, limit, route
 
 
 if TYPE_CHECKING:
-    import asyncio
-
     from api import Server
+    from types_.websockets import WebsocketListener
 
 
 logger: logging.Logger = logging.getLogger(__name__)
 
 
+# The amount of undelivered messages, and the age in seconds of the oldest, before a listener is disconnected...
+OUTBOX_SIZE: int = 64
+MAX_LAG: float = 10.0
+
+
 class Websockets(View):
     def __init__(self, app: Server) -> None:
         self.app = app
-        self._keep_alives: list[asyncio.Task[None]] = []
+
+    def _send(self, uuid: str, data: dict[str, Any], /) -> None:
+        listener: WebsocketListener | None = self.app._websocket_listeners.get(uuid)
+        if listener is None:
+            return
+
+        try:
+            listener["outbox"].put_nowait((time.monotonic(), json.dumps(data, separators=(",", ":"))))
+        except asyncio.QueueFull:
+            logger.warning('Websocket "%s" outbox is full. Disconnecting slow listener.', uuid)
+            listener["writer"].cancel()
+
+    async def _writer(self, uuid: str, *, websocket: WebSocket, outbox: asyncio.Queue[tuple[float, str]]) -> None:
+        while True:
+            queued_at, payload = await outbox.get()
+
+            lag: float = time.monotonic() - queued_at
+            if lag > MAX_LAG:
+                logger.warning('Websocket "%s" is %.1f seconds behind. Disconnecting slow listener.', uuid, lag)
+                return
+
+            try:
+                await websocket.send_text(payload)
+            except Exception as e:
+                logger.info('Unable to send to websocket "%s": %s', uuid, e)
+                return
 
     async def _keep_alive(self, uuid: str, *, websocket: WebSocket) -> None:
-        await websocket.send_json({"op": api.WebsocketOPCodes.HELLO, "d": {"id": uuid}})
+        self._send(uuid, {"op": api.WebsocketOPCodes.HELLO, "d": {"id": uuid}})
 
         while True:
             try:
@@ -59,7 +91,8 @@ class Websockets(View):
 
                 if not data or not subscription:
                     logger.info("Received invalid subscribe message: %s", message)
-                    await websocket.send_json(
+                    self._send(
+                        uuid,
                         {
                             "op": api.WebsocketOPCodes.NOTIFICATION,
                             "d": {"type": "error", "message": "Invalid subscription"},
@@ -68,7 +101,8 @@ class Websockets(View):
                     continue
 
                 self.app._websocket_listeners[uuid]["subscriptions"].add(subscription)
-                await websocket.send_json(
+                self._send(
+                    uuid,
                     {
                         "op": api.WebsocketOPCodes.NOTIFICATION,
                         "d": {"type": api.WebsocketNotificationTypes.SUBSCRIPTION_ADDED, "subscription": subscription},
@@ -81,7 +115,8 @@ class Websockets(View):
 
                 if not data or not subscription:
                     logger.info("Received invalid unsubscribe message: %s", message)
-                    await websocket.send_json(
+                    self._send(
+                        uuid,
                         {
                             "op": api.WebsocketOPCodes.NOTIFICATION,
                             "d": {"type": "error", "message": "Invalid subscription"},
@@ -90,7 +125,8 @@ class Websockets(View):
                     continue
 
                 self.app._websocket_listeners[uuid]["subscriptions"].discard(subscription)
-                await websocket.send_json(
+                self._send(
+                    uuid,
                     {
                         "op": api.WebsocketOPCodes.NOTIFICATION,
                         "d": {
@@ -103,22 +139,39 @@ class Websockets(View):
             else:
                 logger.info("Received unknown OP from websocket: %s", uuid)
 
-    @route("/connect", methods=["GET"], websocket=True)
+    @route("/connect", methods=["GET"], websocket=True, auth=True)
     @requires("moderator")
     async def connect(self, websocket: WebSocket) -> None:
-        # We use Authentication Middleware so we don't need to verify the user here...
+        # This route is created with auth=True, so requires() has already verified the user here...
         await websocket.accept()
 
         uuid: str = secrets.token_urlsafe(32)
-        self.app._websocket_listeners[uuid] = {"websocket": websocket, "subscriptions": set()}
+
+        # Each connection gets its own writer, so a slow listener never holds up anyone else...
+        outbox: asyncio.Queue[tuple[float, str]] = asyncio.Queue(maxsize=OUTBOX_SIZE)
+        writer: asyncio.Task[None] = asyncio.create_task(self._writer(uuid, websocket=websocket, outbox=outbox))
+        self.app._websocket_listeners[uuid] = {
+            "websocket": websocket,
+            "subscriptions": set(),
+            "outbox": outbox,
+            "writer": writer,
+        }
+
+        reader: asyncio.Task[None] = asyncio.create_task(self._keep_alive(uuid, websocket=websocket))
 
         try:
-            await self._keep_alive(uuid, websocket=websocket)
+            done, _ = await asyncio.wait((reader, writer), return_when=asyncio.FIRST_COMPLETED)
         finally:
             del self.app._websocket_listeners[uuid]
 
+            reader.cancel()
+            writer.cancel()
+
+        # The writer only finishes first when the listener is too slow or the connection is broken...
+        code: int = api.WebsocketCloseCodes.NORMAL if reader in done else api.WebsocketCloseCodes.TRY_AGAIN_LATER
+
         try:
-            await websocket.close()
+            await websocket.close(code=code)
         except Exception as e:
             logger.debug(
                 'Failed to close websocket connection "%s" gracefully: %s. It may have bee closed be remote.', uuid, e
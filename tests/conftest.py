@@ -0,0 +1,26 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import pathlib
+
+
+ROOT: pathlib.Path = pathlib.Path(__file__).parent.parent
+
+# The bots load their config and resources relative to the working directory on import...
+os.chdir(ROOT)
+
+if not (ROOT / ".config.toml").exists():
+    os.environ.setdefault("TIMEBOT_CONFIG", "example.config.toml")
@@ -0,0 +1,52 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import pathlib
+
+import pytest
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+from starlette.testclient import TestClient
+
+from api import Application
+
+
+@pytest.fixture
+def client(tmp_path: pathlib.Path) -> TestClient:
+    (tmp_path / "app.js").write_text("console.log(1);")
+
+    app: Application = Application(mounts=[Mount("/static", app=StaticFiles(directory=tmp_path), name="static")])
+    return TestClient(app, raise_server_exceptions=True)
+
+
+def test_static_file_is_served(client: TestClient) -> None:
+    resp = client.get("/static/app.js")
+
+    assert resp.status_code == 200
+    assert resp.text == "console.log(1);"
+
+
+def test_missing_static_file_is_404(client: TestClient) -> None:
+    resp = client.get("/static/missing.js")
+
+    assert resp.status_code == 404
+    assert resp.text == "Not Found"
+
+
+def test_static_bad_method_is_405(client: TestClient) -> None:
+    resp = client.post("/static/app.js")
+
+    assert resp.status_code == 405
+    assert resp.headers["allow"] == "GET, HEAD"
@@ -0,0 +1,121 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import core
+from routes.eventsub import EventSub
+
+
+def song_request(msg_id: str) -> tuple[str, dict[str, Any]]:
+    data: dict[str, Any] = {
+        "subscription": {"type": "channel.channel_points_custom_reward_redemption.add"},
+        "event": {"status": "unfulfilled", "reward": {"title": "Play this song"}, "user_input": msg_id},
+    }
+    return msg_id, data
+
+
+class Database:
+    def __init__(self, pending: list[tuple[str, dict[str, Any]]]) -> None:
+        self.pending = pending
+        self.completed: list[str] = []
+
+    async def fetch_pending_eventsub(self) -> list[tuple[str, dict[str, Any]]]:
+        return self.pending
+
+    async def complete_eventsub(self, msg_id: str) -> None:
+        self.completed.append(msg_id)
+
+
+class Bot:
+    def __init__(self) -> None:
+        self.ready: asyncio.Event = asyncio.Event()
+        self.handled: list[str] = []
+
+    async def wait_until_ready(self) -> None:
+        await self.ready.wait()
+
+    async def wait_until_loaded(self) -> None:
+        await self.ready.wait()
+
+    async def handle_event(self, event_name: str, event: dict[str, Any]) -> None:
+        await asyncio.sleep(0.01)
+        self.handled.append(event["user_input"])
+
+
+def test_pending_notifications_wait_for_the_bots() -> None:
+    async def run() -> tuple[Database, Bot]:
+        database: Database = Database([song_request("a"), song_request("b")])
+        dbot: Bot = Bot()
+        tbot: Bot = Bot()
+
+        app: Any = SimpleNamespace(database=database, dbot=dbot, tbot=tbot, dispatch_websockets=lambda *a, **k: 0)
+        eventsub: EventSub = EventSub(app)
+
+        await eventsub.start()
+        await asyncio.sleep(0.05)
+
+        # Nothing can handle the song requests yet, so they must stay pending...
+        assert tbot.handled == []
+        assert database.completed == []
+
+        dbot.ready.set()
+        tbot.ready.set()
+
+        for queue in eventsub._queues.values():
+            await queue.join()
+
+        for worker in eventsub._workers:
+            worker.cancel()
+
+        return database, tbot
+
+    database, tbot = asyncio.run(run())
+
+    assert tbot.handled == ["a", "b"]
+    assert database.completed == ["a", "b"]
+
+
+def test_handle_event_awaits_every_handler() -> None:
+    handled: list[str] = []
+
+    async def attribute(event: str) -> None:
+        await asyncio.sleep(0.01)
+        handled.append(f"attribute-{event}")
+
+    async def listener(event: str) -> None:
+        handled.append(f"listener-{event}")
+
+    bot: Any = SimpleNamespace(event_api_request_song=attribute, _events={"event_api_request_song": [listener]})
+    asyncio.run(core.TwitchBot.handle_event(bot, "api_request_song", "x"))
+
+    assert sorted(handled) == ["attribute-x", "listener-x"]
+
+
+def test_handle_event_propagates_failures() -> None:
+    async def failing(event: str) -> None:
+        raise ValueError(event)
+
+    bot: Any = SimpleNamespace(_events={"event_api_first_redeem": [failing]})
+
+    with pytest.raises(ValueError, match="x"):
+        asyncio.run(core.TwitchBot.handle_event(bot, "api_first_redeem", "x"))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(core.TwitchBot.handle_event(bot, "api_hey_listen", "x"))
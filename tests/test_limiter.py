@@ -0,0 +1,79 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from api.limiter import RateLimit, RedisBackend
+
+
+# 2 requests per 10 seconds, so each allowed request pushes the TAT 5 seconds forward...
+LIMIT: RateLimit = RateLimit(2, 10)
+
+
+def test_allows_up_to_the_rate_then_denies() -> None:
+    async def run() -> tuple[list[bool | float], int]:
+        redis: FakeAsyncRedis = FakeAsyncRedis()
+        backend: RedisBackend = RedisBackend(redis)
+
+        results: list[bool | float] = [await backend.update("user", LIMIT) for _ in range(3)]
+        return results, await redis.pttl("limits:user")
+
+    results, ttl = asyncio.run(run())
+
+    assert results[:2] == [False, False]
+
+    # The third request is denied until the first one's slot frees up, about 5 seconds from now...
+    assert isinstance(results[2], float)
+    assert results[2] == pytest.approx(LIMIT.inverse, abs=0.5)
+
+    # The key lives until its TAT, 2 * inverse from now, and no longer...
+    assert 9000 < ttl <= 10000
+
+
+def test_denied_requests_do_not_extend_the_key() -> None:
+    async def run() -> tuple[int, int]:
+        redis: FakeAsyncRedis = FakeAsyncRedis()
+        backend: RedisBackend = RedisBackend(redis)
+
+        for _ in range(2):
+            await backend.update("user", LIMIT)
+        before: int = await redis.pttl("limits:user")
+
+        for _ in range(5):
+            assert await backend.update("user", LIMIT) is not False
+        return before, await redis.pttl("limits:user")
+
+    before, after = asyncio.run(run())
+    assert after <= before
+
+
+def test_keys_are_prefixed_and_independent() -> None:
+    async def run() -> tuple[bool | float, bool | float, list[bytes | str]]:
+        redis: FakeAsyncRedis = FakeAsyncRedis()
+        backend: RedisBackend = RedisBackend(redis, prefix="test:")
+
+        for _ in range(2):
+            await backend.update("a", LIMIT)
+
+        return await backend.update("a", LIMIT), await backend.update("b", LIMIT), sorted(await redis.keys("*"))
+
+    a, b, keys = asyncio.run(run())
+
+    assert a is not False
+    assert b is False
+    assert keys == [b"test:a", b"test:b"]
@@ -0,0 +1,102 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+from types import SimpleNamespace
+from typing import Any
+
+from core import MBTICounter
+
+
+def roles(*names: str) -> list[Any]:
+    return [SimpleNamespace(name=name) for name in names]
+
+
+def member(*names: str) -> Any:
+    return SimpleNamespace(roles=roles(*names))
+
+
+def test_add_and_remove() -> None:
+    counter: MBTICounter = MBTICounter()
+
+    counter.add(member("INTJ", "Moderator"))
+    counter.add(member("INTJ", "ENFP"))
+    assert counter.counts["INTJ"] == 2
+    assert counter.counts["ENFP"] == 1
+
+    counter.remove(member("INTJ"))
+    assert counter.counts["INTJ"] == 1
+    assert sum(counter.counts.values()) == 2
+    assert "Moderator" not in counter.counts
+
+
+def test_update_only_counts_the_difference() -> None:
+    counter: MBTICounter = MBTICounter()
+    counter.add(member("INTJ", "ISTP"))
+
+    counter.update(roles("INTJ", "ISTP", "Subscriber"), roles("ISTP", "ENFP"))
+
+    assert counter.counts["INTJ"] == 0
+    assert counter.counts["ISTP"] == 1
+    assert counter.counts["ENFP"] == 1
+
+
+def test_duplicate_role_names_count_once() -> None:
+    counter: MBTICounter = MBTICounter()
+    counter.add(member("INTJ", "INTJ"))
+
+    assert counter.counts["INTJ"] == 1
+
+
+def test_recount_matches_incremental_counts() -> None:
+    members: list[Any] = [member("INTJ"), member("INTJ", "ENFP"), member("Moderator"), member("ISTP", "ISTP")]
+
+    incremental: MBTICounter = MBTICounter()
+    for m in members:
+        incremental.add(m)
+
+    recounted: MBTICounter = MBTICounter()
+    recounted.recount(SimpleNamespace(members=members))  # type: ignore
+
+    assert recounted.counts == incremental.counts
+    assert recounted.counts["INTJ"] == 2
+    assert recounted.counts["ISTP"] == 1
+
+
+def test_changes_bump_the_version_and_etag() -> None:
+    counter: MBTICounter = MBTICounter()
+    etag: str = counter.etag
+    body: bytes = counter.body
+
+    # Role changes that don't touch an MBTI role leave the counts, and so the ETag, alone...
+    counter.update(roles("Moderator"), roles("Subscriber"))
+    counter.update(roles("INTJ"), roles("INTJ", "Moderator"))
+    counter.recount(SimpleNamespace(members=[]))  # type: ignore
+
+    assert counter.version == 0
+    assert counter.etag == etag
+    assert counter.body is body
+
+    counter.add(member("INTJ"))
+
+    assert counter.version == 1
+    assert counter.etag != etag
+    assert counter.etag.startswith(f"mbti-{counter.epoch}-")
+    assert json.loads(counter.body)["INTJ"] == 1
+
+
+def test_epoch_differs_between_counters() -> None:
+    # Each process gets its own epoch, so version 0 of a restarted process doesn't match an old ETag...
+    assert MBTICounter().etag != MBTICounter().etag
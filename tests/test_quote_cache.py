@@ -0,0 +1,128 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import datetime
+from typing import Any
+
+import pytest
+from starlette.responses import JSONResponse
+
+import database.cache
+from api import QuoteModel
+from database import Database
+from database.cache import QuoteCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now: float = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock: Clock = Clock()
+    monkeypatch.setattr(database.cache.time, "monotonic", clock)
+
+    return clock
+
+
+def quote(id_: int, content: str = "Hello") -> Any:
+    # Records are only read by key, so a dict stands in for one...
+    return {
+        "id": id_,
+        "content": content,
+        "added_by": 1,
+        "speaker": 2,
+        "source": "twitch",
+        "created": datetime.datetime(2024, 1, 1, 12, 30),
+    }
+
+
+def test_least_recently_used_is_evicted() -> None:
+    cache: QuoteCache = QuoteCache(maxsize=2)
+    cache.set(1, quote(1))
+    cache.set(2, quote(2))
+
+    # Using 1 makes 2 the least recently used...
+    assert cache.get(1) is not None
+    cache.set(3, quote(3))
+
+    assert len(cache) == 2
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    assert cache.get(3) is not None
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_misses_expire_after_the_ttl(clock: Clock) -> None:
+    cache: QuoteCache = QuoteCache(miss_ttl=30.0)
+    cache.set(1, None)
+    cache.set(2, quote(2))
+
+    clock.now += 29.0
+    entry = cache.get(1)
+    assert entry is not None
+    assert entry.record is None
+
+    clock.now += 2.0
+    assert cache.get(1) is None
+    assert len(cache) == 1
+
+    # Found quotes never change, so they don't expire...
+    clock.now += 1_000_000.0
+    assert cache.get(2) is not None
+
+
+def test_add_quote_replaces_a_cached_miss() -> None:
+    db: Database = Database()
+    rows: dict[int, dict[str, Any]] = {}
+    fetches: list[int] = []
+
+    async def fetchrow(query: Any, *args: Any) -> dict[str, Any] | None:
+        if query.name == "add_quote":
+            rows[1] = quote(1, content=args[0])
+            return rows[1]
+
+        fetches.append(args[0])
+        return rows.get(args[0])
+
+    db.fetchrow = fetchrow  # type: ignore
+
+    async def run() -> tuple[Any, Any]:
+        missing = await db.fetch_quote(1)
+        await db.add_quote("Hello", added_by=1, source="twitch")
+
+        return missing, await db.fetch_quote(1)
+
+    missing, found = asyncio.run(run())
+
+    assert missing is None
+    assert found == quote(1)
+    assert fetches == [1]
+
+
+@pytest.mark.parametrize("content", ["Hello", 'Quotes "and" \\ slashes', "Ünïcödé and emoji 🎉", "Line\nbreak"])
+def test_body_matches_json_response(content: str) -> None:
+    cache: QuoteCache = QuoteCache()
+    entry = cache.set(1, quote(1, content=content))
+
+    assert entry.body == JSONResponse(QuoteModel(quote(1, content=content)).as_dict()).body
+
+    # Serialised once, then reused...
+    assert entry.body is entry.body
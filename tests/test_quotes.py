@@ -0,0 +1,94 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from starlette.testclient import TestClient
+
+from api import Application
+from routes.quotes import Quotes
+
+
+# Requests from localhost skip the rate limits...
+LOCAL: dict[str, str] = {"X-Forwarded-For": "127.0.0.1"}
+
+
+class Database:
+    def __init__(self) -> None:
+        self.searches: list[dict[str, Any]] = []
+
+    async def search_quotes(self, text: str | None = None, **kwargs: Any) -> list[dict[str, Any]]:
+        self.searches.append({"text": text, **kwargs})
+        return []
+
+
+class Resolver:
+    def __init__(self) -> None:
+        self.names: list[str] = []
+
+    async def fetch_user(self, *, name: str) -> SimpleNamespace:
+        self.names.append(name)
+        return SimpleNamespace(id=1234)
+
+
+@pytest.fixture
+def server() -> Any:
+    return SimpleNamespace(database=Database(), tbot=SimpleNamespace(resolver=Resolver()))
+
+
+@pytest.fixture
+def client(server: Any) -> TestClient:
+    return TestClient(Application(views=[Quotes(server)]), headers=LOCAL)
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"q": "hello", "before": "99999999999"},
+        {"q": "hello", "before": "0"},
+        {"q": "hello", "before": "-1"},
+        {"speaker": "99999999999999999999"},
+        {"speaker": "1" * 5000},
+        {"speaker": "bad name!"},
+        {"speaker": "a" * 26},
+        {"speaker": "²"},
+    ],
+)
+def test_bad_params_are_400(client: TestClient, server: SimpleNamespace, params: dict[str, str]) -> None:
+    resp = client.get("/quotes/", params=params)
+
+    assert resp.status_code == 400
+    assert server.database.searches == []
+    assert server.tbot.resolver.names == []
+
+
+def test_numeric_speaker_is_an_id(client: TestClient, server: SimpleNamespace) -> None:
+    resp = client.get("/quotes/", params={"speaker": str(2**63 - 1), "before": str(2**31 - 1)})
+
+    assert resp.status_code == 200
+    assert resp.json() == {"quotes": [], "next": None}
+    assert server.database.searches[0]["speakers"] == [2**63 - 1]
+    assert server.database.searches[0]["before"] == 2**31 - 1
+    assert server.tbot.resolver.names == []
+
+
+def test_login_speaker_is_resolved(client: TestClient, server: SimpleNamespace) -> None:
+    resp = client.get("/quotes/", params={"speaker": "@Time_Enjoyed"})
+
+    assert resp.status_code == 200
+    assert server.tbot.resolver.names == ["Time_Enjoyed"]
+    assert server.database.searches[0]["speakers"] == [1234]
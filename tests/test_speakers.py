@@ -0,0 +1,108 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import datetime
+from types import SimpleNamespace
+from typing import Any
+
+from core import SpeakerNames
+
+
+class Database:
+    def __init__(self, stale: list[tuple[str, int]]) -> None:
+        self.stale = stale
+        self.stored: dict[tuple[str, int], str] = {}
+
+    async def fetch_stale_speakers(self, older_than: datetime.timedelta) -> list[tuple[str, int]]:
+        return self.stale
+
+    async def set_speaker_names(self, names: dict[tuple[str, int], str]) -> None:
+        self.stored.update(names)
+
+
+class Resolver:
+    def __init__(self, known: dict[int, str]) -> None:
+        self.known = known
+        self.lookups: list[int] = []
+
+    async def fetch_user(self, *, user_id: int) -> Any:
+        self.lookups.append(user_id)
+
+        name: str | None = self.known.get(user_id)
+        return SimpleNamespace(display_name=name) if name else None
+
+
+def make_speakers(*, known: dict[int, str], stale: list[tuple[str, int]] | None = None, **kwargs: Any) -> Any:
+    bot = SimpleNamespace(
+        database=Database(stale or []),
+        resolver=Resolver(known),
+        dbot=SimpleNamespace(get_guild=lambda id_: None),
+    )
+    return SpeakerNames(bot, **kwargs)  # type: ignore
+
+
+def test_resolved_names_are_stored() -> None:
+    speakers = make_speakers(known={1: "Time"})
+
+    async def run() -> None:
+        assert await speakers.fetch_name("twitch", 1) == "Time"
+        assert await speakers.fetch_name("twitch", 1) == "Time"
+
+    asyncio.run(run())
+
+    assert speakers.bot.resolver.lookups == [1]
+    assert speakers.bot.database.stored == {("twitch", 1): "Time"}
+
+
+def test_unresolved_speakers_are_not_looked_up_again() -> None:
+    speakers = make_speakers(known={})
+
+    async def run() -> None:
+        for _ in range(5):
+            assert await speakers.fetch_name("twitch", 2) is None
+
+    asyncio.run(run())
+
+    assert speakers.bot.resolver.lookups == [2]
+
+
+def test_unresolved_speakers_expire() -> None:
+    speakers = make_speakers(known={}, miss_ttl=0.0)
+
+    async def run() -> None:
+        assert await speakers.fetch_name("twitch", 2) is None
+        assert await speakers.fetch_name("twitch", 2) is None
+
+    asyncio.run(run())
+
+    assert speakers.bot.resolver.lookups == [2, 2]
+
+
+def test_refresh_retries_unresolved_speakers() -> None:
+    speakers = make_speakers(known={}, stale=[("twitch", 3)])
+
+    async def run() -> None:
+        assert await speakers.fetch_name("twitch", 3) is None
+
+        # The account came back, E.g. after a suspension...
+        speakers.bot.resolver.known[3] = "Back"
+        assert await speakers.refresh() == 1
+
+        assert await speakers.fetch_name("twitch", 3) == "Back"
+
+    asyncio.run(run())
+
+    assert speakers.bot.resolver.lookups == [3, 3]
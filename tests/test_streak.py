@@ -0,0 +1,107 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import random
+import sqlite3
+
+import pytest
+
+from database import queries as q
+
+
+REDEEMS: int = 2000
+
+
+def sqlite_sql(query: q.Query) -> str:
+    # The streak queries are plain enough to run in sqlite, apart from the parameter style and the timestamps,
+    # which are the rowid here...
+    return query.sql.replace("$", "?").replace("'-infinity'", "0")
+
+
+@pytest.fixture
+def connection() -> sqlite3.Connection:
+    connection: sqlite3.Connection = sqlite3.connect(":memory:")
+    connection.executescript(
+        """
+        CREATE TABLE first_redeem (
+            twitch_id BIGINT NOT NULL,
+            timestamp INTEGER PRIMARY KEY
+        );
+        CREATE TABLE first_streak (
+            id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+            twitch_id BIGINT NOT NULL,
+            count INTEGER NOT NULL
+        );
+        """
+    )
+    return connection
+
+
+def add_redeem(connection: sqlite3.Connection, twitch_id: int) -> None:
+    # The same statements, in the same order, as Database.add_redeem...
+    connection.execute(sqlite_sql(q.ADD_REDEEM), (twitch_id,)).fetchall()
+    connection.execute(sqlite_sql(q.EXTEND_STREAK), (twitch_id,))
+
+
+def fetch_streak(connection: sqlite3.Connection) -> tuple[int, int] | None:
+    return connection.execute(sqlite_sql(q.FETCH_STREAK)).fetchone()
+
+
+def count_streak(connection: sqlite3.Connection) -> tuple[int, int] | None:
+    row: tuple[int | None, int] = connection.execute(sqlite_sql(q.COUNT_STREAK)).fetchone()
+    return None if row[0] is None else (row[0], row[1])
+
+
+def walk_redeems(connection: sqlite3.Connection) -> tuple[int, int] | None:
+    # The loop General.event_api_first_redeem and /first/data used to run over the whole history...
+    all_redeems: list[tuple[int]] = connection.execute(sqlite_sql(q.FETCH_REDEEMS)).fetchall()
+    if not all_redeems:
+        return None
+
+    redeemer_twitch_id: int = all_redeems[0][0]
+    count: int = 0
+
+    for twitch_id, *_ in all_redeems:
+        if redeemer_twitch_id != twitch_id:
+            break
+        count += 1
+
+    return redeemer_twitch_id, count
+
+
+def test_empty_history(connection: sqlite3.Connection) -> None:
+    assert fetch_streak(connection) is None
+    assert count_streak(connection) is None
+    assert walk_redeems(connection) is None
+
+
+@pytest.mark.parametrize("users", [1, 2, 5])
+def test_incremental_matches_rebuild_and_loop(connection: sqlite3.Connection, users: int) -> None:
+    rng: random.Random = random.Random(users)
+
+    for _ in range(REDEEMS):
+        add_redeem(connection, rng.randint(1, users))
+
+        expected: tuple[int, int] | None = walk_redeems(connection)
+        assert fetch_streak(connection) == expected
+        assert count_streak(connection) == expected
+
+
+def test_streak_resets_for_a_new_redeemer(connection: sqlite3.Connection) -> None:
+    for twitch_id in (1, 1, 1, 2, 2, 1):
+        add_redeem(connection, twitch_id)
+
+    assert fetch_streak(connection) == (1, 1)
+    assert count_streak(connection) == (1, 1)
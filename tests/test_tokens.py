@@ -0,0 +1,128 @@
+"""Copyright 2023 TimeEnjoyed <https://github.com/TimeEnjoyed/>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import functools
+import json
+import pathlib
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import core
+import core.bots
+import core.tokens
+from core import HTTPClient, TokenStore
+from extensions.discord import music
+from extensions.discord.music import Music
+
+
+CALLERS: int = 50
+
+
+class Twitch:
+    """Stub of the Twitch token endpoint and the Helix endpoints which only accept the latest token."""
+
+    def __init__(self) -> None:
+        self.refreshes: int = 0
+        self.shoutouts: int = 0
+        self.redemptions: int = 0
+
+        # The token the store starts with has expired, only refreshed tokens are accepted...
+        self.token: str | None = None
+
+        self.app: web.Application = web.Application()
+        self.app.router.add_post("/oauth2/token", self.refresh)
+        self.app.router.add_post("/helix/chat/shoutouts", self.shoutout)
+        self.app.router.add_patch("/helix/channel_points/custom_rewards/redemptions", self.redemption)
+
+    def authorised(self, request: web.Request) -> bool:
+        return self.token is not None and request.headers.get("Authorization") == f"Bearer {self.token}"
+
+    async def refresh(self, request: web.Request) -> web.Response:
+        self.refreshes += 1
+
+        # Slow enough that every caller has been rejected before the refresh completes...
+        await asyncio.sleep(0.1)
+
+        self.token = f"new-{self.refreshes}"
+        return web.json_response({"access_token": self.token, "refresh_token": "refresh", "expires_in": 14400})
+
+    async def shoutout(self, request: web.Request) -> web.Response:
+        if not self.authorised(request):
+            return web.Response(status=401)
+
+        self.shoutouts += 1
+        return web.Response(status=204)
+
+    async def redemption(self, request: web.Request) -> web.Response:
+        if not self.authorised(request):
+            return web.Response(status=401)
+
+        self.redemptions += 1
+        return web.json_response({"data": []})
+
+
+def test_concurrent_401s_refresh_once(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    twitch: Twitch = Twitch()
+
+    async def run() -> None:
+        async with TestServer(twitch.app) as server, HTTPClient() as http_client:
+            monkeypatch.setattr(core.tokens, "TWITCH_TOKEN", str(server.make_url("/oauth2/token")))
+            monkeypatch.setattr(core.bots, "TWITCH_SHOUTOUTS", str(server.make_url("/helix/chat/shoutouts")))
+            monkeypatch.setattr(
+                music, "TWITCH_REDEMPTIONS", str(server.make_url("/helix/channel_points/custom_rewards/redemptions"))
+            )
+
+            tokens: TokenStore = TokenStore(tmp_path / ".secrets.json", http_client=http_client)
+            tokens.token = "old"
+            tokens.refresh_token = "refresh"
+
+            # The real methods are run against stand-in bots, which only carry what they use...
+            tbot: Any = SimpleNamespace(tokens=tokens, http_client=http_client)
+            tbot.send_shoutout = functools.partial(core.TwitchBot.send_shoutout, tbot)
+
+            cog: Any = SimpleNamespace(bot=SimpleNamespace(tbot=tbot, http_client=http_client))
+            cog.update_redemption = functools.partial(Music.update_redemption, cog)
+
+            redeem: dict[str, Any] = {"id": "redeem", "reward": {"id": "reward"}}
+            await asyncio.gather(
+                *(tbot.send_shoutout({"to_broadcaster_id": str(i)}) for i in range(CALLERS)),
+                *(cog.update_redemption(redeem, status="FULFILLED") for _ in range(CALLERS)),
+            )
+
+    asyncio.run(run())
+
+    assert twitch.refreshes == 1
+    assert twitch.shoutouts == CALLERS
+    assert twitch.redemptions == CALLERS
+
+    with (tmp_path / ".secrets.json").open() as fp:
+        assert json.load(fp)["token"] == "new-1"
+
+
+def test_stale_token_skips_refresh(tmp_path: pathlib.Path) -> None:
+    async def run() -> bool:
+        async with HTTPClient() as http_client:
+            tokens: TokenStore = TokenStore(tmp_path / ".secrets.json", http_client=http_client)
+            tokens.token = "new"
+
+            return await tokens.refresh(stale="old")
+
+    assert asyncio.run(run()) is True
+    assert not (tmp_path / ".secrets.json").exists()
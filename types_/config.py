@@ -13,7 +13,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import TypedDict
+from typing import Literal, NotRequired, TypedDict
 
 
 class Discord(TypedDict):
@@ -40,6 +40,7 @@ class Api(TypedDict):
     public_host: str
     secret: str
     max_age: int
+    sse_coalesce_ms: NotRequired[int]
 
 
 class Database(TypedDict):
@@ -84,6 +85,7 @@ class RateLimit(TypedDict):
 
 
 class Limits(TypedDict):
+    backend: NotRequired[Literal["memory", "redis"]]
     sse_player: RateLimit
     quotes: RateLimit
     player_login: RateLimit
@@ -16,7 +16,7 @@ limitations under the License.
 from __future__ import annotations
 
 from collections.abc import Awaitable, Callable, Coroutine
-from typing import TYPE_CHECKING, Any, Literal, TypeAlias, TypedDict
+from typing import Any, Literal, TypeAlias, TypedDict
 
 from starlette.requests import Request
 from starlette.responses import Response
@@ -25,10 +25,6 @@ from starlette.websockets import WebSocket
 from api.core import _Route
 
 
-if TYPE_CHECKING:
-    import datetime
-
-
 __all__ = (
     "RateLimit",
     "ExemptCallable",
@@ -37,6 +33,8 @@ __all__ = (
     "RateLimitData",
     "TatStore",
     "ResponseType",
+    "ValidatorCallable",
+    "CacheData",
 )
 
 
@@ -44,6 +42,7 @@ ResponseType: TypeAlias = Coroutine[Any, Any, Response | None]
 
 
 ExemptCallable: TypeAlias = Callable[[Request | WebSocket], Awaitable[bool]] | None
+ValidatorCallable: TypeAlias = Callable[[Any, Request], Awaitable[str | None] | str | None] | None
 LimitDecorator: TypeAlias = Callable[[Any, Request], ResponseType] | _Route
 T_LimitDecorator: TypeAlias = Callable[..., LimitDecorator]
 
@@ -61,5 +60,11 @@ class RateLimit(TypedDict):
 
 
 class TatStore(TypedDict):
-    tat: datetime.datetime
+    tat: float
     limit: Any
+    slot: int
+
+
+class CacheData(TypedDict):
+    validator: ValidatorCallable
+    control: str
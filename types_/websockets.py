@@ -15,11 +15,18 @@ limitations under the License.
 
 from __future__ import annotations
 
-from typing import TypedDict
+from typing import TYPE_CHECKING, TypedDict
 
 from starlette.websockets import WebSocket
 
 
+if TYPE_CHECKING:
+    import asyncio
+
+
 class WebsocketListener(TypedDict):
     websocket: WebSocket
     subscriptions: set[str]
+    # (monotonic time queued, serialised message)...
+    outbox: asyncio.Queue[tuple[float, str]]
+    writer: asyncio.Task[None]